@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Compare project registry lookups with the legacy re-read-every-call path against the cache.
+
+Writes a throwaway registry of synthetic projects, then times `get_project` by slug and
+`list_projects` both ways.
+
+    python bin/bench-projects-registry.py --projects 1000 --lookups 2000 --lists 50
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+_TEMPDIR = tempfile.TemporaryDirectory()
+os.environ["HQ_PROJECTS_PATH"] = os.path.join(_TEMPDIR.name, "projects.json")
+os.environ["HQ_HOSTS_PATH"] = os.path.join(_TEMPDIR.name, "hosts.json")
+
+from controller import projects_registry  # noqa: E402
+from controller.projects_registry import _load_projects_raw, _slugify, get_project, list_projects  # noqa: E402
+
+
+def write_synthetic_registry(count: int) -> list[str]:
+    projects = [
+        {
+            "slug": f"project-{index:05d}",
+            "title": f"Project {index}",
+            "public_summary": f"Synthetic project number {index}.",
+            "public_mode": "full",
+            "primary_url": f"https://project-{index}.example.com",
+            "repo_url": f"https://github.com/example/project-{index}",
+            "sort_order": index % 7,
+            "health_public_url": f"https://project-{index}.example.com/health",
+            "health_private_url": f"http://10.0.{index // 250}.{index % 250}:8000/health",
+            "runtime_path": f"/srv/stacks/project-{index}",
+            "deploy_command": "docker compose up -d --build",
+        }
+        for index in range(count)
+    ]
+    Path(os.environ["HQ_PROJECTS_PATH"]).write_text(json.dumps(projects, indent=2), encoding="utf-8")
+    return [project["slug"] for project in projects]
+
+
+def legacy_get_project(slug: str) -> dict | None:
+    """The pre-cache implementation: parse and normalize the whole file, then scan."""
+    target = _slugify(slug)
+    for project in _load_projects_raw():
+        if project["slug"] == target:
+            return project
+    return None
+
+
+def legacy_list_projects() -> list[dict]:
+    return sorted(_load_projects_raw(), key=lambda item: (item["sort_order"], item["title"].lower(), item["slug"]))
+
+
+def per_second(func, args_list) -> float:
+    started = time.perf_counter()
+    for args in args_list:
+        func(*args)
+    return len(args_list) / (time.perf_counter() - started)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--projects", type=int, default=1000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--lists", type=int, default=50)
+    parser.add_argument("--legacy-lookups", type=int, default=50, help="the legacy path is slow; sample fewer calls")
+    args = parser.parse_args()
+
+    slugs = write_synthetic_registry(args.projects)
+    rng = random.Random(0)
+    lookups = [(rng.choice(slugs),) for _ in range(args.lookups)]
+    legacy_lookups = lookups[: args.legacy_lookups]
+
+    legacy_get = per_second(legacy_get_project, legacy_lookups)
+    legacy_list = per_second(legacy_list_projects, [()] * min(args.lists, args.legacy_lookups))
+    get_project(slugs[0])  # warm the cache
+    cached_get = per_second(get_project, lookups)
+    cached_list = per_second(list_projects, [()] * args.lists)
+
+    print(
+        json.dumps(
+            {
+                "projects": args.projects,
+                "legacy_get_per_second": round(legacy_get, 1),
+                "cached_get_per_second": round(cached_get, 1),
+                "get_speedup": round(cached_get / legacy_get, 1),
+                "legacy_list_per_second": round(legacy_list, 1),
+                "cached_list_per_second": round(cached_list, 1),
+                "list_speedup": round(cached_list / legacy_list, 1),
+                "cache": projects_registry.registry_cache_stats(),
+            },
+            indent=2,
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
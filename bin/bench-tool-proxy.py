@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Compare proxy throughput of the legacy blocking `requests` path against the pooled async client.
+
+Starts a throwaway local upstream that answers after a short delay (like a tool doing a bit of
+work), then drives `proxy_tool_http` with concurrent requests in both modes.
+
+    python bin/bench-tool-proxy.py --requests 400 --concurrency 20 --delay-ms 10
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+_TEMPDIR = tempfile.TemporaryDirectory()
+os.environ["CONTROLLER_DB_PATH"] = os.path.join(_TEMPDIR.name, "tools.db")
+os.environ["HQ_PROJECTS_PATH"] = os.path.join(_TEMPDIR.name, "projects.json")
+os.environ["HQ_HOSTS_PATH"] = os.path.join(_TEMPDIR.name, "hosts.json")
+
+import requests  # noqa: E402
+from fastapi.responses import Response  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+
+from controller import controller_main  # noqa: E402
+from controller.db import add_tool, get_tool_by_name, init_db  # noqa: E402
+
+
+def start_upstream(delay_seconds: float) -> ThreadingHTTPServer:
+    body = json.dumps({"status": "ok", "items": list(range(50))}).encode("utf-8")
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:  # noqa: N802
+            time.sleep(delay_seconds)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:  # noqa: A003
+            return
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def make_request(path: str) -> Request:
+    scope = {"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": []}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    return Request(scope, receive)
+
+
+async def legacy_proxy(name: str, path: str, request: Request):
+    """The pre-pool implementation: blocking `requests` call inside the event loop."""
+    tool = get_tool_by_name(name)
+    resp = requests.request(
+        method=request.method,
+        url=f"http://127.0.0.1:{tool.port}/{path}",
+        params=request.query_params,
+        timeout=30,
+        allow_redirects=False,
+    )
+    return Response(content=resp.content, status_code=resp.status_code)
+
+
+async def drain(response) -> None:
+    if hasattr(response, "body_iterator"):
+        async for _chunk in response.body_iterator:
+            pass
+        if response.background:
+            await response.background()
+
+
+async def run_mode(handler, total: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with semaphore:
+            response = await handler("bench", "status", make_request("/proxy/bench/status"))
+            await drain(response)
+            if response.status_code != 200:
+                raise RuntimeError(f"unexpected status {response.status_code}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return total / (time.perf_counter() - started)
+
+
+async def main_async(args) -> dict:
+    legacy = await run_mode(legacy_proxy, args.requests, args.concurrency)
+    pooled = await run_mode(controller_main.proxy_tool_http, args.requests, args.concurrency)
+    await controller_main.TOOL_PROXY.aclose()
+    return {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "upstream_delay_ms": args.delay_ms,
+        "legacy_requests_per_second": round(legacy, 1),
+        "pooled_requests_per_second": round(pooled, 1),
+        "speedup": round(pooled / legacy, 2) if legacy else None,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--delay-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    server = start_upstream(args.delay_ms / 1000)
+    init_db()
+    add_tool("bench", "tools/bench/main.py", server.server_address[1])
+    try:
+        result = asyncio.run(main_async(args))
+    finally:
+        server.shutdown()
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Move the projects and hosts registries between their JSON files and the SQLite backend.
+
+    python bin/registry-sqlite.py import   # projects.json / hosts.json -> registry database
+    python bin/registry-sqlite.py export   # registry database -> projects.json / hosts.json
+
+`import` replaces the tables in HQ_REGISTRY_DB_PATH; `export` rewrites the JSON files (or the
+files given with --projects/--hosts) from HQ_REGISTRY_BACKEND=sqlite, e.g. before switching
+back to the JSON backend. The public portfolio export is unaffected by either and keeps using
+bin/export-portfolio-projects.py.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from controller.hosts_registry import dump_hosts_registry, import_hosts_registry  # noqa: E402
+from controller.projects_registry import dump_projects_registry, import_projects_registry  # noqa: E402
+from controller.registry_sqlite import registry_db_path  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("direction", choices=["import", "export"])
+    parser.add_argument("--projects", type=Path, help="projects.json to read or write")
+    parser.add_argument("--hosts", type=Path, help="hosts.json to read or write")
+    args = parser.parse_args()
+
+    if args.direction == "import":
+        # Hosts first: project records are validated against them.
+        result = {"hosts": import_hosts_registry(args.hosts)}
+        os.environ["HQ_REGISTRY_BACKEND"] = "sqlite"
+        result["projects"] = import_projects_registry(args.projects)
+    else:
+        os.environ["HQ_REGISTRY_BACKEND"] = "sqlite"
+        result = {"hosts": dump_hosts_registry(args.hosts), "projects": dump_projects_registry(args.projects)}
+    print(json.dumps({"direction": args.direction, "database": str(registry_db_path()), **result}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Iterator
+
+from controller.command_stream import OUTPUT_TAIL_BYTES, OutputTail
+from controller.db import update_action_job
+
+
+def max_action_workers() -> int:
+    raw = str(os.getenv("HQ_ACTION_MAX_WORKERS") or "4").strip()
+    try:
+        return max(1, min(int(raw), 32))
+    except ValueError:
+        return 4
+
+
+def action_job_history() -> int:
+    raw = str(os.getenv("HQ_ACTION_JOB_HISTORY") or "50").strip()
+    try:
+        return max(1, min(int(raw), 1000))
+    except ValueError:
+        return 50
+
+
+# Line records of a running job kept for `follow()`; a follower that falls further behind skips
+# ahead (the finished job still holds the output tail).
+FOLLOW_BUFFER_LINES = 2000
+
+
+def _clip(text: str) -> tuple[str, bool]:
+    text = str(text or "")
+    if len(text) <= OUTPUT_TAIL_BYTES:
+        return text, False
+    return text[-OUTPUT_TAIL_BYTES:], True
+
+
+class _LiveJob:
+    def __init__(self):
+        self.tails = {"stdout": OutputTail(), "stderr": OutputTail()}
+        self.records: deque[tuple[int, dict]] = deque(maxlen=FOLLOW_BUFFER_LINES)
+        self.sequence = 0
+        self.finished = False
+
+
+class ActionJobQueue:
+    """Runs submitted project action jobs on a bounded pool, one job at a time per project.
+
+    At most `HQ_ACTION_MAX_WORKERS` jobs run at once. A job for a project that already has one
+    running waits in that project's FIFO instead of occupying a worker, so two deploys of the same
+    project never overlap while other projects keep going. Status, timing, exit code and the
+    output tail are written to the `action_jobs` table; the output of a running job is kept in
+    memory and exposed through `live_output()` for polling and `follow()` for streaming.
+    """
+
+    def __init__(self, max_workers: int | None = None):
+        self._max_workers = max_workers or max_action_workers()
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        # A project slug is a key here while one of its jobs is running; the value holds the jobs
+        # waiting behind it.
+        self._pending: dict[str, deque[tuple[int, Iterator[dict]]]] = {}
+        self._live: dict[int, _LiveJob] = {}
+        self._done: dict[int, threading.Event] = {}
+        self.submitted = 0
+        self.finished = 0
+
+    def submit(self, project_slug: str, job_id: int, records: Iterator[dict]) -> None:
+        """Queue a job; `records` is the lazy record stream from `_stream_project_command`."""
+        with self._lock:
+            self.submitted += 1
+            self._done[job_id] = threading.Event()
+            waiting = self._pending.get(project_slug)
+            if waiting is not None:
+                waiting.append((job_id, records))
+                return
+            self._pending[project_slug] = deque()
+            executor = self._ensure_executor()
+        executor.submit(self._run, project_slug, job_id, records)
+
+    def _ensure_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self._max_workers, thread_name_prefix="hq-action")
+        return self._executor
+
+    def _run(self, project_slug: str, job_id: int, records: Iterator[dict]) -> None:
+        try:
+            self._execute(job_id, records)
+        finally:
+            with self._lock:
+                self.finished += 1
+                live = self._live.pop(job_id, None)
+                if live is not None:
+                    live.finished = True
+                    self._changed.notify_all()
+                done = self._done.pop(job_id, None)
+                waiting = self._pending[project_slug]
+                following = waiting.popleft() if waiting else None
+                if following is None:
+                    del self._pending[project_slug]
+                executor = self._executor
+            if done:
+                done.set()
+            if following is not None and executor is not None:
+                executor.submit(self._run, project_slug, *following)
+
+    def _execute(self, job_id: int, records: Iterator[dict]) -> None:
+        live = _LiveJob()
+        tails = live.tails
+        with self._lock:
+            self._live[job_id] = live
+            self._changed.notify_all()
+        update_action_job(job_id, status="running", started_at=datetime.utcnow())
+
+        result = None
+        try:
+            for record in records:
+                if record.get("type") == "exit":
+                    result = record
+                    break
+                if record.get("type") in tails:
+                    line = str(record.get("line") or "")
+                    with self._lock:
+                        tails[record["type"]].append(line)
+                        live.sequence += 1
+                        live.records.append((live.sequence, {"type": record["type"], "line": line}))
+                        self._changed.notify_all()
+        except Exception as exc:
+            result = {"ok": False, "exit_code": None, "detail": f"Action failed: {exc}"}
+        finally:
+            # Stopping at the exit record leaves the generator suspended; closing it now releases
+            # the runner response and its pool slot instead of waiting for garbage collection.
+            close = getattr(records, "close", None)
+            if close is not None:
+                close()
+
+        if result is None:
+            result = {"ok": False, "exit_code": None, "detail": "Action ended without a result."}
+        with self._lock:
+            stdout, stdout_clipped = _clip(result.get("stdout", tails["stdout"].text()))
+            stderr, stderr_clipped = _clip(result.get("stderr", tails["stderr"].text()))
+        update_action_job(
+            job_id,
+            status="succeeded" if result.get("ok") else "failed",
+            ok=bool(result.get("ok")),
+            exit_code=result.get("exit_code"),
+            detail=str(result.get("detail") or ""),
+            stdout=stdout,
+            stderr=stderr,
+            truncated=bool(result.get("truncated")) or stdout_clipped or stderr_clipped,
+            finished_at=datetime.utcnow(),
+        )
+
+    def live_output(self, job_id: int) -> dict | None:
+        """Output tail of a running job, or None when it is not running in this process."""
+        with self._lock:
+            live = self._live.get(job_id)
+            if live is None:
+                return None
+            tails = live.tails
+            return {
+                "stdout": tails["stdout"].text(),
+                "stderr": tails["stderr"].text(),
+                "truncated": tails["stdout"].truncated or tails["stderr"].truncated,
+            }
+
+    def follow(self, job_id: int) -> Iterator[dict]:
+        """Yield a submitted job's `stdout`/`stderr` line records as it produces them.
+
+        Waits while the job is queued and returns once it has finished and its row is final; a
+        job that finished before following started yields nothing (read its row instead).
+        """
+        live = None
+        sequence = 0
+        while True:
+            with self._changed:
+                if live is None:
+                    live = self._live.get(job_id)
+                    if live is None:
+                        if job_id not in self._done:
+                            return
+                        self._changed.wait(1.0)
+                        continue
+                pending = [item for item in live.records if item[0] > sequence]
+                if not pending:
+                    if live.finished:
+                        return
+                    self._changed.wait(1.0)
+                    continue
+            for sequence, record in pending:
+                yield dict(record)
+
+    def wait_started(self, job_id: int, timeout: float | None = None) -> bool:
+        """Block while a submitted job is queued; True once it has started (or is not known)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._changed:
+            while job_id in self._done and job_id not in self._live:
+                remaining = 1.0 if deadline is None else deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._changed.wait(min(remaining, 1.0))
+        return True
+
+    def wait(self, job_id: int, timeout: float | None = None) -> bool:
+        """Block until a submitted job finishes; True if it has (or is not known to this queue)."""
+        with self._lock:
+            done = self._done.get(job_id)
+        return True if done is None else done.wait(timeout)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self._max_workers,
+                "running": len(self._live),
+                "queued": self.submitted - self.finished - len(self._live),
+                "submitted": self.submitted,
+                "finished": self.finished,
+            }
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from copy import deepcopy
+from datetime import datetime, UTC
+from typing import Callable
+
+# Finished plans kept in memory for `GET /actions/bulk/{id}`; their steps' jobs stay in the DB.
+BULK_PLAN_HISTORY = 20
+
+
+def host_concurrency() -> int:
+    raw = str(os.getenv("HQ_BULK_ACTION_HOST_CONCURRENCY") or "2").strip()
+    try:
+        return max(1, min(int(raw), 32))
+    except ValueError:
+        return 2
+
+
+def _now_iso() -> str:
+    return datetime.now(UTC).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+
+
+class BulkActions:
+    """Runs one action across many projects in dependency-ordered waves.
+
+    A plan is a list of waves (see `DependencyGraph.waves`). Waves run one after another; the
+    projects inside a wave run in parallel, at most `HQ_BULK_ACTION_HOST_CONCURRENCY` at a time
+    per deployment host. Each project step is an ordinary action job: `run_step(slug, action)`
+    submits it and blocks until the finished job comes back. Once a step fails (or comes back
+    `timed_out`, its job still running), steps that have not started yet are marked `skipped` and
+    no further wave runs.
+
+    Plans live in memory (the newest `BULK_PLAN_HISTORY`) with per-step timing, job ids and the
+    plan's wall-clock time.
+    """
+
+    def __init__(self, run_step: Callable[[str, str], dict]):
+        self._run_step = run_step
+        self._lock = threading.Lock()
+        self._plans: OrderedDict[int, dict] = OrderedDict()
+        self._done: dict[int, threading.Event] = {}
+        self._next_id = 1
+        self.steps_run = 0
+
+    def submit(self, action: str, waves: list[list[str]], hosts: dict[str, str]) -> dict:
+        """Start a plan in the background; `hosts` maps each slug to its deployment host."""
+        with self._lock:
+            plan_id = self._next_id
+            self._next_id += 1
+            plan = {
+                "id": plan_id,
+                "action": action,
+                "status": "queued",
+                "created_at": _now_iso(),
+                "started_at": None,
+                "finished_at": None,
+                "wall_clock_ms": None,
+                "waves": [list(wave) for wave in waves],
+                "failed": [],
+                "steps": [
+                    {
+                        "slug": slug,
+                        "wave": index,
+                        "host": hosts.get(slug, ""),
+                        "status": "pending",
+                        "job_id": None,
+                        "started_at": None,
+                        "finished_at": None,
+                        "duration_ms": None,
+                        "exit_code": None,
+                        "detail": "",
+                    }
+                    for index, wave in enumerate(waves)
+                    for slug in wave
+                ],
+            }
+            self._plans[plan_id] = plan
+            self._done[plan_id] = threading.Event()
+            while len(self._plans) > BULK_PLAN_HISTORY:
+                oldest = next(iter(self._plans))
+                if self._plans[oldest]["status"] in {"queued", "running"}:
+                    break
+                del self._plans[oldest]
+            snapshot = deepcopy(plan)
+        threading.Thread(target=self._run, args=(plan_id,), name=f"hq-bulk-{plan_id}", daemon=True).start()
+        return snapshot
+
+    def _run(self, plan_id: int) -> None:
+        with self._lock:
+            plan = self._plans[plan_id]
+            plan["status"] = "running"
+            plan["started_at"] = _now_iso()
+            done = self._done[plan_id]
+        started = time.perf_counter()
+        try:
+            for index in range(len(plan["waves"])):
+                steps = [step for step in plan["steps"] if step["wave"] == index]
+                limits = {step["host"]: threading.BoundedSemaphore(host_concurrency()) for step in steps}
+                workers = [
+                    threading.Thread(target=self._step, args=(plan, step, limits[step["host"]]), daemon=True)
+                    for step in steps
+                ]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+        finally:
+            with self._lock:
+                plan["status"] = "failed" if plan["failed"] else "succeeded"
+                plan["finished_at"] = _now_iso()
+                plan["wall_clock_ms"] = round((time.perf_counter() - started) * 1000, 1)
+                self._done.pop(plan_id, None)
+            done.set()
+
+    def _step(self, plan: dict, step: dict, limit: threading.BoundedSemaphore) -> None:
+        with limit:
+            with self._lock:
+                if plan["failed"]:
+                    step["status"] = "skipped"
+                    step["detail"] = f"Skipped after {', '.join(plan['failed'])} failed."
+                    return
+                step["status"] = "running"
+                step["started_at"] = _now_iso()
+                self.steps_run += 1
+            started = time.perf_counter()
+            try:
+                job = dict(self._run_step(step["slug"], plan["action"]) or {})
+            except Exception as exc:
+                job = {"ok": False, "detail": f"Action failed: {exc}"}
+            with self._lock:
+                if job.get("ok"):
+                    step["status"] = "succeeded"
+                else:
+                    step["status"] = "timed_out" if job.get("timed_out") else "failed"
+                step["job_id"] = job.get("id")
+                step["exit_code"] = job.get("exit_code")
+                step["detail"] = str(job.get("detail") or "")
+                step["finished_at"] = _now_iso()
+                step["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+                if not job.get("ok"):
+                    plan["failed"].append(step["slug"])
+
+    def get(self, plan_id: int) -> dict | None:
+        with self._lock:
+            plan = self._plans.get(plan_id)
+            return deepcopy(plan) if plan else None
+
+    def wait(self, plan_id: int, timeout: float | None = None) -> bool:
+        """Block until a plan finishes; True if it has (or is not known)."""
+        with self._lock:
+            done = self._done.get(plan_id)
+        return True if done is None else done.wait(timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "plans": len(self._plans),
+                "running": sum(1 for plan in self._plans.values() if plan["status"] in {"queued", "running"}),
+                "steps_run": self.steps_run,
+            }
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import os
+import queue
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+from typing import Iterator
+
+OUTPUT_TAIL_BYTES = 64 * 1024
+# How long to keep draining pipes after a timeout kill before giving up on them (a grandchild
+# can hold them open).
+_KILL_GRACE_SECONDS = 5.0
+# Lines buffered between the pipe readers and the consumer; a full queue blocks the readers, so
+# a command that outputs faster than it is consumed stalls on its pipe instead of growing memory.
+_QUEUE_LINES = 1024
+
+
+class OutputTail:
+    """Bounded tail of a command's output: keeps the most recent lines within a byte budget."""
+
+    def __init__(self, max_bytes: int = OUTPUT_TAIL_BYTES):
+        self.max_bytes = max_bytes
+        self._lines: deque[str] = deque()
+        self._size = 0
+        self.truncated = False
+
+    def append(self, line: str) -> None:
+        self._lines.append(line)
+        self._size += len(line)
+        while self._size > self.max_bytes and len(self._lines) > 1:
+            self._size -= len(self._lines.popleft())
+            self.truncated = True
+
+    def text(self) -> str:
+        return "".join(self._lines)
+
+
+def _kill_tree(proc: subprocess.Popen) -> None:
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (AttributeError, OSError):
+        proc.kill()
+
+
+def _put(lines: queue.Queue, item: tuple, stop: threading.Event) -> bool:
+    while not stop.is_set():
+        try:
+            lines.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _pump(name: str, pipe, lines: queue.Queue, stop: threading.Event) -> None:
+    try:
+        for line in pipe:
+            if not _put(lines, (name, line), stop):
+                break
+    except (OSError, ValueError):
+        pass
+    finally:
+        _put(lines, (name, None), stop)
+        try:
+            pipe.close()
+        except OSError:
+            pass
+
+
+def iter_command_output(
+    command: str, cwd: str | None, timeout: float, tail_bytes: int = OUTPUT_TAIL_BYTES
+) -> Iterator[dict]:
+    """Run a shell command and yield `stdout`/`stderr` line records, then one `exit` record.
+
+    Only a bounded tail of each stream is kept for the exit record (`stdout`, `stderr`,
+    `truncated`), so arbitrarily long output never accumulates in memory.
+    """
+    try:
+        proc = subprocess.Popen(
+            command,
+            cwd=cwd,
+            shell=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            errors="replace",
+            bufsize=1,
+            start_new_session=True,  # own process group, so a timeout kills the whole tree
+        )
+    except OSError as exc:
+        yield {
+            "type": "exit",
+            "ok": False,
+            "exit_code": None,
+            "stdout": "",
+            "stderr": str(exc),
+            "truncated": False,
+            "detail": str(exc),
+        }
+        return
+
+    lines: queue.Queue = queue.Queue(maxsize=_QUEUE_LINES)
+    stop = threading.Event()
+    completed = False
+    try:
+        for name, pipe in (("stdout", proc.stdout), ("stderr", proc.stderr)):
+            threading.Thread(target=_pump, args=(name, pipe, lines, stop), daemon=True).start()
+        tails = {"stdout": OutputTail(tail_bytes), "stderr": OutputTail(tail_bytes)}
+
+        deadline = time.monotonic() + timeout
+        timed_out = False
+        open_streams = 2
+        while open_streams:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                if timed_out:
+                    break
+                _kill_tree(proc)
+                timed_out = True
+                deadline = time.monotonic() + _KILL_GRACE_SECONDS
+                continue
+            try:
+                name, line = lines.get(timeout=min(remaining, 1.0))
+            except queue.Empty:
+                continue
+            if line is None:
+                open_streams -= 1
+                continue
+            tails[name].append(line)
+            yield {"type": name, "line": line}
+
+        if not timed_out:
+            # Both streams are closed, but the command may still be running (it redirected or
+            # closed its output): it keeps the rest of its deadline.
+            try:
+                proc.wait(timeout=max(deadline - time.monotonic(), 0))
+            except subprocess.TimeoutExpired:
+                _kill_tree(proc)
+                timed_out = True
+        try:
+            exit_code = proc.wait(timeout=_KILL_GRACE_SECONDS)
+        except subprocess.TimeoutExpired:
+            exit_code = None
+        if timed_out:
+            exit_code = None
+            detail = f"Command timed out after {timeout:g} seconds."
+        else:
+            detail = "Command completed successfully." if exit_code == 0 else "Command failed."
+        completed = True
+        yield {
+            "type": "exit",
+            "ok": exit_code == 0,
+            "exit_code": exit_code,
+            "stdout": tails["stdout"].text(),
+            "stderr": tails["stderr"].text(),
+            "truncated": tails["stdout"].truncated or tails["stderr"].truncated,
+            "detail": detail,
+        }
+    finally:
+        # Runs when the consumer stops early too (generator closed, e.g. a streaming client
+        # disconnected): kill and reap the whole process group and release the pipe readers,
+        # which close their pipes once the group is gone.
+        stop.set()
+        if not completed:
+            _kill_tree(proc)
+        try:
+            proc.wait(timeout=_KILL_GRACE_SECONDS)
+        except subprocess.TimeoutExpired:
+            pass
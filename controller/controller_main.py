@@ -1,32 +1,67 @@
+import asyncio
 import json
 import sqlite3
 import os
-import subprocess
-import socket
+import time
 import http.client
+import httpx
 import requests
 import psutil
 from pathlib import Path
 from datetime import UTC, date, datetime, timedelta
 from contextlib import asynccontextmanager
+from typing import Iterator
 
 from controller.db import (
     init_db,
+    create_action_job,
+    fail_unfinished_action_jobs,
+    get_action_job,
+    list_action_jobs,
     list_tools,
     add_tool,
     get_tool_by_name,
     update_tool_pid,
     update_tool_status,
     update_tool_metadata,
+    tool_cache_stats,
 )
 
+from controller.action_jobs import ActionJobQueue, action_job_history
+from controller.command_stream import iter_command_output
+from controller.bulk_actions import BulkActions
+from controller.dependency_graph import DependencyGraph, DependencyView
+from controller.events import EventBroker, format_sse
+from controller.health_breaker import HealthBreakers
+from controller.health_checks import Singleflight, run_checks
+from controller.health_probe import ProbeSessions
+from controller.health_scheduler import HealthScheduler, scheduler_enabled
 from controller.process_manager import ProcessManager
+from controller.health_history import HealthHistory
+from controller.registry_sqlite import close_registries
+from controller.registry_store import JournalCompactor
+from controller.runner_client import RunnerClient
+from controller.status_monitor import ToolStatusMonitor
+from controller.supervisor import SUPERVISOR
+from controller.tool_logs import LOG_STREAMS, LogRotator, log_path, read_log
+from controller.tool_proxy import ToolProxyClient
+from controller.widget_rewrite import (
+    RewriteCache,
+    WidgetRewriter,
+    content_validator,
+    etag_matches,
+    is_http_validator,
+    parse_if_none_match,
+    rewrite_widget_body,
+)
 from controller.portfolio_publish import publish_portfolio_catalog
 from controller.hosts_registry import (
     create_host,
     delete_host,
     ensure_hosts_store,
     get_host,
+    host_index,
+    hosts_cache_stats,
     list_hosts,
     update_host,
 )
@@ -38,14 +73,18 @@ from controller.projects_registry import (
     export_projects,
     get_project,
     list_projects,
+    list_projects_on_host,
+    registry_cache_stats,
     update_project,
 )
 
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 
 # --- Path Setup ---
 BASE_DIR = Path(__file__).resolve().parent
@@ -57,7 +96,39 @@ PROJECT_ACTION_COMMANDS = {
     "stop": "stop_command",
     "logs": "logs_command",
 }
+PROJECT_ACTION_TIMEOUT_SECONDS = 600
+# How long a bulk step waits on its started job; past the command's own timeout, so a job still
+# running by then is stuck rather than slow.
+BULK_STEP_TIMEOUT_SECONDS = PROJECT_ACTION_TIMEOUT_SECONDS + 60
+RUNNER_BATCH_CHECK_TIMEOUT_SECONDS = 20
+PROXY_STREAM_CHUNK_SIZE = 64 * 1024
+PROXY_REQUEST_HEADERS = ("content-type", "range", "if-range", "if-none-match", "if-modified-since")
+PROXY_RESPONSE_HEADERS = ("content-type", "cache-control", "location")
+PROXY_STREAM_RESPONSE_HEADERS = (
+    "content-length",
+    "content-encoding",
+    "accept-ranges",
+    "content-range",
+    "content-disposition",
+    "etag",
+    "last-modified",
+)
 PROJECT_HEALTH_CACHE: dict[str, dict] = {}
+HEALTH_HISTORY = HealthHistory()
+HEALTH_BREAKERS = HealthBreakers()
+HEALTH_PROBES = Singleflight()
+HEALTH_SESSIONS = ProbeSessions()
+DEPENDENCY_VIEW = DependencyView()
+TOOL_PROXY = ToolProxyClient()
+RUNNER_CLIENT = RunnerClient()
+ACTION_JOBS = ActionJobQueue()
+WIDGET_REWRITE_CACHE = RewriteCache()
+EVENT_BROKER = EventBroker()
+LOG_ROTATOR = LogRotator()
+REGISTRY_COMPACTOR = JournalCompactor([ensure_projects_store, ensure_hosts_store])
+LOG_POLL_SECONDS = 0.25
+LOG_WAIT_MAX_SECONDS = 60.0
+SSE_KEEPALIVE_SECONDS = 15.0
 HOST_RUNNER_CACHE: dict[str, dict] = {}
 
 
@@ -164,7 +235,7 @@ def _now_iso() -> str:
     return datetime.now(UTC).replace(microsecond=0).isoformat().replace("+00:00", "Z")
 
 
-def _check_health_target(label: str, url: str) -> dict:
+def _check_health_target(label: str, url: str, method: str = "get") -> dict:
     if not url:
         return {
             "label": label,
@@ -176,17 +247,51 @@ def _check_health_target(label: str, url: str) -> dict:
             "detail": "No health URL configured.",
         }
 
+    # Keyed by method too: a server that rejects or hangs on HEAD says nothing about its GETs.
+    breaker_key = f"{method}:{url}"
+    cached = HEALTH_BREAKERS.before_probe(breaker_key)
+    if cached is not None:
+        return _short_circuited_check(label, url, cached, breaker_key)
+    started = time.perf_counter()
     try:
-        response = requests.get(url, timeout=5)
-        healthy = 200 <= response.status_code < 400
+        result = _probe_health_target(label, url, HEALTH_BREAKERS.timeout_seconds(breaker_key), method)
+    except BaseException:
+        HEALTH_BREAKERS.cancel_probe(breaker_key)
+        raise
+    HEALTH_BREAKERS.record(breaker_key, result["ok"], (time.perf_counter() - started) * 1000, result)
+    return {**result, "breaker": HEALTH_BREAKERS.state(breaker_key)}
+
+
+def _short_circuited_check(label: str, url: str, cached: dict, breaker_key: str) -> dict:
+    """The last result of a target whose circuit breaker is open, reused instead of probing."""
+    breaker = HEALTH_BREAKERS.state(breaker_key)
+    detail = str(cached.get("detail") or "Down.")
+    retry = f"next probe at {breaker['next_probe_at']}" if breaker["next_probe_at"] else "probe in progress"
+    return {
+        "status": "down",
+        "ok": False,
+        "http_status": None,
+        "checked_at": _now_iso(),
+        **cached,
+        "label": label,
+        "url": url,
+        "detail": f"{detail} (circuit open; {retry})",
+        "breaker": breaker,
+    }
+
+
+def _probe_health_target(label: str, url: str, timeout: float, method: str = "get") -> dict:
+    try:
+        status_code = HEALTH_SESSIONS.status(url, method, timeout)
+        healthy = 200 <= status_code < 400
         return {
             "label": label,
             "url": url,
             "status": "healthy" if healthy else "down",
             "ok": healthy,
-            "http_status": response.status_code,
+            "http_status": status_code,
             "checked_at": _now_iso(),
-            "detail": f"HTTP {response.status_code}",
+            "detail": f"HTTP {status_code}",
         }
     except requests.RequestException as exc:
         return {
@@ -222,63 +327,23 @@ def _default_health_check(label: str, url: str) -> dict:
     }
 
 
-def _check_health_target_via_runner(label: str, url: str, runner: dict) -> dict:
-    runner_socket = str(runner.get("runner_socket_path") or "").strip()
-    runner_url = str(runner.get("runner_url") or "").strip()
-    if not runner_socket and not runner_url:
-        return _check_health_target(label, url)
-
-    headers = {"Content-Type": "application/json"}
-    token = str(runner.get("token") or "").strip()
-    if token:
-        headers["Authorization"] = f"Bearer {token}"
-    payload = {"label": label, "url": url, "timeout_seconds": 5}
-
-    try:
-        if runner_socket:
-            class UnixHTTPConnection(http.client.HTTPConnection):
-                def __init__(self, socket_path: str):
-                    super().__init__("localhost")
-                    self._socket_path = socket_path
-
-                def connect(self):
-                    self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-                    self.sock.settimeout(self.timeout)
-                    self.sock.connect(self._socket_path)
-
-            connection = UnixHTTPConnection(runner_socket)
-            connection.timeout = 10
-            connection.request("POST", "/check-url", body=json.dumps(payload), headers=headers)
-            response = connection.getresponse()
-            raw_body = response.read().decode("utf-8")
-            status_code = response.status
-        else:
-            response = requests.post(
-                f"{runner_url.rstrip('/')}/check-url",
-                headers=headers,
-                json=payload,
-                timeout=10,
-            )
-            raw_body = response.text
-            status_code = response.status_code
-    except (requests.RequestException, OSError, http.client.HTTPException) as exc:
-        return {
-            "label": label,
-            "url": url,
-            "status": "down",
-            "ok": False,
-            "http_status": None,
-            "checked_at": _now_iso(),
-            "detail": f"Host runner health check failed: {exc}",
-        }
+def _runner_check_failed(label: str, url: str, detail: str) -> dict:
+    """A check that failed because the host runner could not be reached, not the target itself."""
+    return {
+        "label": label,
+        "url": url,
+        "status": "down",
+        "ok": False,
+        "http_status": None,
+        "checked_at": _now_iso(),
+        "detail": detail,
+        "runner_error": True,
+    }
 
-    try:
-        data = json.loads(raw_body) if raw_body.strip() else {}
-    except ValueError:
-        data = {}
 
-    if not isinstance(data, dict):
-        data = {}
+def _runner_check_result(label: str, url: str, data, status_code: int) -> dict:
+    """Fill in whatever a runner's check result left out."""
+    data = dict(data) if isinstance(data, dict) else {}
     if "label" not in data:
         data["label"] = label
     if "url" not in data:
@@ -296,6 +361,122 @@ def _check_health_target_via_runner(label: str, url: str, runner: dict) -> dict:
     return data
 
 
+def _check_health_target_via_runner(
+    label: str, url: str, runner: dict, timeout: float = 5, method: str = "get"
+) -> dict:
+    runner_socket = str(runner.get("runner_socket_path") or "").strip()
+    runner_url = str(runner.get("runner_url") or "").strip()
+    if not runner_socket and not runner_url:
+        return _check_health_target(label, url, method)
+
+    payload = {"label": label, "url": url, "timeout_seconds": timeout, "method": method}
+
+    try:
+        status_code, raw_body = RUNNER_CLIENT.request(runner, "POST", "/check-url", payload, timeout=10)
+    except (OSError, http.client.HTTPException) as exc:
+        return _runner_check_failed(label, url, f"Host runner health check failed: {exc}")
+
+    try:
+        data = json.loads(raw_body) if raw_body.strip() else {}
+    except ValueError:
+        data = {}
+    return _runner_check_result(label, url, data, status_code)
+
+
+def _check_health_targets_via_runner(
+    targets: dict, runner: dict, timeouts: dict | None = None, methods: dict | None = None
+) -> dict:
+    """Probe `{key: (label, url)}` targets through one `/check-urls` request to a host runner.
+
+    The runner probes them concurrently and answers with every result at once. Runners that
+    predate the batch endpoint answer 404 and get one `/check-url` request per target instead.
+    `timeouts` optionally maps keys to per-target probe timeouts (default 5s), `methods` to
+    probe methods (default `get`).
+    """
+    timeouts = timeouts or {}
+    methods = methods or {}
+    payload = {
+        "targets": [
+            {
+                "label": label,
+                "url": url,
+                "timeout_seconds": timeouts.get(key, 5),
+                "method": methods.get(key, "get"),
+            }
+            for key, (label, url) in targets.items()
+        ]
+    }
+    try:
+        status_code, raw_body = RUNNER_CLIENT.request(
+            runner, "POST", "/check-urls", payload, timeout=RUNNER_BATCH_CHECK_TIMEOUT_SECONDS
+        )
+    except (OSError, http.client.HTTPException) as exc:
+        detail = f"Host runner health check failed: {exc}"
+        return {key: _runner_check_failed(label, url, detail) for key, (label, url) in targets.items()}
+
+    if status_code == 404:
+        return run_checks(
+            {
+                key: lambda key=key, label=label, url=url: _check_health_target_via_runner(
+                    label, url, runner, timeouts.get(key, 5), methods.get(key, "get")
+                )
+                for key, (label, url) in targets.items()
+            },
+            lambda key, detail: _runner_check_failed(*targets[key], detail),
+        )
+
+    try:
+        data = json.loads(raw_body) if raw_body.strip() else {}
+    except ValueError:
+        data = {}
+    results = data.get("results") if isinstance(data, dict) else None
+    if not isinstance(results, list) or len(results) != len(targets):
+        detail = str((data or {}).get("detail") or "") if isinstance(data, dict) else ""
+        detail = detail or f"Host runner returned an invalid batch response (HTTP {status_code})."
+        return {key: _runner_check_failed(label, url, detail) for key, (label, url) in targets.items()}
+    return {
+        key: _runner_check_result(label, url, result, status_code)
+        for (key, (label, url)), result in zip(targets.items(), results)
+    }
+
+
+def _check_runner_targets_with_breakers(targets: dict, runner: dict, methods: dict | None = None) -> dict:
+    """`_check_health_targets_via_runner` behind the per-target circuit breakers.
+
+    Targets with an open breaker reuse their last result; the rest are probed in one batch with
+    their adaptive timeouts. Failures of the runner itself (`runner_error`) say nothing about the
+    target and leave its breaker as it was.
+    """
+    methods = methods or {}
+    breaker_keys = {
+        key: f"runner:{runner.get('slug') or ''}:{methods.get(key, 'get')}:{url}"
+        for key, (_label, url) in targets.items()
+    }
+    results = {}
+    probe = {}
+    for key, (label, url) in targets.items():
+        cached = HEALTH_BREAKERS.before_probe(breaker_keys[key])
+        if cached is None:
+            probe[key] = (label, url)
+        else:
+            results[key] = _short_circuited_check(label, url, cached, breaker_keys[key])
+    if probe:
+        timeouts = {key: HEALTH_BREAKERS.timeout_seconds(breaker_keys[key]) for key in probe}
+        try:
+            probed = _check_health_targets_via_runner(probe, runner, timeouts, methods)
+        except BaseException:
+            for key in probe:
+                HEALTH_BREAKERS.cancel_probe(breaker_keys[key])
+            raise
+        for key, result in probed.items():
+            if result.get("runner_error"):
+                HEALTH_BREAKERS.cancel_probe(breaker_keys[key])
+            else:
+                HEALTH_BREAKERS.record(breaker_keys[key], bool(result.get("ok")), result.get("duration_ms"), result)
+            results[key] = {**result, "breaker": HEALTH_BREAKERS.state(breaker_keys[key])}
+    return {key: results[key] for key in targets}
+
+
 def _summarize_health(snapshot: dict) -> str:
     configured = [
         entry["status"]
@@ -315,17 +496,32 @@ def _summarize_health(snapshot: dict) -> str:
     return "down"
 
 
-def _project_health_snapshot(project: dict) -> dict:
+def _project_health_check_plan(project: dict, hosts: dict[str, dict] | None = None) -> tuple[dict, dict]:
+    """Split a project's health checks into direct `{label: url}` and runner `{label: (url, runner)}` targets.
+
+    Runner targets are probed on the host runner, batched per runner by `_refresh_health_snapshots`.
+    """
+    public_url = str(project.get("health_public_url") or "")
     private_url = str(project.get("health_private_url") or "")
-    private_runner = _host_runner_config(_resolve_project_host(project))
-    checks = {
-        "public": _check_health_target("public", str(project.get("health_public_url") or "")),
-        "private": (
-            _check_health_target_via_runner("private", private_url, private_runner)
-            if private_url and private_runner
-            else _check_health_target("private", private_url)
-        ),
+    private_runner = _host_runner_config(_resolve_project_host(project, hosts))
+    direct_targets = {"public": public_url}
+    runner_targets = {}
+    if private_url and private_runner:
+        runner_targets["private"] = (private_url, private_runner)
+    else:
+        direct_targets["private"] = private_url
+    return direct_targets, runner_targets
+
+
+def _incomplete_health_check(project: dict, label: str, detail: str) -> dict:
+    return {
+        **_default_health_check(label, str(project.get(f"health_{label}_url") or "")),
+        "checked_at": _now_iso(),
+        "detail": detail,
     }
+
+
+def _project_snapshot_from_checks(project: dict, checks: dict) -> dict:
     return {
         "slug": project["slug"],
         "checked_at": _now_iso(),
@@ -334,6 +530,141 @@ def _project_health_snapshot(project: dict) -> dict:
     }
 
 
+def _refresh_health_snapshots(projects: list[dict], hosts: list[dict]) -> tuple[dict, dict]:
+    """Check every host runner and project target in one bounded fan-out and update the caches.
+
+    Identical targets are probed once per cycle: projects sharing a direct health URL (and probe
+    method) share one probe, and so do projects sharing a URL on the same host runner. The result fans out to
+    every project check that references it.
+    """
+    project_map = {project["slug"]: project for project in projects}
+    host_map = {host["slug"]: host for host in hosts}
+    checks = {}
+    for host in hosts:
+        checks[("host", host["slug"])] = lambda host=host: _check_host_runner(host)
+    deployment_hosts = host_index()
+    direct_probes: dict[tuple[str, str], list[tuple]] = {}
+    runner_batches: dict[tuple, tuple[dict, dict]] = {}
+    references = 0
+    for project in projects:
+        direct_targets, runner_targets = _project_health_check_plan(project, deployment_hosts)
+        method = project.get("health_probe_method") or "get"
+        for label, url in direct_targets.items():
+            if not url:
+                checks[("project", project["slug"], label)] = lambda label=label: _check_health_target(label, "")
+                continue
+            direct_probes.setdefault((url, method), []).append(("project", project["slug"], label))
+            references += 1
+        for label, (url, runner) in runner_targets.items():
+            batch_key = ("runner_batch", *RUNNER_CLIENT.endpoint_key(runner))
+            _runner, batch = runner_batches.setdefault(batch_key, (runner, {}))
+            batch.setdefault((url, method), []).append(("project", project["slug"], label))
+            references += 1
+    for target, refs in direct_probes.items():
+        label = refs[0][2]
+        checks[("probe", target)] = lambda label=label, target=target: HEALTH_PROBES.do(
+            ("direct", *target), lambda: _check_health_target(label, *target)
+        )
+    for batch_key, (runner, batch) in runner_batches.items():
+        targets = {target: (refs[0][2], target[0]) for target, refs in batch.items()}
+        methods = {target: target[1] for target in batch}
+        checks[batch_key] = lambda runner=runner, targets=targets, methods=methods: {
+            "results": _check_runner_targets_with_breakers(targets, runner, methods)
+        }
+    probes = len(direct_probes) + sum(len(batch) for _runner, batch in runner_batches.values())
+    if references > probes:
+        HEALTH_PROBES.add_coalesced(references - probes)
+
+    def on_incomplete(key, detail: str) -> dict:
+        if key[0] == "runner_batch":
+            return {
+                "results": {
+                    target: _incomplete_health_check(project_map[refs[0][1]], refs[0][2], detail)
+                    for target, refs in runner_batches[key][1].items()
+                }
+            }
+        if key[0] == "probe":
+            _kind, slug, label = direct_probes[key[1]][0]
+            return _incomplete_health_check(project_map[slug], label, detail)
+        if key[0] == "host":
+            host = host_map[key[1]]
+            return {
+                **_default_runner_snapshot(host, configured=bool(_host_runner_config(host))),
+                "checked_at": _now_iso(),
+                "detail": detail,
+            }
+        return _incomplete_health_check(project_map[key[1]], key[2], detail)
+
+    results = run_checks(checks, on_incomplete)
+    for target, refs in direct_probes.items():
+        result = results.pop(("probe", target))
+        for key in refs:
+            results[key] = {**result, "label": key[2]}
+    for batch_key, (_runner, batch) in runner_batches.items():
+        outcome = results.pop(batch_key)
+        for target, result in outcome["results"].items():
+            result.setdefault("duration_ms", outcome.get("duration_ms"))
+            for key in batch[target]:
+                results[key] = {**result, "label": key[2]}
+
+    changed_hosts = {}
+    host_snapshots = {}
+    for host in hosts:
+        snapshot = results[("host", host["slug"])]
+        previous = HOST_RUNNER_CACHE.get(host["slug"])
+        if not previous or previous.get("status") != snapshot.get("status"):
+            changed_hosts[host["slug"]] = snapshot.get("status")
+        HOST_RUNNER_CACHE[host["slug"]] = snapshot
+        host_snapshots[host["slug"]] = snapshot
+    changed_projects = {}
+    project_snapshots = {}
+    for project in projects:
+        project_checks = {
+            label: results[("project", project["slug"], label)] for label in ("public", "private")
+        }
+        snapshot = _project_snapshot_from_checks(project, project_checks)
+        _record_health_history(snapshot)
+        previous = PROJECT_HEALTH_CACHE.get(project["slug"])
+        if not previous or _health_signature(previous) != _health_signature(snapshot):
+            changed_projects[project["slug"]] = snapshot["summary"]
+        PROJECT_HEALTH_CACHE[project["slug"]] = snapshot
+        project_snapshots[project["slug"]] = snapshot
+    if changed_hosts or changed_projects:
+        EVENT_BROKER.publish("health", {"projects": changed_projects, "hosts": changed_hosts})
+    HEALTH_HISTORY.flush_if_due()
+    return project_snapshots, host_snapshots
+
+
+def _record_health_history(snapshot: dict) -> None:
+    target = f"project:{snapshot['slug']}"
+    checks = snapshot.get("checks") or {}
+    durations = [
+        check["duration_ms"] for check in checks.values() if isinstance(check.get("duration_ms"), (int, float))
+    ]
+    HEALTH_HISTORY.record(target, snapshot.get("summary"), duration_ms=max(durations) if durations else None)
+    for label, check in checks.items():
+        HEALTH_HISTORY.record(
+            f"{target}:{label}", check.get("status"), check.get("http_status"), check.get("duration_ms")
+        )
+
+
+def _health_signature(snapshot: dict) -> tuple:
+    """The parts of a project health snapshot the dashboard renders, without timestamps/timings."""
+    checks = snapshot.get("checks") or {}
+    return (
+        snapshot.get("summary"),
+        tuple(
+            (label, (checks.get(label) or {}).get("status"), (checks.get(label) or {}).get("http_status"))
+            for label in ("public", "private")
+        ),
+    )
+
+
+def _project_health_snapshot(project: dict) -> dict:
+    HEALTH_SCHEDULER.check_now(project_slugs=[project["slug"]], host_slugs=[])
+    return _project_health_snapshot_from_cache(project)
+
+
 def _project_health_snapshot_from_cache(project: dict) -> dict:
     cached = PROJECT_HEALTH_CACHE.get(project["slug"])
     if cached:
@@ -350,70 +681,6 @@ def _project_health_snapshot_from_cache(project: dict) -> dict:
     }
 
 
-def _dependency_status(snapshot: dict | None) -> str:
-    if not snapshot:
-        return "unknown"
-    return str(snapshot.get("summary") or "unknown")
-
-
-def _summarize_dependencies(items: list[dict]) -> str:
-    if not items:
-        return "none"
-    statuses = [item["status"] for item in items]
-    if any(status == "down" for status in statuses):
-        return "down"
-    if any(status == "unknown" for status in statuses):
-        return "unknown"
-    if any(status in {"degraded", "unconfigured"} for status in statuses):
-        return "degraded"
-    if all(status == "healthy" for status in statuses):
-        return "healthy"
-    return "degraded"
-
-
-def _project_dependency_snapshot(project: dict, project_map: dict[str, dict], snapshots: dict[str, dict]) -> dict:
-    dependencies = []
-    for dependency_slug in project.get("depends_on") or []:
-        dependency = project_map.get(dependency_slug)
-        snapshot = snapshots.get(dependency_slug)
-        dependencies.append(
-            {
-                "slug": dependency_slug,
-                "title": dependency.get("title") if dependency else dependency_slug,
-                "status": _dependency_status(snapshot),
-                "private_url": dependency.get("private_url") if dependency else "",
-            }
-        )
-    return {
-        "summary": _summarize_dependencies(dependencies),
-        "items": dependencies,
-    }
-
-
-def _project_ops_summary(health_summary: str, dependency_summary: str) -> str:
-    if health_summary == "unknown":
-        if dependency_summary in {"down", "degraded"}:
-            return "degraded"
-        return "unknown"
-    if health_summary == "down":
-        return "down"
-    if health_summary == "degraded":
-        return "degraded"
-    if health_summary == "unconfigured":
-        if dependency_summary in {"healthy", "none"}:
-            return "unconfigured"
-        if dependency_summary == "unknown":
-            return "unknown"
-        return "degraded"
-    if dependency_summary == "down":
-        return "degraded"
-    if dependency_summary == "unknown":
-        return "unknown"
-    if dependency_summary == "degraded":
-        return "degraded"
-    return health_summary
-
-
 def _action_runner_token(env_var_name: str = "HQ_ACTION_RUNNER_TOKEN") -> str:
     return str(os.getenv(env_var_name) or "").strip()
 
@@ -472,10 +739,15 @@ def _host_runner_config(host: dict | None) -> dict | None:
     return None
 
 
-def _resolve_project_host(project: dict) -> dict | None:
+def _resolve_project_host(project: dict, hosts: dict[str, dict] | None = None) -> dict | None:
+    """The project's deployment host, looked up in `hosts` (slug -> host) when given."""
     host_slug = str(project.get("deployment_host") or "").strip()
     if host_slug:
-        host = get_host(host_slug)
+        host = hosts.get(host_slug) if hosts is not None else None
+        # Records written before `deployment_host` was stored as a slug ("Pi" for host `pi`)
+        # miss the index; `get_host` slugifies the reference.
+        if host is None:
+            host = get_host(host_slug)
         if host:
             return host
     return None
@@ -498,38 +770,9 @@ def _check_host_runner(host: dict | None) -> dict:
     )
     checked_at = _now_iso()
 
-    headers = {}
-    token = str(runner.get("token") or "").strip()
-    if token:
-        headers["Authorization"] = f"Bearer {token}"
-
     try:
-        if transport == "socket":
-            class UnixHTTPConnection(http.client.HTTPConnection):
-                def __init__(self, socket_path: str):
-                    super().__init__("localhost")
-                    self._socket_path = socket_path
-
-                def connect(self):
-                    self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-                    self.sock.settimeout(self.timeout)
-                    self.sock.connect(self._socket_path)
-
-            connection = UnixHTTPConnection(endpoint)
-            connection.timeout = 10
-            connection.request("GET", "/health", headers=headers)
-            response = connection.getresponse()
-            raw_body = response.read().decode("utf-8")
-            status_code = response.status
-        else:
-            response = requests.get(
-                f"{str(runner.get('runner_url') or '').rstrip('/')}/health",
-                headers=headers,
-                timeout=10,
-            )
-            raw_body = response.text
-            status_code = response.status_code
-    except (requests.RequestException, OSError, http.client.HTTPException) as exc:
+        status_code, raw_body = RUNNER_CLIENT.request(runner, "GET", "/health", timeout=10)
+    except (OSError, http.client.HTTPException) as exc:
         return {
             "slug": slug,
             "title": title,
@@ -571,237 +814,171 @@ def _host_snapshot_from_cache(host: dict | None) -> dict:
     return _default_runner_snapshot(host, configured=bool(_host_runner_config(host)))
 
 
+def _load_health_targets() -> tuple[list[dict], list[dict]]:
+    return list_projects(), list_hosts()
+
+
+HEALTH_SCHEDULER = HealthScheduler(_load_health_targets, _refresh_health_snapshots)
+
+
 def _hosts_with_runtime_state(refresh_health: bool = False) -> list[dict]:
+    if refresh_health:
+        HEALTH_SCHEDULER.check_now(project_slugs=[])
     hosts = list_hosts()
-    decorated = []
-    for host in hosts:
-        if refresh_health:
-            snapshot = _check_host_runner(host)
-            HOST_RUNNER_CACHE[host["slug"]] = snapshot
-        else:
-            snapshot = _host_snapshot_from_cache(host)
-        decorated.append({**host, "runner_snapshot": snapshot})
-    return decorated
+    return [{**host, "runner_snapshot": _host_snapshot_from_cache(host)} for host in hosts]
 
 
 def _projects_with_runtime_state(refresh_health: bool = False) -> list[dict]:
-    projects = list_projects()
-    project_map = {project["slug"]: project for project in projects}
-    host_map = {host["slug"]: host for host in _hosts_with_runtime_state(refresh_health=refresh_health)}
     if refresh_health:
-        snapshots = {}
-        for project in projects:
-            snapshot = _project_health_snapshot(project)
-            PROJECT_HEALTH_CACHE[project["slug"]] = snapshot
-            snapshots[project["slug"]] = snapshot
-    else:
-        snapshots = {project["slug"]: _project_health_snapshot_from_cache(project) for project in projects}
+        HEALTH_SCHEDULER.check_now()
+    projects = list_projects()
+    snapshots = {project["slug"]: _project_health_snapshot_from_cache(project) for project in projects}
+    dependency_state = _sync_dependency_view(projects, snapshots)
+    host_map = {host["slug"]: host for host in _hosts_with_runtime_state()}
     decorated = []
     for project in projects:
-        dependency_snapshot = _project_dependency_snapshot(project, project_map, snapshots)
-        health_snapshot = snapshots[project["slug"]]
+        dependency_snapshot, ops_summary = dependency_state[project["slug"]]
+        host = _resolve_project_host(project, host_map)
         decorated.append(
             {
                 **project,
-                "host": host_map.get(str(project.get("deployment_host") or "").strip()),
-                "host_snapshot": (
-                    host_map.get(str(project.get("deployment_host") or "").strip(), {}).get("runner_snapshot")
-                    if host_map.get(str(project.get("deployment_host") or "").strip())
-                    else _host_snapshot_from_cache(None)
-                ),
-                "health_snapshot": health_snapshot,
+                "host": host,
+                "host_snapshot": host["runner_snapshot"] if host else _host_snapshot_from_cache(None),
+                "health_snapshot": snapshots[project["slug"]],
                 "dependency_snapshot": dependency_snapshot,
-                "ops_summary": _project_ops_summary(
-                    str(health_snapshot.get("summary") or "unconfigured"),
-                    str(dependency_snapshot.get("summary") or "none"),
-                ),
+                "ops_summary": ops_summary,
             }
         )
     return decorated
 
 
-def _run_project_command_local(command: str, runtime_path: str | None, action: str) -> dict:
-    started_at = _now_iso()
-    try:
-        completed = subprocess.run(
-            command,
-            cwd=runtime_path,
-            shell=True,
-            check=False,
-            capture_output=True,
-            text=True,
-            timeout=600,
-        )
-    except subprocess.TimeoutExpired as exc:
-        stdout = exc.stdout or ""
-        stderr = exc.stderr or ""
-        return {
-            "ok": False,
-            "action": action,
-            "command": command,
-            "cwd": runtime_path or "",
-            "exit_code": None,
-            "stdout": stdout,
-            "stderr": stderr,
-            "detail": "Command timed out after 600 seconds.",
-            "ran_at": started_at,
-        }
-    except OSError as exc:
-        return {
-            "ok": False,
-            "action": action,
-            "command": command,
-            "cwd": runtime_path or "",
-            "exit_code": None,
-            "stdout": "",
-            "stderr": str(exc),
-            "detail": str(exc),
-            "ran_at": started_at,
-        }
+def _sync_dependency_view(projects: list[dict], snapshots: dict[str, dict] | None = None) -> dict:
+    """Update the dependency view from cached health; slug -> (dependency_snapshot, ops_summary)."""
+    if snapshots is None:
+        snapshots = {project["slug"]: _project_health_snapshot_from_cache(project) for project in projects}
+    health = {slug: str(snapshot.get("summary") or "unconfigured") for slug, snapshot in snapshots.items()}
+    return DEPENDENCY_VIEW.sync(projects, health)
 
-    return {
-        "ok": completed.returncode == 0,
-        "action": action,
-        "command": command,
-        "cwd": runtime_path or "",
-        "exit_code": completed.returncode,
-        "stdout": completed.stdout,
-        "stderr": completed.stderr,
-        "detail": "Command completed successfully." if completed.returncode == 0 else "Command failed.",
-        "ran_at": started_at,
-    }
 
+def _resolve_project_command(project: dict, action: str) -> tuple[str, str | None, dict | None]:
+    """Return (command, runtime path, runner or None for local) for a project action."""
+    command_field = PROJECT_ACTION_COMMANDS.get(action)
+    if not command_field:
+        raise ProjectValidationError("Unsupported project action.")
+
+    command = str(project.get(command_field) or "").strip()
+    if not command:
+        raise ProjectValidationError(f"No {action} command configured for this project.")
+    runtime_path = str(project.get("runtime_path") or "").strip() or None
 
-def _run_project_command_via_runner(
+    host_slug = str(project.get("deployment_host") or "").strip()
+    host = get_host(host_slug) if host_slug else None
+    if host_slug:
+        if not host:
+            raise ProjectValidationError(f"Unknown deployment host '{host_slug}' for this project.")
+        runner = _host_runner_config(host)
+        if not runner:
+            raise ProjectValidationError(
+                f"Host '{host_slug}' does not have a runner configured for project actions."
+            )
+        return command, runtime_path, runner
+
+    host = _resolve_project_host(project)
+    return command, runtime_path, _host_runner_config(host)
+
+
+def _stream_project_command_local(command: str, runtime_path: str | None, action: str) -> Iterator[dict]:
+    started_at = _now_iso()
+    for record in iter_command_output(command, runtime_path, PROJECT_ACTION_TIMEOUT_SECONDS):
+        if record["type"] == "exit":
+            record.update({"action": action, "command": command, "cwd": runtime_path or "", "ran_at": started_at})
+        yield record
+
+
+def _stream_project_command_via_runner(
     project: dict,
     command: str,
     runtime_path: str | None,
     action: str,
     runner: dict,
-) -> dict:
-    runner_socket = str(runner.get("runner_socket_path") or "").strip()
-    runner_url = str(runner.get("runner_url") or "").strip()
-    runner_slug = str(runner.get("slug") or "")
-    runner_transport = str(runner.get("transport") or "")
-    if not runner_socket and not runner_url:
-        raise ProjectValidationError("Host action runner is not configured.")
-
-    headers = {"Content-Type": "application/json"}
-    token = str(runner.get("token") or "").strip()
-    if token:
-        headers["Authorization"] = f"Bearer {token}"
-
+) -> Iterator[dict]:
+    """Relay the runner's streaming `/run` records; always ends with exactly one `exit` record."""
+    context = {
+        "action": action,
+        "command": command,
+        "host_slug": str(runner.get("slug") or ""),
+        "runner_transport": str(runner.get("transport") or ""),
+        "cwd": runtime_path or "",
+    }
     payload = {
         "slug": project["slug"],
-        "host_slug": runner_slug,
+        "host_slug": context["host_slug"],
         "action": action,
         "command": command,
         "cwd": runtime_path or "",
-        "timeout_seconds": 600,
+        "timeout_seconds": PROJECT_ACTION_TIMEOUT_SECONDS,
+        "stream": True,
     }
 
-    try:
-        if runner_socket:
-            class UnixHTTPConnection(http.client.HTTPConnection):
-                def __init__(self, socket_path: str):
-                    super().__init__("localhost")
-                    self._socket_path = socket_path
-
-                def connect(self):
-                    self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-                    self.sock.settimeout(self.timeout)
-                    self.sock.connect(self._socket_path)
-
-            connection = UnixHTTPConnection(runner_socket)
-            connection.timeout = 610
-            connection.request("POST", "/run", body=json.dumps(payload), headers=headers)
-            response = connection.getresponse()
-            raw_body = response.read().decode("utf-8")
-            status_code = response.status
-        else:
-            response = requests.post(
-                f"{runner_url.rstrip('/')}/run",
-                headers=headers,
-                json=payload,
-                timeout=610,
-            )
-            raw_body = response.text
-            status_code = response.status_code
-    except (requests.RequestException, OSError, http.client.HTTPException) as exc:
+    def failed(detail: str) -> dict:
         return {
+            "type": "exit",
+            **context,
             "ok": False,
-            "action": action,
-            "command": command,
-            "host_slug": runner_slug,
-            "runner_transport": runner_transport,
-            "cwd": runtime_path or "",
             "exit_code": None,
             "stdout": "",
-            "stderr": str(exc),
-            "detail": f"Host action runner request failed: {exc}",
+            "stderr": detail,
+            "detail": detail,
             "ran_at": _now_iso(),
         }
 
     try:
-        data = json.loads(raw_body)
-    except ValueError:
-        raw = raw_body.strip()
-        data = {
-            "ok": False,
-            "action": action,
-            "command": command,
-            "cwd": runtime_path or "",
-            "exit_code": None,
-            "stdout": "",
-            "stderr": raw,
-            "detail": raw or "Host action runner returned a non-JSON response.",
-            "ran_at": _now_iso(),
-        }
-
-    if "action" not in data:
-        data["action"] = action
-    if "command" not in data:
-        data["command"] = command
-    if "host_slug" not in data:
-        data["host_slug"] = runner_slug
-    if "runner_transport" not in data:
-        data["runner_transport"] = runner_transport
-    if "cwd" not in data:
-        data["cwd"] = runtime_path or ""
-    if "ran_at" not in data:
-        data["ran_at"] = _now_iso()
-    if status_code >= 400 and "ok" not in data:
-        data["ok"] = False
-    return data
-
-
-def _run_project_command(project: dict, action: str) -> dict:
-    command_field = PROJECT_ACTION_COMMANDS.get(action)
-    if not command_field:
-        raise ProjectValidationError("Unsupported project action.")
-
-    command = str(project.get(command_field) or "").strip()
-    if not command:
-        raise ProjectValidationError(f"No {action} command configured for this project.")
-    runtime_path = str(project.get("runtime_path") or "").strip() or None
-
-    host_slug = str(project.get("deployment_host") or "").strip()
-    host = get_host(host_slug) if host_slug else None
-    if host_slug:
-        if not host:
-            raise ProjectValidationError(f"Unknown deployment host '{host_slug}' for this project.")
-        runner = _host_runner_config(host)
-        if not runner:
-            raise ProjectValidationError(
-                f"Host '{host_slug}' does not have a runner configured for project actions."
-            )
-        return _run_project_command_via_runner(project, command, runtime_path, action, runner)
+        release, response = RUNNER_CLIENT.open(
+            runner, "POST", "/run", payload, timeout=PROJECT_ACTION_TIMEOUT_SECONDS + 10, stream=True
+        )
+    except (OSError, http.client.HTTPException) as exc:
+        yield failed(f"Host action runner request failed: {exc}")
+        return
 
-    host = _resolve_project_host(project)
-    runner = _host_runner_config(host)
+    try:
+        if "ndjson" not in str(response.getheader("Content-Type") or ""):
+            # Validation errors, or an older runner that ignores `stream` and answers in one JSON body.
+            raw_body = response.read().decode("utf-8")
+            try:
+                data = json.loads(raw_body)
+            except ValueError:
+                data = {}
+            if not isinstance(data, dict) or not data:
+                yield failed(raw_body.strip() or "Host action runner returned a non-JSON response.")
+                return
+            if response.status >= 400:
+                data.setdefault("ok", False)
+            yield {"type": "exit", **context, "ran_at": _now_iso(), **data}
+            return
+
+        for raw_line in response:
+            if not raw_line.strip():
+                continue
+            record = json.loads(raw_line)
+            if record.get("type") == "exit":
+                yield {**context, **record}
+                return
+            yield record
+        yield failed("Host action runner stream ended without an exit record.")
+    except (OSError, http.client.HTTPException, ValueError) as exc:
+        yield failed(f"Host action runner stream failed: {exc}")
+    finally:
+        release()
+
+
+def _stream_project_command(
+    project: dict, action: str, resolved: tuple[str, str | None, dict | None] | None = None
+) -> Iterator[dict]:
+    """Resolve the action eagerly (raising `ProjectValidationError`) and return its lazy record stream."""
+    command, runtime_path, runner = resolved or _resolve_project_command(project, action)
     if runner:
-        return _run_project_command_via_runner(project, command, runtime_path, action, runner)
-    return _run_project_command_local(command, runtime_path, action)
+        return _stream_project_command_via_runner(project, command, runtime_path, action, runner)
+    return _stream_project_command_local(command, runtime_path, action)
 
 def scan_tools():
     """
@@ -849,9 +1026,19 @@ def scan_tools():
 async def lifespan(app: FastAPI):
     # --- STARTUP LOGIC ---
     init_db()
+    interrupted = fail_unfinished_action_jobs("Controller restarted before the action finished.")
+    if interrupted:
+        print(f"[Actions] Marked {interrupted} unfinished action job(s) as failed.")
+    try:
+        HEALTH_HISTORY.load()
+    except Exception as exc:
+        print(f"[Health] Could not load health history: {exc}")
     ensure_projects_store()
     ensure_hosts_store()
     print("--- Controller Startup ---")
+    # Recovery: fold any journal left by the previous run into the registry snapshots.
+    if REGISTRY_COMPACTOR.compact_all():
+        print("[Registry] Compacted registry journals from the previous run.")
 
     # 1. DYNAMIC DISCOVERY
     tools_config = scan_tools()
@@ -914,6 +1101,13 @@ async def lifespan(app: FastAPI):
             print(f"[Auto-Start] Launching {t['name']}...")
             ProcessManager.launch_tool(t["name"])
 
+    LOG_ROTATOR.start()
+    REGISTRY_COMPACTOR.start()
+
+    if scheduler_enabled():
+        HEALTH_SCHEDULER.start()
+        print("[Health] Background health scheduler started.")
+
     print("--- Startup Complete ---\n")
 
     # --- YIELD CONTROL TO APP ---
@@ -921,6 +1115,19 @@ async def lifespan(app: FastAPI):
 
     # --- SHUTDOWN LOGIC ---
     print("--- Controller Shutdown ---")
+    HEALTH_SCHEDULER.stop()
+    try:
+        HEALTH_HISTORY.flush()
+    except Exception as exc:
+        print(f"[Health] Could not save health history: {exc}")
+    STATUS_MONITOR.stop()
+    LOG_ROTATOR.stop()
+    REGISTRY_COMPACTOR.stop()
+    close_registries()
+    ACTION_JOBS.shutdown()
+    RUNNER_CLIENT.close()
+    HEALTH_SESSIONS.close()
+    await TOOL_PROXY.aclose()
 
 
 # -------------------------------------------------------------
@@ -1036,6 +1243,7 @@ def remove_project(slug: str):
         project = delete_project(slug)
     except ProjectValidationError as exc:
         return JSONResponse(status_code=400, content={"detail": str(exc)})
+    HEALTH_HISTORY.forget(f"project:{project['slug']}")
     return {"project": project}
 
 
@@ -1066,41 +1274,239 @@ def check_project_health(slug: str):
     project = get_project(slug)
     if not project:
         return JSONResponse(status_code=404, content={"detail": "Project not found."})
-    snapshot = _project_health_snapshot(project)
-    PROJECT_HEALTH_CACHE[project["slug"]] = snapshot
-    return snapshot
+    return _project_health_snapshot(project)
+
+
+@app.get("/projects/{slug}/health/history")
+def get_project_health_history(slug: str, recent: int = 20):
+    """Uptime, latency percentiles and flaps over 1h/24h/7d, plus the most recent results."""
+    project = get_project(slug)
+    if not project:
+        return JSONResponse(status_code=404, content={"detail": "Project not found."})
+    target = f"project:{project['slug']}"
+    recent = max(0, min(recent, 500))
+    return {
+        "slug": project["slug"],
+        "summary": HEALTH_HISTORY.summary(target, recent),
+        "checks": {label: HEALTH_HISTORY.summary(f"{target}:{label}", recent) for label in ("public", "private")},
+    }
+
+
+@app.get("/projects/{slug}/impact")
+def get_project_impact(slug: str):
+    """Transitive blast radius: projects that depend on this one, and what it depends on."""
+    project = get_project(slug)
+    if not project:
+        return JSONResponse(status_code=404, content={"detail": "Project not found."})
+    _sync_dependency_view(list_projects())
+    return DEPENDENCY_VIEW.impact(project["slug"])
 
 
 @app.post("/projects/{slug}/action")
 def run_project_action(slug: str, payload: dict):
+    """Submit a project action as a background job and return it immediately (202)."""
     project = get_project(slug)
     if not project:
         return JSONResponse(status_code=404, content={"detail": "Project not found."})
 
     action = str(payload.get("action") or "").strip().lower()
     try:
-        result = _run_project_command(project, action)
+        resolved = _resolve_project_command(project, action)
+        records = _stream_project_command(project, action, resolved)
     except ProjectValidationError as exc:
         return JSONResponse(status_code=400, content={"detail": str(exc)})
-    except Exception as exc:
-        return JSONResponse(
-            status_code=500,
-            content={
-                "ok": False,
-                "action": action,
-                "command": "",
-                "cwd": str(project.get("runtime_path") or ""),
-                "exit_code": None,
-                "stdout": "",
-                "stderr": str(exc),
-                "detail": str(exc),
-                "ran_at": _now_iso(),
-            },
-        )
 
-    if result["ok"]:
-        return result
-    return JSONResponse(status_code=500, content=result)
+    job = _submit_action_job(slug, action, resolved, records)
+    return JSONResponse(status_code=202, content={"job": job, "status_url": f"/actions/{job['id']}"})
+
+
+def _submit_action_job(slug: str, action: str, resolved: tuple, records: Iterator[dict]) -> dict:
+    command, runtime_path, runner = resolved
+    job = create_action_job(
+        slug,
+        action,
+        history_limit=action_job_history(),
+        command=command,
+        cwd=runtime_path or "",
+        host_slug=str((runner or {}).get("slug") or ""),
+        runner_transport=str((runner or {}).get("transport") or ""),
+    )
+    ACTION_JOBS.submit(slug, job["id"], records)
+    return job
+
+
+def _run_bulk_step(slug: str, action: str) -> dict:
+    """One project of a bulk plan: submit its action job and block until it finishes.
+
+    Time spent queued behind the project's other jobs does not count against the step; a job
+    still running after its own timeout comes back `timed_out` and is left alone.
+    """
+    project = get_project(slug)
+    if not project:
+        raise ProjectValidationError("Project not found.")
+    resolved = _resolve_project_command(project, action)
+    job = _submit_action_job(project["slug"], action, resolved, _stream_project_command(project, action, resolved))
+    ACTION_JOBS.wait_started(job["id"])
+    if not ACTION_JOBS.wait(job["id"], timeout=BULK_STEP_TIMEOUT_SECONDS):
+        detail = f"Action job {job['id']} is still running; later waves were not started."
+        return {**job, "ok": False, "timed_out": True, "detail": detail}
+    return get_action_job(job["id"]) or job
+
+
+BULK_ACTIONS = BulkActions(_run_bulk_step)
+
+
+@app.post("/projects/bulk-action")
+def run_bulk_project_action(payload: dict):
+    """Run one action across `slugs` (or every project on `host`) in dependency-ordered waves (202)."""
+    action = str(payload.get("action") or "").strip().lower()
+    if action not in PROJECT_ACTION_COMMANDS:
+        return JSONResponse(status_code=400, content={"detail": "Unsupported project action."})
+    host_slug = str(payload.get("host") or "").strip()
+    slugs = payload.get("slugs")
+    if bool(host_slug) == (slugs is not None):
+        return JSONResponse(status_code=400, content={"detail": "Provide either slugs or host."})
+    if host_slug:
+        if not get_host(host_slug):
+            return JSONResponse(status_code=404, content={"detail": "Host not found."})
+        projects = list_projects_on_host(host_slug)
+    else:
+        if not isinstance(slugs, list):
+            return JSONResponse(status_code=400, content={"detail": "slugs must be an array."})
+        catalog = {project["slug"]: project for project in list_projects()}
+        unknown = [str(slug) for slug in slugs if str(slug) not in catalog]
+        if unknown:
+            return JSONResponse(status_code=400, content={"detail": f"Unknown project(s): {', '.join(unknown)}."})
+        projects = [catalog[slug] for slug in dict.fromkeys(str(slug) for slug in slugs)]
+    if not projects:
+        return JSONResponse(status_code=400, content={"detail": "No projects selected."})
+
+    problems = []
+    for project in projects:
+        try:
+            _resolve_project_command(project, action)
+        except ProjectValidationError as exc:
+            problems.append(f"{project['slug']} ({exc})")
+    if problems:
+        return JSONResponse(status_code=400, content={"detail": f"Cannot {action}: {'; '.join(problems)}"})
+
+    graph = DependencyGraph(
+        {project["slug"]: list(project.get("depends_on") or []) for project in list_projects()}
+    )
+    on_cycle = sorted(graph.cyclic & {project["slug"] for project in projects})
+    if on_cycle:
+        detail = f"Cannot order projects on a dependency cycle: {', '.join(on_cycle)}."
+        return JSONResponse(status_code=400, content={"detail": detail})
+    waves = graph.waves([project["slug"] for project in projects])
+    if action == "stop":
+        waves.reverse()  # stop dependents before the projects they rely on
+    hosts = {project["slug"]: str(project.get("deployment_host") or "") for project in projects}
+    plan = BULK_ACTIONS.submit(action, waves, hosts)
+    return JSONResponse(status_code=202, content={"plan": plan, "status_url": f"/actions/bulk/{plan['id']}"})
+
+
+@app.get("/projects/{slug}/actions")
+def get_project_actions(slug: str, limit: int = 20):
+    if not get_project(slug):
+        return JSONResponse(status_code=404, content={"detail": "Project not found."})
+    jobs = list_action_jobs(slug, limit=max(1, min(limit, 200)))
+    return {"jobs": [_with_live_output(job) for job in jobs]}
+
+
+@app.get("/actions/bulk/{plan_id}")
+def get_bulk_action(plan_id: int):
+    plan = BULK_ACTIONS.get(plan_id)
+    if not plan:
+        return JSONResponse(status_code=404, content={"detail": "Bulk action not found."})
+    return plan
+
+
+@app.get("/actions/{job_id}")
+def get_action(job_id: int):
+    job = get_action_job(job_id)
+    if not job:
+        return JSONResponse(status_code=404, content={"detail": "Action job not found."})
+    return _with_live_output(job)
+
+
+def _with_live_output(job: dict) -> dict:
+    if job["status"] == "running":
+        live = ACTION_JOBS.live_output(job["id"])
+        if live:
+            job.update(live)
+    return job
+
+
+@app.post("/projects/{slug}/action/stream")
+def stream_project_action(slug: str, payload: dict):
+    """Submit a project action as a job and stream its output as NDJSON, ending with an exit record.
+
+    The action queues behind other jobs of the same project like `POST /projects/{slug}/action`
+    and is recorded in the job history; a client that disconnects stops following, not the job.
+    """
+    project = get_project(slug)
+    if not project:
+        return JSONResponse(status_code=404, content={"detail": "Project not found."})
+
+    action = str(payload.get("action") or "").strip().lower()
+    try:
+        resolved = _resolve_project_command(project, action)
+        records = _stream_project_command(project, action, resolved)
+    except ProjectValidationError as exc:
+        return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+    job = _submit_action_job(project["slug"], action, resolved, records)
+    return StreamingResponse(
+        (json.dumps(record) + "\n" for record in _follow_action_job(job)),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _follow_action_job(job: dict) -> Iterator[dict]:
+    yield from ACTION_JOBS.follow(job["id"])
+    ACTION_JOBS.wait(job["id"], timeout=PROJECT_ACTION_TIMEOUT_SECONDS + 60)
+    finished = get_action_job(job["id"]) or job
+    yield {
+        "type": "exit",
+        "job_id": job["id"],
+        "action": finished["action"],
+        "command": finished["command"],
+        "host_slug": finished["host_slug"],
+        "runner_transport": finished["runner_transport"],
+        "cwd": finished["cwd"],
+        "status": finished["status"],
+        "ok": bool(finished.get("ok")),
+        "exit_code": finished.get("exit_code"),
+        "stdout": finished.get("stdout") or "",
+        "stderr": finished.get("stderr") or "",
+        "truncated": bool(finished.get("truncated")),
+        "detail": finished.get("detail") or "",
+        "ran_at": finished.get("started_at"),
+    }
+
+
+@app.get("/metrics")
+def get_metrics():
+    return {
+        "tool_registry": tool_cache_stats(),
+        "projects_registry": registry_cache_stats(),
+        "hosts_registry": hosts_cache_stats(),
+        "registry_journal": REGISTRY_COMPACTOR.stats(),
+        "tool_proxy": TOOL_PROXY.stats(),
+        "widget_rewrite": WIDGET_REWRITE_CACHE.stats(),
+        "health_scheduler": HEALTH_SCHEDULER.stats(),
+        "health_history": HEALTH_HISTORY.stats(),
+        "health_breakers": HEALTH_BREAKERS.stats(),
+        "bulk_actions": BULK_ACTIONS.stats(),
+        "health_probes": HEALTH_PROBES.stats(),
+        "health_sessions": HEALTH_SESSIONS.stats(),
+        "dependency_graph": DEPENDENCY_VIEW.stats(),
+        "events": {**EVENT_BROKER.stats(), "status_polls": STATUS_MONITOR.polls},
+        "supervisor": SUPERVISOR.stats(),
+        "runner_client": RUNNER_CLIENT.stats(),
+        "action_jobs": ACTION_JOBS.stats(),
+    }
 
 
 @app.get("/tools")
@@ -1129,23 +1535,71 @@ def register_tool(payload: dict):
     tool = add_tool(name, process_path, port)
     return {"registered": tool.as_dict()}
 
-@app.get("/tools/status-all")
-def get_all_tool_statuses():
-    """Checks the status of all tools in one go."""
+def _tool_statuses() -> list[dict]:
     all_tools = list_tools()
+    checks = ProcessManager.statuses(all_tools)
     results = []
-    
+
     for tool in all_tools:
-        # Re-use the logic from ProcessManager without the HTTP overhead
-        alive_check = ProcessManager.is_alive(tool["name"])
+        alive_check = checks[tool["name"]]
         results.append({
             "name": tool["name"],
             "alive": alive_check["alive"],
             "pid": alive_check.get("pid"),
-            "port": tool["port"] # Include port so UI doesn't need to look it up
+            "port": tool["port"], # Include port so UI doesn't need to look it up
+            "exit_code": tool.get("exit_code"),
         })
-        
-    return {"tools": results}
+    return results
+
+
+STATUS_MONITOR = ToolStatusMonitor(_tool_statuses, EVENT_BROKER)
+
+
+def _publish_tool_exit(name: str, pid: int, exit_code: int) -> None:
+    EVENT_BROKER.publish("tool_exit", {"name": name, "pid": pid, "exit_code": exit_code})
+    STATUS_MONITOR.poke()
+
+
+SUPERVISOR.add_listener(_publish_tool_exit)
+
+
+@app.get("/tools/status-all")
+def get_all_tool_statuses():
+    """Checks the status of all tools in one go."""
+    return {"tools": STATUS_MONITOR.poll()}
+
+
+@app.get("/events")
+async def stream_events(request: Request):
+    """Server-sent events: a `snapshot` of tool statuses, then `tool_status`/`health` deltas."""
+    queue = EVENT_BROKER.subscribe()
+    try:
+        tools = await run_in_threadpool(STATUS_MONITOR.poll)
+    except Exception:
+        EVENT_BROKER.unsubscribe(queue)
+        raise
+    STATUS_MONITOR.start()
+
+    async def event_stream():
+        try:
+            yield format_sse({"id": 0, "event": "snapshot", "data": {"tools": tools}})
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(event)
+        finally:
+            EVENT_BROKER.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 # -------------------------------------------------------------
 # Process Management Routes
@@ -1153,6 +1607,7 @@ def get_all_tool_statuses():
 @app.post("/tools/{name}/launch")
 def launch_tool(name: str):
     result = ProcessManager.launch_tool(name)
+    STATUS_MONITOR.poke()
     if "error" in result:
         return JSONResponse(status_code=400, content=result)
     return result
@@ -1160,6 +1615,7 @@ def launch_tool(name: str):
 @app.post("/tools/{name}/kill")
 def kill_tool(name: str):
     result = ProcessManager.kill_tool(name)
+    STATUS_MONITOR.poke()
     if "error" in result:
         return JSONResponse(status_code=400, content=result)
     return result
@@ -1169,6 +1625,64 @@ def tool_alive(name: str):
     return ProcessManager.is_alive(name)
 
 
+@app.get("/tools/{name}/logs")
+async def tool_logs(
+    name: str,
+    request: Request,
+    stream: str = "out",
+    offset: int | None = None,
+    tail: int | None = None,
+    limit: int = 64 * 1024,
+    wait: float = 0,
+    follow: bool = False,
+):
+    """Read a tool's stdout/stderr log from a byte offset (or the last `tail` bytes).
+
+    `wait` long-polls up to that many seconds for new bytes; `follow` switches to a server-sent
+    event stream of `log` chunks. Reads are bounded by `limit`, so huge logs tail in constant memory.
+    """
+    if not get_tool_by_name(name):
+        return JSONResponse(status_code=404, content={"detail": "Tool not found."})
+    if stream not in LOG_STREAMS:
+        return JSONResponse(status_code=400, content={"detail": f"stream must be one of {', '.join(LOG_STREAMS)}."})
+    path = log_path(name, stream)
+
+    if follow:
+        async def follow_stream():
+            position, tail_bytes, event_id = offset, tail if offset is None else None, 0
+            idle = 0.0
+            while True:
+                chunk = await run_in_threadpool(read_log, path, position, tail_bytes, limit)
+                tail_bytes = None
+                position = chunk["next_offset"]
+                if chunk["data"] or chunk["rotated"]:
+                    event_id += 1
+                    idle = 0.0
+                    yield format_sse({"id": event_id, "event": "log", "data": chunk})
+                    if not chunk["eof"]:
+                        continue
+                if await request.is_disconnected():
+                    break
+                await asyncio.sleep(LOG_POLL_SECONDS)
+                idle += LOG_POLL_SECONDS
+                if idle >= SSE_KEEPALIVE_SECONDS:
+                    idle = 0.0
+                    yield ": keepalive\n\n"
+
+        return StreamingResponse(
+            follow_stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    chunk = await run_in_threadpool(read_log, path, offset, tail, limit)
+    deadline = asyncio.get_running_loop().time() + max(0.0, min(wait, LOG_WAIT_MAX_SECONDS))
+    while not chunk["data"] and not chunk["rotated"] and asyncio.get_running_loop().time() < deadline:
+        await asyncio.sleep(LOG_POLL_SECONDS)
+        chunk = await run_in_threadpool(read_log, path, chunk["next_offset"], None, limit)
+    return {"name": name, "stream": stream, **chunk}
+
+
 @app.post("/tools/{name}/auto-start")
 def set_tool_auto_start(name: str, payload: dict):
     tool = get_tool_by_name(name)
@@ -1190,32 +1704,124 @@ def set_tool_auto_start(name: str, payload: dict):
     return {"name": name, "auto_start": enabled}
 
 
-def _rewrite_widget_content(content: bytes, tool_name: str, content_type: str) -> bytes:
-    """Rewrite absolute root paths in proxied widget HTML/JS to stay under controller proxy."""
-    if "text/html" not in content_type and "javascript" not in content_type:
-        return content
+def _is_rewritable_content(content_type: str) -> bool:
+    return "text/html" in content_type or "javascript" in content_type
 
-    try:
-        text = content.decode("utf-8")
-    except UnicodeDecodeError:
-        return content
-
-    prefix = f"/proxy/{tool_name}/"
-    replacements = [
-        ('src="/', f'src="{prefix}'),
-        ("src='/", f"src='{prefix}"),
-        ('href="/', f'href="{prefix}'),
-        ("href='/", f"href='{prefix}"),
-        ('action="/', f'action="{prefix}'),
-        ("action='/", f"action='{prefix}"),
-        ('fetch("/', f'fetch("{prefix}'),
-        ("fetch('/", f"fetch('{prefix}"),
-    ]
 
-    for before, after in replacements:
-        text = text.replace(before, after)
+def _proxy_request_headers(request: Request) -> dict:
+    headers = {}
+    for h in PROXY_REQUEST_HEADERS:
+        value = request.headers.get(h)
+        if value:
+            headers[h] = value
+    return headers
 
-    return text.encode("utf-8")
+
+def _proxy_response_headers(resp: httpx.Response, *, streaming: bool) -> dict:
+    """Pick upstream headers to forward; length/range headers only survive untouched bodies."""
+    names = PROXY_RESPONSE_HEADERS
+    if streaming:
+        names = names + PROXY_STREAM_RESPONSE_HEADERS
+    out_headers = {}
+    for h in names:
+        value = resp.headers.get(h)
+        if value:
+            out_headers[h] = value
+    return out_headers
+
+
+def _widget_cache_key(path: str, request: Request) -> str:
+    """Rewrite cache key: the proxied path plus its query string, which can select another body."""
+    query = request.url.query
+    return f"{path}?{query}" if query else path
+
+
+def _cached_widget_validator(name: str, cache_key: str, request: Request) -> str | None:
+    if request.method != "GET":
+        return None
+    cached = WIDGET_REWRITE_CACHE.latest(name, cache_key)
+    if not cached or not is_http_validator(cached[0]):
+        return None
+    return cached[0]
+
+
+def _with_revalidation(headers: dict, cached_etag: str | None) -> dict:
+    """Ask the tool whether our cached widget body is still current alongside the client's own tags."""
+    if not cached_etag:
+        return headers
+    tags = parse_if_none_match(headers.get("if-none-match"))
+    if cached_etag not in tags:
+        tags.append(cached_etag)
+    return {**headers, "if-none-match": ", ".join(tags)}
+
+
+async def _not_modified_widget_response(
+    name: str,
+    cache_key: str,
+    request: Request,
+    resp: httpx.Response,
+    cached_etag: str,
+):
+    """Answer an upstream 304 from the controller's copy unless the client already has it."""
+    await resp.aclose()
+    etag = resp.headers.get("etag") or cached_etag
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"etag": etag})
+    cached = WIDGET_REWRITE_CACHE.latest(name, cache_key)
+    if not cached or cached[0] != etag:
+        return None
+    WIDGET_REWRITE_CACHE.mark_revalidated(name, cache_key)
+    headers = {"etag": etag}
+    if cached[2]:
+        headers["content-type"] = cached[2]
+    return Response(content=cached[1], status_code=200, headers=headers)
+
+
+async def _rewritten_widget_response(name: str, cache_key: str, request: Request, resp: httpx.Response):
+    """Serve widget HTML/JS with root paths rewritten, reusing cached output when the body is unchanged."""
+    headers = _proxy_response_headers(resp, streaming=False)
+    cacheable = request.method == "GET" and resp.status_code == 200
+    etag = resp.headers.get("etag") if cacheable else None
+    if etag:
+        headers["etag"] = etag
+
+    if etag:
+        cached = WIDGET_REWRITE_CACHE.get(name, cache_key, etag)
+        if cached is not None:
+            await resp.aclose()
+            return Response(content=cached, status_code=resp.status_code, headers=headers)
+
+        async def rewrite_stream():
+            rewriter = WidgetRewriter(name)
+            produced = []
+            try:
+                async for chunk in resp.aiter_bytes(PROXY_STREAM_CHUNK_SIZE):
+                    piece = rewriter.feed(chunk)
+                    produced.append(piece)
+                    yield piece
+                piece = rewriter.flush()
+                produced.append(piece)
+                yield piece
+            finally:
+                await resp.aclose()
+            WIDGET_REWRITE_CACHE.put(name, cache_key, etag, b"".join(produced), headers.get("content-type", ""))
+
+        return StreamingResponse(rewrite_stream(), status_code=resp.status_code, headers=headers)
+
+    # Without an upstream validator the body has to be read anyway to key the cache by content hash.
+    try:
+        content = await resp.aread()
+    finally:
+        await resp.aclose()
+    if not cacheable:
+        return Response(content=rewrite_widget_body(content, name), status_code=resp.status_code, headers=headers)
+
+    validator = content_validator(content)
+    payload = WIDGET_REWRITE_CACHE.get(name, cache_key, validator)
+    if payload is None:
+        payload = rewrite_widget_body(content, name)
+        WIDGET_REWRITE_CACHE.put(name, cache_key, validator, payload, headers.get("content-type", ""))
+    return Response(content=payload, status_code=resp.status_code, headers=headers)
 
 
 @app.api_route("/proxy/{name}/{path:path}", methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"])
@@ -1227,25 +1833,21 @@ async def proxy_tool_http(name: str, path: str, request: Request):
     if not tool.port:
         return JSONResponse(status_code=400, content={"detail": "No port assigned."})
 
-    target_url = f"http://127.0.0.1:{tool.port}/{path}"
+    client = TOOL_PROXY.client_for(name, tool.port)
     body = await request.body()
-
-    headers = {}
-    content_type = request.headers.get("content-type")
-    if content_type:
-        headers["content-type"] = content_type
+    cache_key = _widget_cache_key(path, request)
+    cached_etag = _cached_widget_validator(name, cache_key, request)
+    upstream_request = client.build_request(
+        request.method,
+        f"/{path}",
+        params=request.query_params,
+        content=body if body else None,
+        headers=_with_revalidation(_proxy_request_headers(request), cached_etag),
+    )
 
     try:
-        resp = requests.request(
-            method=request.method,
-            url=target_url,
-            params=request.query_params,
-            data=body if body else None,
-            headers=headers,
-            timeout=30,
-            allow_redirects=False,
-        )
-    except requests.exceptions.ConnectionError:
+        resp = await client.send(upstream_request, stream=True)
+    except (httpx.ConnectError, httpx.ConnectTimeout):
         return JSONResponse(
             status_code=502,
             content={"detail": f"Tool '{name}' unreachable on port {tool.port}."},
@@ -1253,16 +1855,22 @@ async def proxy_tool_http(name: str, path: str, request: Request):
     except Exception as e:
         return JSONResponse(status_code=500, content={"detail": str(e)})
 
-    response_content_type = resp.headers.get("content-type", "")
-    payload = _rewrite_widget_content(resp.content, name, response_content_type)
-
-    out_headers = {}
-    for h in ("content-type", "cache-control", "location"):
-        value = resp.headers.get(h)
-        if value:
-            out_headers[h] = value
+    if resp.status_code == 304 and cached_etag:
+        not_modified = await _not_modified_widget_response(name, cache_key, request, resp, cached_etag)
+        if not_modified is not None:
+            return not_modified
+        return Response(status_code=304, headers=_proxy_response_headers(resp, streaming=True))
 
-    return Response(content=payload, status_code=resp.status_code, headers=out_headers)
+    response_content_type = resp.headers.get("content-type", "")
+    if _is_rewritable_content(response_content_type):
+        return await _rewritten_widget_response(name, cache_key, request, resp)
+
+    return StreamingResponse(
+        resp.aiter_raw(PROXY_STREAM_CHUNK_SIZE),
+        status_code=resp.status_code,
+        headers=_proxy_response_headers(resp, streaming=True),
+        background=BackgroundTask(resp.aclose),
+    )
 
 # -------------------------------------------------------------
 # Generic Tool Proxy
@@ -1276,7 +1884,7 @@ async def proxy_tool_command(name: str, action: str, request: Request):
     if not tool.port:
         return JSONResponse(status_code=400, content={"detail": "No port assigned."})
 
-    target_url = f"http://127.0.0.1:{tool.port}/{action}"
+    client = TOOL_PROXY.client_for(name, tool.port)
 
     json_body = None
     if request.method == "POST":
@@ -1287,12 +1895,12 @@ async def proxy_tool_command(name: str, action: str, request: Request):
 
     try:
         if request.method == "GET":
-            resp = requests.get(target_url, timeout=5)
+            resp = await client.get(f"/{action}", timeout=5)
         else:
-            resp = requests.post(target_url, json=json_body, timeout=5)
+            resp = await client.post(f"/{action}", json=json_body, timeout=5)
         return resp.json()
 
-    except requests.exceptions.ConnectionError:
+    except (httpx.ConnectError, httpx.ConnectTimeout):
         return JSONResponse(
             status_code=502, 
             content={"detail": f"Tool '{name}' unreachable on port {tool.port}."}
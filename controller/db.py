@@ -1,11 +1,16 @@
 from datetime import datetime
 from sqlalchemy import (
-    Column, Integer, String, DateTime, create_engine
+    Boolean, Column, Integer, String, DateTime, Text, UniqueConstraint, create_engine, inspect, text
 )
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 from pathlib import Path
+import json
 import os
+import threading
+import time
+from collections import OrderedDict
 BASE_DIR = Path(__file__).resolve().parent
 DB_PATH = os.getenv("CONTROLLER_DB_PATH", str(BASE_DIR / "tools.db"))
 
@@ -33,6 +38,8 @@ class Tool(Base):
     status = Column(String, default="stopped")
     last_heartbeat = Column(DateTime, nullable=True)
     registered_at = Column(DateTime, default=datetime.utcnow)
+    exit_code = Column(Integer, nullable=True)      # last exit seen by the supervisor
+    exited_at = Column(DateTime, nullable=True)
 
     def as_dict(self):
         return {
@@ -46,15 +53,167 @@ class Tool(Base):
                 self.last_heartbeat.isoformat() if self.last_heartbeat else None
             ),
             "registered_at": self.registered_at.isoformat(),
+            "exit_code": self.exit_code,
+            "exited_at": self.exited_at.isoformat() if self.exited_at else None,
         }
 
 
+class ActionJob(Base):
+    """One project action (deploy/start/restart/stop/logs) submitted through the job queue."""
+
+    __tablename__ = "action_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_slug = Column(String, index=True)
+    action = Column(String)
+    status = Column(String, default="queued")    # queued | running | succeeded | failed
+    command = Column(String, default="")
+    host_slug = Column(String, default="")
+    runner_transport = Column(String, default="")
+    cwd = Column(String, default="")
+    ok = Column(Boolean, nullable=True)
+    exit_code = Column(Integer, nullable=True)
+    detail = Column(String, default="")
+    stdout = Column(Text, default="")           # bounded tail, see controller/command_stream.py
+    stderr = Column(Text, default="")
+    truncated = Column(Boolean, default=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    def as_dict(self):
+        def iso(value):
+            return value.isoformat() + "Z" if value else None
+
+        return {
+            "id": self.id,
+            "project_slug": self.project_slug,
+            "action": self.action,
+            "status": self.status,
+            "command": self.command or "",
+            "host_slug": self.host_slug or "",
+            "runner_transport": self.runner_transport or "",
+            "cwd": self.cwd or "",
+            "ok": self.ok,
+            "exit_code": self.exit_code,
+            "detail": self.detail or "",
+            "stdout": self.stdout or "",
+            "stderr": self.stderr or "",
+            "truncated": bool(self.truncated),
+            "created_at": iso(self.created_at),
+            "started_at": iso(self.started_at),
+            "finished_at": iso(self.finished_at),
+            "duration_ms": (
+                round((self.finished_at - self.started_at).total_seconds() * 1000)
+                if self.started_at and self.finished_at
+                else None
+            ),
+        }
+
+
+class HealthRollup(Base):
+    """Downsampled health results for one target and bucket, see controller/health_history.py."""
+
+    __tablename__ = "health_rollups"
+    __table_args__ = (UniqueConstraint("target", "resolution", "bucket_start"),)
+
+    id = Column(Integer, primary_key=True)
+    target = Column(String, index=True)          # project:<slug> or project:<slug>:<label>
+    resolution = Column(Integer)                 # bucket width in seconds
+    bucket_start = Column(Integer, index=True)   # epoch seconds
+    samples = Column(Integer, default=0)
+    up = Column(Integer, default=0)
+    flaps = Column(Integer, default=0)
+    latency_samples = Column(Integer, default=0)
+    histogram = Column(Text, default="[]")       # JSON list of latency bin counts
+
+
 # -------------------------------------------------------------
 # Database initialization
 # -------------------------------------------------------------
+# Columns added after the first release; `create_all` does not alter existing tables.
+_ADDED_COLUMNS = {
+    "exit_code": "INTEGER",
+    "exited_at": "DATETIME",
+}
+
+
 def init_db():
     Path(DB_PATH).parent.mkdir(parents=True, exist_ok=True)
     Base.metadata.create_all(bind=engine)
+    existing = {column["name"] for column in inspect(engine).get_columns("tools")}
+    with engine.begin() as conn:
+        for name, sql_type in _ADDED_COLUMNS.items():
+            if name not in existing:
+                conn.execute(text(f"ALTER TABLE tools ADD COLUMN {name} {sql_type}"))
+
+
+# -------------------------------------------------------------
+# In-memory registry cache
+# -------------------------------------------------------------
+# Tool rows are read on every proxied request and status poll but change only on
+# launch/kill/discovery, so reads are served from memory and every write drops the entry.
+# Names with no row are remembered separately in a small LRU with a TTL, so lookups of
+# arbitrary names (e.g. `/proxy/<anything>/`) cannot grow the cache without bound.
+TOOL_MISS_CACHE_SIZE = 256
+TOOL_MISS_TTL_SECONDS = 30.0
+_tool_cache: dict[str, Tool] = {}
+_tool_misses: OrderedDict[str, float] = OrderedDict()
+_tool_cache_complete = False
+_tool_cache_generation = 0
+_tool_cache_lock = threading.Lock()
+_tool_cache_stats = {"hits": 0, "misses": 0, "invalidations": 0, "skipped_writes": 0}
+
+
+def _cached_tool(name):
+    """Return (found, tool) from the cache, counting the lookup."""
+    with _tool_cache_lock:
+        if name in _tool_cache:
+            _tool_cache_stats["hits"] += 1
+            return True, _tool_cache[name]
+        expires_at = _tool_misses.get(name)
+        if expires_at is not None:
+            if expires_at > time.monotonic():
+                _tool_misses.move_to_end(name)
+                _tool_cache_stats["hits"] += 1
+                return True, None
+            del _tool_misses[name]
+        if _tool_cache_complete:
+            # Every row is loaded, so an absent name is a known miss in the DB too.
+            _tool_cache_stats["hits"] += 1
+            return True, None
+        _tool_cache_stats["misses"] += 1
+        return False, None
+
+
+def _invalidate_tool(name):
+    global _tool_cache_complete, _tool_cache_generation
+    with _tool_cache_lock:
+        _tool_cache.pop(name, None)
+        _tool_misses.pop(name, None)
+        _tool_cache_complete = False
+        _tool_cache_generation += 1
+        _tool_cache_stats["invalidations"] += 1
+
+
+def _skip_write(name, **fields):
+    """True when the cached row already holds these values, so the UPDATE would be a no-op."""
+    with _tool_cache_lock:
+        tool = _tool_cache.get(name)
+        if tool is None or any(getattr(tool, key) != value for key, value in fields.items()):
+            return False
+        _tool_cache_stats["skipped_writes"] += 1
+        return True
+
+
+def tool_cache_stats():
+    with _tool_cache_lock:
+        return {
+            **_tool_cache_stats,
+            "entries": len(_tool_cache),
+            "miss_entries": len(_tool_misses),
+            "complete": _tool_cache_complete,
+        }
 
 
 # -------------------------------------------------------------
@@ -77,17 +236,34 @@ def add_tool(name, process_path, port):
     session.commit()
     session.refresh(tool)
     session.close()
+    _invalidate_tool(name)
     return tool
 
 
 def get_tool_by_name(name):
+    found, tool = _cached_tool(name)
+    if found:
+        return tool
+    generation = _tool_cache_generation
     session = get_session()
     tool = session.query(Tool).filter(Tool.name == name).first()
     session.close()
+    with _tool_cache_lock:
+        # A write that landed while we were querying makes this row stale; don't cache it.
+        if generation == _tool_cache_generation:
+            if tool is not None:
+                _tool_cache[name] = tool
+            else:
+                _tool_misses[name] = time.monotonic() + TOOL_MISS_TTL_SECONDS
+                _tool_misses.move_to_end(name)
+                while len(_tool_misses) > TOOL_MISS_CACHE_SIZE:
+                    _tool_misses.popitem(last=False)
     return tool
 
 
 def update_tool_pid(name, pid):
+    if _skip_write(name, pid=pid, status="running" if pid else "stopped"):
+        return
     session = get_session()
     tool = session.query(Tool).filter(Tool.name == name).first()
     if tool:
@@ -95,15 +271,49 @@ def update_tool_pid(name, pid):
         tool.status = "running" if pid else "stopped"
         session.commit()
     session.close()
+    _invalidate_tool(name)
 
 
 def update_tool_status(name, status):
+    if _skip_write(name, status=status):
+        return
     session = get_session()
     tool = session.query(Tool).filter(Tool.name == name).first()
     if tool:
         tool.status = status
         session.commit()
     session.close()
+    _invalidate_tool(name)
+
+
+def mark_tools_stopped(names):
+    """Clear the pid and mark several tools stopped in one transaction."""
+    names = [name for name in names if not _skip_write(name, pid=None, status="stopped")]
+    if not names:
+        return
+    session = get_session()
+    session.query(Tool).filter(Tool.name.in_(names)).update(
+        {Tool.pid: None, Tool.status: "stopped"}, synchronize_session=False
+    )
+    session.commit()
+    session.close()
+    for name in names:
+        _invalidate_tool(name)
+
+
+def record_tool_exit(name, pid, exit_code):
+    """Store a supervised child's exit; the pid is cleared only if it still belongs to that child."""
+    session = get_session()
+    tool = session.query(Tool).filter(Tool.name == name).first()
+    if tool and tool.pid in (pid, None):
+        if tool.pid == pid:
+            tool.pid = None
+            tool.status = "stopped"
+        tool.exit_code = exit_code
+        tool.exited_at = datetime.utcnow()
+        session.commit()
+    session.close()
+    _invalidate_tool(name)
 
 
 def update_tool_metadata(name, process_path=None, port=None):
@@ -116,10 +326,158 @@ def update_tool_metadata(name, process_path=None, port=None):
             tool.port = port
         session.commit()
     session.close()
+    _invalidate_tool(name)
 
 
 def list_tools():
+    global _tool_cache_complete
+    with _tool_cache_lock:
+        if _tool_cache_complete:
+            _tool_cache_stats["hits"] += 1
+            tools = [tool for tool in _tool_cache.values() if tool is not None]
+            return [t.as_dict() for t in sorted(tools, key=lambda t: t.id)]
+        _tool_cache_stats["misses"] += 1
+        generation = _tool_cache_generation
     session = get_session()
     tools = session.query(Tool).all()
     session.close()
+    with _tool_cache_lock:
+        if generation == _tool_cache_generation:
+            _tool_cache.clear()
+            _tool_misses.clear()
+            _tool_cache.update({t.name: t for t in tools})
+            _tool_cache_complete = True
     return [t.as_dict() for t in tools]
+
+
+# -------------------------------------------------------------
+# Action jobs
+# -------------------------------------------------------------
+def create_action_job(project_slug, action, history_limit=50, **fields):
+    """Insert a queued job and prune the project's history to the newest `history_limit` rows."""
+    session = get_session()
+    job = ActionJob(project_slug=project_slug, action=action, status="queued", **fields)
+    session.add(job)
+    session.commit()
+    stale_ids = [
+        row.id
+        for row in session.query(ActionJob.id)
+        .filter(ActionJob.project_slug == project_slug, ActionJob.status.in_(("succeeded", "failed")))
+        .order_by(ActionJob.id.desc())
+        .offset(history_limit)
+    ]
+    if stale_ids:
+        session.query(ActionJob).filter(ActionJob.id.in_(stale_ids)).delete(synchronize_session=False)
+        session.commit()
+    result = job.as_dict()
+    session.close()
+    return result
+
+
+def update_action_job(job_id, **fields):
+    session = get_session()
+    session.query(ActionJob).filter(ActionJob.id == job_id).update(fields, synchronize_session=False)
+    session.commit()
+    session.close()
+
+
+def get_action_job(job_id):
+    session = get_session()
+    job = session.query(ActionJob).filter(ActionJob.id == job_id).first()
+    result = job.as_dict() if job else None
+    session.close()
+    return result
+
+
+def list_action_jobs(project_slug, limit=20):
+    session = get_session()
+    jobs = (
+        session.query(ActionJob)
+        .filter(ActionJob.project_slug == project_slug)
+        .order_by(ActionJob.id.desc())
+        .limit(limit)
+        .all()
+    )
+    result = [job.as_dict() for job in jobs]
+    session.close()
+    return result
+
+
+def fail_unfinished_action_jobs(detail):
+    """Mark jobs left queued/running by a previous controller process as failed."""
+    session = get_session()
+    count = (
+        session.query(ActionJob)
+        .filter(ActionJob.status.in_(("queued", "running")))
+        .update(
+            {ActionJob.status: "failed", ActionJob.ok: False, ActionJob.detail: detail,
+             ActionJob.finished_at: datetime.utcnow()},
+            synchronize_session=False,
+        )
+    )
+    session.commit()
+    session.close()
+    return count
+
+
+# -------------------------------------------------------------
+# Health history rollups
+# -------------------------------------------------------------
+_ROLLUP_FIELDS = ("samples", "up", "flaps", "latency_samples")
+
+
+def save_health_rollups(rows):
+    """Upsert `{"target", "resolution", "bucket_start", samples..., "histogram": [...]}` rows."""
+    values = [{**row, "histogram": json.dumps(row["histogram"])} for row in rows]
+    with engine.begin() as conn:
+        # Chunked to stay under SQLite's bound-parameter limit.
+        for offset in range(0, len(values), 100):
+            statement = sqlite_insert(HealthRollup).values(values[offset:offset + 100])
+            statement = statement.on_conflict_do_update(
+                index_elements=["target", "resolution", "bucket_start"],
+                set_={name: statement.excluded[name] for name in (*_ROLLUP_FIELDS, "histogram")},
+            )
+            conn.execute(statement)
+
+
+def load_health_rollups(since):
+    session = get_session()
+    rows = (
+        session.query(HealthRollup)
+        .filter(HealthRollup.bucket_start >= since)
+        .order_by(HealthRollup.bucket_start)
+        .all()
+    )
+    result = [
+        {
+            "target": row.target,
+            "resolution": row.resolution,
+            "bucket_start": row.bucket_start,
+            **{name: getattr(row, name) for name in _ROLLUP_FIELDS},
+            "histogram": json.loads(row.histogram or "[]"),
+        }
+        for row in rows
+    ]
+    session.close()
+    return result
+
+
+def delete_health_rollups(target):
+    """Delete a target's rollups together with its sub-targets' (`<target>:<label>`)."""
+    session = get_session()
+    count = (
+        session.query(HealthRollup)
+        .filter((HealthRollup.target == target) | HealthRollup.target.startswith(f"{target}:", autoescape=True))
+        .delete(synchronize_session=False)
+    )
+    session.commit()
+    session.close()
+    return count
+
+
+def prune_health_rollups(before):
+    session = get_session()
+    count = session.query(HealthRollup).filter(HealthRollup.bucket_start < before).delete(synchronize_session=False)
+    session.commit()
+    session.close()
+    return count
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import heapq
+import threading
+from collections import deque
+
+
+def _path_between(edges: dict[str, list[str]], starts: list[str], target: str) -> list[str] | None:
+    """A `depends_on` path from one of `starts` to `target`, or None."""
+    parents: dict[str, str | None] = {}
+    stack = []
+    for start in starts:
+        if start not in parents:
+            parents[start] = None
+            stack.append(start)
+    while stack:
+        node = stack.pop()
+        if node == target:
+            path = [node]
+            while parents[path[-1]] is not None:
+                path.append(parents[path[-1]])
+            return list(reversed(path))
+        for following in edges.get(node, ()):
+            if following not in parents:
+                parents[following] = node
+                stack.append(following)
+    return None
+
+
+def check_dependencies(slug: str, depends_on: list[str], projects: dict[str, dict]) -> None:
+    """Validate a project's new `depends_on` against the rest of the catalog (slug -> project).
+
+    Rejects self-dependencies, slugs that are not in the catalog and edges that would close a
+    cycle; the error names the cycle path.
+    """
+    from controller.projects_registry import ProjectValidationError
+
+    if slug in depends_on:
+        raise ProjectValidationError("A project cannot depend on itself.")
+    unknown = [dependency for dependency in depends_on if dependency not in projects]
+    if unknown:
+        raise ProjectValidationError(f"Unknown depends_on project(s): {', '.join(unknown)}.")
+    edges = {other: list(project.get("depends_on") or []) for other, project in projects.items()}
+    edges[slug] = list(depends_on)
+    path = _path_between(edges, list(depends_on), slug)
+    if path:
+        raise ProjectValidationError(f"depends_on would create a cycle: {' -> '.join([slug, *path])}.")
+
+
+class DependencyGraph:
+    """Project `depends_on` edges with reverse edges and a topological order.
+
+    `order` lists dependencies before their dependents. Projects on a cycle (only possible
+    through hand edits; writes are validated) come last, and `missing` records edges to slugs
+    that are not in the catalog.
+    """
+
+    def __init__(self, edges: dict[str, list[str]]):
+        self.depends_on = {
+            slug: [dependency for dependency in deps if dependency in edges and dependency != slug]
+            for slug, deps in edges.items()
+        }
+        self.missing = {
+            slug: missing
+            for slug, deps in edges.items()
+            if (missing := [dependency for dependency in deps if dependency not in edges])
+        }
+        self.dependents: dict[str, list[str]] = {slug: [] for slug in edges}
+        for slug, deps in self.depends_on.items():
+            for dependency in deps:
+                self.dependents[dependency].append(slug)
+
+        indegree = {slug: len(deps) for slug, deps in self.depends_on.items()}
+        ready = deque(sorted(slug for slug, count in indegree.items() if count == 0))
+        order = []
+        while ready:
+            slug = ready.popleft()
+            order.append(slug)
+            for dependent in sorted(self.dependents[slug]):
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    ready.append(dependent)
+        self.cyclic = set(edges) - set(order)
+        self.order = order + sorted(self.cyclic)
+        self.position = {slug: index for index, slug in enumerate(self.order)}
+
+    def _walk(self, slug: str, neighbours: dict[str, list[str]]) -> list[dict]:
+        depths = {slug: 0}
+        queue = deque([slug])
+        while queue:
+            current = queue.popleft()
+            for following in neighbours.get(current, ()):
+                if following not in depths:
+                    depths[following] = depths[current] + 1
+                    queue.append(following)
+        del depths[slug]
+        return [
+            {"slug": other, "depth": depth}
+            for other, depth in sorted(depths.items(), key=lambda item: self.position[item[0]])
+        ]
+
+    def downstream(self, slug: str) -> list[dict]:
+        """Every project that depends on `slug`, directly (depth 1) or transitively."""
+        return self._walk(slug, self.dependents)
+
+    def upstream(self, slug: str) -> list[dict]:
+        """Every project `slug` depends on, directly or transitively."""
+        return self._walk(slug, self.depends_on)
+
+    def waves(self, slugs: list[str]) -> list[list[str]]:
+        """Group `slugs` into waves so every project comes after the selected projects it depends on.
+
+        Dependencies are followed through projects outside the selection, so if `web -> api -> db`
+        and only `web` and `db` are selected, `db` still goes first. Projects in one wave do not
+        depend on each other. Callers should reject selections that touch `cyclic`.
+        """
+        selected = set(slugs)
+        # Most selected projects on any dependency path above each project.
+        above: dict[str, int] = {}
+        for slug in self.order:
+            above[slug] = max(
+                (above.get(dependency, 0) + (dependency in selected) for dependency in self.depends_on[slug]),
+                default=0,
+            )
+        waves: dict[int, list[str]] = {}
+        for slug in sorted(selected & set(self.order), key=self.position.__getitem__):
+            waves.setdefault(above[slug], []).append(slug)
+        return [waves[level] for level in sorted(waves)]
+
+
+def summarize_dependencies(items: list[dict]) -> str:
+    if not items:
+        return "none"
+    statuses = [item["status"] for item in items]
+    if any(status == "down" for status in statuses):
+        return "down"
+    if any(status == "unknown" for status in statuses):
+        return "unknown"
+    if any(status in {"degraded", "unconfigured"} for status in statuses):
+        return "degraded"
+    if all(status == "healthy" for status in statuses):
+        return "healthy"
+    return "degraded"
+
+
+def ops_summary(health_summary: str, dependency_summary: str) -> str:
+    if health_summary == "unknown":
+        if dependency_summary in {"down", "degraded"}:
+            return "degraded"
+        return "unknown"
+    if health_summary == "down":
+        return "down"
+    if health_summary == "degraded":
+        return "degraded"
+    if health_summary == "unconfigured":
+        if dependency_summary in {"healthy", "none"}:
+            return "unconfigured"
+        if dependency_summary == "unknown":
+            return "unknown"
+        return "degraded"
+    if dependency_summary == "down":
+        return "degraded"
+    if dependency_summary == "unknown":
+        return "unknown"
+    if dependency_summary == "degraded":
+        return "degraded"
+    return health_summary
+
+
+class DependencyView:
+    """Dependency snapshots and ops summaries for the catalog, maintained incrementally.
+
+    A dependency's status is its own `ops_summary`, so trouble propagates down the graph. The
+    graph and every summary are rebuilt only when the catalog's edges (or the titles/URLs shown
+    in dependency items) change. A health change re-evaluates that project and then, in
+    topological order, only the dependents whose inputs actually changed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fingerprint: tuple | None = None
+        self.graph = DependencyGraph({})
+        self._projects: dict[str, dict] = {}
+        self._health: dict[str, str] = {}
+        self._snapshots: dict[str, dict] = {}
+        self._ops: dict[str, str] = {}
+        self.rebuilds = 0
+        self.evaluations = 0
+
+    def sync(self, projects: list[dict], health: dict[str, str]) -> dict[str, tuple[dict, str]]:
+        """Bring the view up to date; returns slug -> (dependency_snapshot, ops_summary)."""
+        fingerprint = tuple(
+            (
+                project["slug"],
+                project.get("title"),
+                project.get("private_url"),
+                tuple(project.get("depends_on") or []),
+            )
+            for project in projects
+        )
+        with self._lock:
+            if fingerprint != self._fingerprint:
+                self._rebuild(projects, health, fingerprint)
+            else:
+                changed = [slug for slug, summary in health.items() if self._health.get(slug) != summary]
+                self._health.update(health)
+                self._propagate(changed)
+            return {slug: (self._snapshots[slug], self._ops[slug]) for slug in self._projects}
+
+    def _rebuild(self, projects: list[dict], health: dict[str, str], fingerprint: tuple) -> None:
+        self._fingerprint = fingerprint
+        self._projects = {project["slug"]: project for project in projects}
+        self.graph = DependencyGraph(
+            {slug: list(project.get("depends_on") or []) for slug, project in self._projects.items()}
+        )
+        self._health = dict(health)
+        self._snapshots = {}
+        self._ops = {}
+        for slug in self.graph.order:
+            self._snapshots[slug], self._ops[slug] = self._evaluate(slug)
+        self.rebuilds += 1
+
+    def _propagate(self, changed: list[str]) -> None:
+        position = self.graph.position
+        health_changed = {slug for slug in changed if slug in position}
+        queued = set(health_changed)
+        heap = [(position[slug], slug) for slug in queued]
+        heapq.heapify(heap)
+        while heap:
+            _index, slug = heapq.heappop(heap)
+            snapshot, ops = self._evaluate(slug)
+            ops_changed = ops != self._ops.get(slug)
+            self._snapshots[slug], self._ops[slug] = snapshot, ops
+            # Direct dependents show this project's health in their items; further down only
+            # the ops summary matters.
+            if not ops_changed and slug not in health_changed:
+                continue
+            for dependent in self.graph.dependents.get(slug, ()):
+                if dependent not in queued:
+                    queued.add(dependent)
+                    heapq.heappush(heap, (position[dependent], dependent))
+
+    def _evaluate(self, slug: str) -> tuple[dict, str]:
+        self.evaluations += 1
+        items = []
+        for dependency_slug in self._projects[slug].get("depends_on") or []:
+            dependency = self._projects.get(dependency_slug)
+            health = self._health.get(dependency_slug, "unknown") if dependency else "unknown"
+            items.append(
+                {
+                    "slug": dependency_slug,
+                    "title": dependency.get("title") if dependency else dependency_slug,
+                    "status": self._ops.get(dependency_slug, health) if dependency else "unknown",
+                    "health": health,
+                    "private_url": dependency.get("private_url") if dependency else "",
+                }
+            )
+        snapshot = {"summary": summarize_dependencies(items), "items": items}
+        return snapshot, ops_summary(self._health.get(slug, "unconfigured"), snapshot["summary"])
+
+    def impact(self, slug: str) -> dict:
+        """Transitive blast radius of `slug`: who is affected if it fails, and what it relies on."""
+        with self._lock:
+            def describe(entries):
+                return [
+                    {
+                        **entry,
+                        "title": self._projects[entry["slug"]].get("title"),
+                        "ops_summary": self._ops.get(entry["slug"], "unknown"),
+                    }
+                    for entry in entries
+                ]
+
+            return {
+                "slug": slug,
+                "ops_summary": self._ops.get(slug, "unknown"),
+                "dependents": describe(self.graph.downstream(slug)),
+                "dependencies": describe(self.graph.upstream(slug)),
+                "missing_dependencies": list(self.graph.missing.get(slug, [])),
+                "on_cycle": slug in self.graph.cyclic,
+            }
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "projects": len(self._projects),
+                "rebuilds": self.rebuilds,
+                "evaluations": self.evaluations,
+                "cyclic": len(self.graph.cyclic),
+            }
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from itertools import count
+
+
+class EventBroker:
+    """Fan-out of controller events to `/events` subscribers.
+
+    `publish` is safe to call from any thread (status monitor, health scheduler, request
+    handlers); each subscriber is an asyncio queue drained by its own SSE response. A subscriber
+    that falls too far behind has its backlog replaced by a single `resync` event, which tells the
+    client to refetch full state instead of replaying every missed delta.
+    """
+
+    def __init__(self, max_queue: int = 256):
+        self.max_queue = max_queue
+        self._subscribers: dict[asyncio.Queue, asyncio.AbstractEventLoop] = {}
+        self._lock = threading.Lock()
+        self._ids = count(1)
+        self.published = 0
+        self.resyncs = 0
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue)
+        with self._lock:
+            self._subscribers[queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        with self._lock:
+            self._subscribers.pop(queue, None)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, event_type: str, data: dict) -> None:
+        with self._lock:
+            event = {"id": next(self._ids), "event": event_type, "data": data}
+            subscribers = list(self._subscribers.items())
+            self.published += 1
+        for queue, loop in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._deliver, queue, event)
+            except RuntimeError:  # subscriber's loop already closed
+                self.unsubscribe(queue)
+
+    def _deliver(self, queue: asyncio.Queue, event: dict) -> None:
+        if queue.full():
+            while not queue.empty():
+                queue.get_nowait()
+            with self._lock:
+                self.resyncs += 1
+            event = {"id": event["id"], "event": "resync", "data": {}}
+        queue.put_nowait(event)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "published": self.published,
+                "resyncs": self.resyncs,
+            }
+
+
+def format_sse(event: dict) -> str:
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
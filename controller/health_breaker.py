@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from datetime import datetime, UTC
+
+
+def failure_threshold() -> int:
+    raw = str(os.getenv("HQ_HEALTH_BREAKER_FAILURES") or "3").strip()
+    try:
+        return max(1, min(int(raw), 100))
+    except ValueError:
+        return 3
+
+
+def open_base_seconds() -> float:
+    raw = str(os.getenv("HQ_HEALTH_BREAKER_OPEN_SECONDS") or "120").strip()
+    try:
+        return max(1.0, min(float(raw), 86400.0))
+    except ValueError:
+        return 120.0
+
+
+def open_max_seconds() -> float:
+    raw = str(os.getenv("HQ_HEALTH_BREAKER_MAX_OPEN_SECONDS") or "900").strip()
+    try:
+        return max(1.0, min(float(raw), 86400.0))
+    except ValueError:
+        return 900.0
+
+
+def timeout_min_seconds() -> float:
+    raw = str(os.getenv("HQ_HEALTH_TIMEOUT_MIN_SECONDS") or "1").strip()
+    try:
+        return max(0.05, min(float(raw), 60.0))
+    except ValueError:
+        return 1.0
+
+
+def timeout_max_seconds() -> float:
+    raw = str(os.getenv("HQ_HEALTH_TIMEOUT_MAX_SECONDS") or "5").strip()
+    try:
+        return max(0.05, min(float(raw), 60.0))
+    except ValueError:
+        return 5.0
+
+
+def _iso(epoch: float | None) -> str | None:
+    if not epoch:
+        return None
+    return datetime.fromtimestamp(epoch, UTC).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+
+
+class _Target:
+    __slots__ = ("failures", "state", "open_until", "opened", "srtt", "rttvar", "rto", "last_result", "probing")
+
+    def __init__(self):
+        self.failures = 0
+        self.state = "closed"          # closed | open | half_open
+        self.open_until = 0.0
+        self.opened = 0                # consecutive open periods, for the backoff
+        self.srtt: float | None = None
+        self.rttvar = 0.0
+        self.rto: float | None = None
+        self.last_result: dict | None = None
+        self.probing = False
+
+
+class HealthBreakers:
+    """Per-target circuit breakers and adaptive timeouts for health probes.
+
+    After `HQ_HEALTH_BREAKER_FAILURES` consecutive failures a target's breaker opens: until
+    `next_probe_at` callers get the last "down" result back without probing. Then one caller
+    probes (half-open); success closes the breaker, failure reopens it for twice as long, up to
+    `HQ_HEALTH_BREAKER_MAX_OPEN_SECONDS`.
+
+    The probe timeout follows the target's observed latency like a TCP retransmission timer:
+    smoothed latency plus four times its mean deviation, doubled after each failure, clamped to
+    `HQ_HEALTH_TIMEOUT_MIN_SECONDS`..`HQ_HEALTH_TIMEOUT_MAX_SECONDS`. Targets with no successful
+    probe yet get the maximum.
+    """
+
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._targets: dict[str, _Target] = {}
+        self.short_circuited = 0
+
+    def _target(self, key: str) -> _Target:
+        target = self._targets.get(key)
+        if target is None:
+            target = self._targets[key] = _Target()
+        return target
+
+    def before_probe(self, key: str) -> dict | None:
+        """None if the caller should probe now; otherwise the cached result to reuse."""
+        now = self._clock()
+        with self._lock:
+            target = self._target(key)
+            if target.state == "closed":
+                return None
+            if target.state == "open" and now >= target.open_until and not target.probing:
+                target.state = "half_open"
+                target.probing = True
+                return None
+            self.short_circuited += 1
+            return dict(target.last_result or {})
+
+    def timeout_seconds(self, key: str) -> float:
+        with self._lock:
+            target = self._targets.get(key)
+            rto = target.rto if target else None
+        high = timeout_max_seconds()
+        if rto is None:
+            return high
+        return round(max(timeout_min_seconds(), min(rto, high)), 3)
+
+    def record(self, key: str, ok: bool, duration_ms: float | None, result: dict) -> None:
+        now = self._clock()
+        with self._lock:
+            target = self._target(key)
+            target.probing = False
+            target.last_result = dict(result)
+            if ok:
+                if isinstance(duration_ms, (int, float)):
+                    self._observe_latency(target, duration_ms / 1000.0)
+                target.failures = 0
+                target.opened = 0
+                target.state = "closed"
+                target.open_until = 0.0
+                return
+            target.failures += 1
+            if target.rto is not None:
+                target.rto = min(target.rto * 2, timeout_max_seconds())
+            if target.state == "half_open" or target.failures >= failure_threshold():
+                hold = min(open_base_seconds() * (2 ** target.opened), open_max_seconds())
+                target.opened += 1
+                target.state = "open"
+                target.open_until = now + hold
+
+    def cancel_probe(self, key: str) -> None:
+        """Release a claimed probe that produced no verdict; the next caller may probe again."""
+        with self._lock:
+            target = self._targets.get(key)
+            if target is None:
+                return
+            target.probing = False
+            if target.state == "half_open":
+                target.state = "open"
+
+    @staticmethod
+    def _observe_latency(target: _Target, seconds: float) -> None:
+        # RFC 6298 smoothing: alpha 1/8 for the mean, beta 1/4 for the deviation.
+        if target.srtt is None:
+            target.srtt = seconds
+            target.rttvar = seconds / 2
+        else:
+            target.rttvar = 0.75 * target.rttvar + 0.25 * abs(target.srtt - seconds)
+            target.srtt = 0.875 * target.srtt + 0.125 * seconds
+        target.rto = target.srtt + 4 * target.rttvar
+
+    def state(self, key: str) -> dict:
+        timeout = self.timeout_seconds(key)
+        with self._lock:
+            target = self._targets.get(key) or _Target()
+            return {
+                "state": target.state,
+                "consecutive_failures": target.failures,
+                "next_probe_at": _iso(target.open_until) if target.state == "open" else None,
+                "timeout_seconds": timeout,
+            }
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "targets": len(self._targets),
+                "open": sum(1 for target in self._targets.values() if target.state != "closed"),
+                "short_circuited": self.short_circuited,
+            }
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Hashable
+
+
+def max_concurrency() -> int:
+    raw = str(os.getenv("HQ_HEALTH_MAX_CONCURRENCY") or "16").strip()
+    try:
+        return max(1, min(int(raw), 128))
+    except ValueError:
+        return 16
+
+
+def deadline_seconds() -> float:
+    raw = str(os.getenv("HQ_HEALTH_DEADLINE_SECONDS") or "15").strip()
+    try:
+        return max(0.05, min(float(raw), 600.0))
+    except ValueError:
+        return 15.0
+
+
+def _timed(check: Callable[[], dict]) -> dict:
+    started = time.perf_counter()
+    result = check()
+    result = dict(result) if isinstance(result, dict) else {}
+    result["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+def run_checks(
+    checks: dict[Hashable, Callable[[], dict]],
+    on_incomplete: Callable[[Hashable, str], dict],
+    *,
+    concurrency: int | None = None,
+    deadline: float | None = None,
+) -> dict[Hashable, dict]:
+    """Run independent health checks concurrently and return whatever finished by the deadline.
+
+    Every result gets a `duration_ms`. Checks still running at the deadline (or that raised) are
+    reported through `on_incomplete(key, detail)` instead of holding up the whole refresh; their
+    worker threads finish in the background and their results are dropped.
+    """
+    if not checks:
+        return {}
+    limit = deadline if deadline is not None else deadline_seconds()
+    workers = min(concurrency or max_concurrency(), len(checks))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hq-health")
+    started = time.perf_counter()
+    try:
+        futures = {executor.submit(_timed, check): key for key, check in checks.items()}
+        done, _pending = wait(futures, timeout=limit)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    waited = round(time.perf_counter() - started, 3)
+
+    results = {}
+    for future, key in futures.items():
+        if future in done and not future.cancelled() and future.exception() is None:
+            results[key] = future.result()
+            continue
+        if future in done and not future.cancelled():
+            detail = f"Health check failed: {future.exception()}"
+        else:
+            detail = f"Health check did not finish within the {limit:g}s refresh deadline."
+        result = dict(on_incomplete(key, detail))
+        result["duration_ms"] = round(waited * 1000, 1)
+        results[key] = result
+    return results
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: dict | None = None
+        self.error: BaseException | None = None
+
+
+class Singleflight:
+    """Collapses concurrent calls for the same key onto one execution.
+
+    The first caller for a key runs the call; callers that arrive while it is in flight wait
+    and get a copy of its result (or its exception) instead of running it again. `coalesced`
+    counts duplicates removed before they were scheduled (see `add_coalesced`), `joined` counts
+    callers that waited on an in-flight call.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: dict[Hashable, _Flight] = {}
+        self.calls = 0
+        self.joined = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, call: Callable[[], dict]) -> dict:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.calls += 1
+            else:
+                self.joined += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return dict(flight.result or {})
+        try:
+            flight.result = call()
+            return flight.result
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def add_coalesced(self, count: int) -> None:
+        with self._lock:
+            self.coalesced += count
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "probes": self.calls,
+                "coalesced": self.coalesced,
+                "joined": self.joined,
+                "in_flight": len(self._flights),
+            }
@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+# (window name, window seconds, bucket seconds): minute buckets for the last hour, quarter-hour
+# buckets for the last day, hourly buckets for the last week.
+WINDOWS = (("1h", 3600, 60), ("24h", 86400, 900), ("7d", 604800, 3600))
+
+# Latency histogram bin upper bounds in ms, geometric (x1.25) from 1 ms to ~70 s; one more bin
+# catches everything slower. Percentiles interpolate inside a bin, so they are accurate to
+# roughly +-12%.
+LATENCY_BOUNDS = sorted({max(1, round(1.25**step)) for step in range(51)})
+
+
+def history_samples() -> int:
+    raw = str(os.getenv("HQ_HEALTH_HISTORY_SAMPLES") or "120").strip()
+    try:
+        return max(1, min(int(raw), 10000))
+    except ValueError:
+        return 120
+
+
+def history_flush_interval_seconds() -> float:
+    raw = str(os.getenv("HQ_HEALTH_HISTORY_FLUSH_SECONDS") or "300").strip()
+    try:
+        return max(10.0, min(float(raw), 86400.0))
+    except ValueError:
+        return 300.0
+
+
+def _latency_bin(latency_ms: float) -> int:
+    for index, bound in enumerate(LATENCY_BOUNDS):
+        if latency_ms <= bound:
+            return index
+    return len(LATENCY_BOUNDS)
+
+
+class Rollup:
+    """Additive aggregate of health samples; window totals are sums of bucket rollups."""
+
+    __slots__ = ("samples", "up", "flaps", "latency_samples", "histogram")
+
+    def __init__(self):
+        self.samples = 0
+        self.up = 0
+        self.flaps = 0
+        self.latency_samples = 0
+        self.histogram = [0] * (len(LATENCY_BOUNDS) + 1)
+
+    def add_sample(self, up: bool, flap: bool, latency_ms: float | None) -> None:
+        self.samples += 1
+        self.up += int(up)
+        self.flaps += int(flap)
+        if latency_ms is not None:
+            self.latency_samples += 1
+            self.histogram[_latency_bin(latency_ms)] += 1
+
+    def merge(self, other: Rollup, sign: int = 1) -> None:
+        self.samples += sign * other.samples
+        self.up += sign * other.up
+        self.flaps += sign * other.flaps
+        self.latency_samples += sign * other.latency_samples
+        for index, count in enumerate(other.histogram):
+            self.histogram[index] += sign * count
+
+    def percentile(self, fraction: float) -> float | None:
+        if self.latency_samples <= 0:
+            return None
+        rank = fraction * self.latency_samples
+        seen = 0
+        for index, count in enumerate(self.histogram):
+            if count and seen + count >= rank:
+                low = LATENCY_BOUNDS[index - 1] if index else 0
+                high = LATENCY_BOUNDS[index] if index < len(LATENCY_BOUNDS) else LATENCY_BOUNDS[-1] * 2
+                return round(low + (high - low) * max(0.0, rank - seen) / count, 1)
+            seen += count
+        return float(LATENCY_BOUNDS[-1])
+
+    def as_row(self) -> dict:
+        return {
+            "samples": self.samples,
+            "up": self.up,
+            "flaps": self.flaps,
+            "latency_samples": self.latency_samples,
+            "histogram": list(self.histogram),
+        }
+
+    @classmethod
+    def from_row(cls, row: dict) -> Rollup:
+        rollup = cls()
+        rollup.samples = int(row.get("samples") or 0)
+        rollup.up = int(row.get("up") or 0)
+        rollup.flaps = int(row.get("flaps") or 0)
+        rollup.latency_samples = int(row.get("latency_samples") or 0)
+        histogram = list(row.get("histogram") or [])[: len(rollup.histogram)]
+        rollup.histogram[: len(histogram)] = [int(count) for count in histogram]
+        return rollup
+
+
+class WindowStats:
+    """Buckets covering one window plus their running total.
+
+    Recording a sample touches one bucket and the total; buckets that fall out of the window
+    are subtracted from the total as they expire, so reading the window costs one pass over
+    the latency bins instead of a scan of its history.
+    """
+
+    def __init__(self, window_seconds: int, bucket_seconds: int):
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self.buckets: OrderedDict[int, Rollup] = OrderedDict()
+        self.total = Rollup()
+        self.dirty: set[int] = set()
+
+    def _expire(self, now: float) -> None:
+        horizon = now - self.window_seconds
+        while self.buckets:
+            start, bucket = next(iter(self.buckets.items()))
+            if start + self.bucket_seconds > horizon:
+                break
+            self.buckets.popitem(last=False)
+            self.total.merge(bucket, -1)
+            self.dirty.discard(start)
+
+    def _bucket(self, at: float) -> tuple[int, Rollup]:
+        start = int(at // self.bucket_seconds) * self.bucket_seconds
+        bucket = self.buckets.get(start)
+        if bucket is None:
+            bucket = self.buckets[start] = Rollup()
+        return start, bucket
+
+    def add(self, at: float, up: bool, flap: bool, latency_ms: float | None) -> None:
+        self._expire(at)
+        start, bucket = self._bucket(at)
+        bucket.add_sample(up, flap, latency_ms)
+        self.total.add_sample(up, flap, latency_ms)
+        self.dirty.add(start)
+
+    def restore(self, start: int, rollup: Rollup, now: float) -> None:
+        if start + self.bucket_seconds <= now - self.window_seconds or start in self.buckets:
+            return
+        out_of_order = bool(self.buckets) and start < next(reversed(self.buckets))
+        self.buckets[start] = rollup
+        if out_of_order:
+            self.buckets = OrderedDict(sorted(self.buckets.items()))
+        self.total.merge(rollup)
+
+    def summary(self, now: float) -> dict:
+        self._expire(now)
+        return _window_summary(self.total)
+
+
+def _window_summary(total: Rollup) -> dict:
+    return {
+        "samples": total.samples,
+        "uptime_pct": round(100.0 * total.up / total.samples, 3) if total.samples else None,
+        "p50_ms": total.percentile(0.5),
+        "p95_ms": total.percentile(0.95),
+        "flaps": total.flaps,
+    }
+
+
+class TargetHistory:
+    def __init__(self, max_samples: int):
+        self.samples: deque[dict] = deque(maxlen=max_samples)
+        self.windows = {name: WindowStats(seconds, bucket) for name, seconds, bucket in WINDOWS}
+        self.last_up: bool | None = None
+
+    def add(self, at: float, status: str, http_status, latency_ms: float | None) -> None:
+        up = status == "healthy"
+        flap = self.last_up is not None and up != self.last_up
+        self.last_up = up
+        self.samples.append(
+            {"at": at, "status": status, "http_status": http_status, "duration_ms": latency_ms}
+        )
+        for window in self.windows.values():
+            window.add(at, up, flap, latency_ms)
+
+
+class HealthHistory:
+    """Health results per target: a ring buffer of recent samples plus 1h/24h/7d rollups.
+
+    Targets are strings such as `project:<slug>` (the summary) and `project:<slug>:public`.
+    `flush()` upserts the buckets touched since the last flush into the `health_rollups` table
+    (see controller/db.py) and `load()` rebuilds the windows from it at startup, so uptime and
+    percentiles survive restarts; the raw sample ring is memory only.
+    """
+
+    def __init__(self, max_samples: int | None = None, clock=time.time):
+        self._max_samples = max_samples or history_samples()
+        self._clock = clock
+        self._lock = threading.Lock()
+        # Serializes writes to `health_rollups`, so a flush that collected a target's rows
+        # cannot write them back after `forget()` deleted them.
+        self._store_lock = threading.Lock()
+        self._targets: dict[str, TargetHistory] = {}
+        self._last_flush = clock()
+        self.recorded = 0
+        self.flushes = 0
+
+    def _target(self, target: str) -> TargetHistory:
+        history = self._targets.get(target)
+        if history is None:
+            history = self._targets[target] = TargetHistory(self._max_samples)
+        return history
+
+    def record(self, target: str, status: str, http_status=None, duration_ms=None, at: float | None = None) -> None:
+        """Add one result; `unconfigured` results carry no signal and are ignored."""
+        if not status or status == "unconfigured":
+            return
+        latency = float(duration_ms) if isinstance(duration_ms, (int, float)) and math.isfinite(duration_ms) else None
+        with self._lock:
+            self._target(target).add(self._clock() if at is None else at, status, http_status, latency)
+            self.recorded += 1
+
+    def summary(self, target: str, recent: int = 20) -> dict:
+        now = self._clock()
+        with self._lock:
+            history = self._targets.get(target)
+            if history is None:
+                return {"windows": {name: _window_summary(Rollup()) for name, *_ in WINDOWS}, "recent": []}
+            samples = list(history.samples)[-recent:] if recent > 0 else []
+            return {
+                "windows": {name: window.summary(now) for name, window in history.windows.items()},
+                "recent": [
+                    {**sample, "at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(sample["at"]))}
+                    for sample in samples
+                ],
+            }
+
+    def forget(self, target: str) -> None:
+        """Drop a target and its sub-targets (`project:<slug>` also drops `project:<slug>:public`).
+
+        Their persisted rollups are deleted too, so neither a restart nor a new project reusing
+        the slug brings the old history back.
+        """
+        from controller.db import delete_health_rollups
+
+        with self._store_lock:
+            with self._lock:
+                for name in [name for name in self._targets if name == target or name.startswith(f"{target}:")]:
+                    del self._targets[name]
+            delete_health_rollups(target)
+
+    def _dirty_rows(self) -> list[dict]:
+        rows = []
+        for target, history in self._targets.items():
+            for window in history.windows.values():
+                for start in sorted(window.dirty):
+                    bucket = window.buckets.get(start)
+                    if bucket is not None:
+                        rows.append(
+                            {"target": target, "resolution": window.bucket_seconds, "bucket_start": start,
+                             **bucket.as_row()}
+                        )
+                window.dirty.clear()
+        return rows
+
+    def flush(self) -> int:
+        from controller.db import prune_health_rollups, save_health_rollups
+
+        with self._store_lock:
+            with self._lock:
+                rows = self._dirty_rows()
+                self._last_flush = self._clock()
+            if rows:
+                save_health_rollups(rows)
+            prune_health_rollups(int(self._clock()) - max(seconds for _name, seconds, _bucket in WINDOWS))
+        self.flushes += 1
+        return len(rows)
+
+    def flush_if_due(self) -> None:
+        if self._clock() - self._last_flush < history_flush_interval_seconds():
+            return
+        try:
+            self.flush()
+        except Exception as exc:
+            print(f"[Health] History flush failed: {exc}")
+
+    def load(self) -> int:
+        from controller.db import load_health_rollups
+
+        now = self._clock()
+        rows = load_health_rollups(int(now) - max(seconds for _name, seconds, _bucket in WINDOWS))
+        with self._lock:
+            for row in rows:
+                history = self._target(row["target"])
+                for window in history.windows.values():
+                    if window.bucket_seconds == row["resolution"]:
+                        window.restore(row["bucket_start"], Rollup.from_row(row), now)
+        return len(rows)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"targets": len(self._targets), "recorded": self.recorded, "flushes": self.flushes}
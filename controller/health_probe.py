@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# A streamed GET reads at most this much body. Health bodies are small, and reading them to
+# the end lets the connection go back to the pool; anything larger is abandoned and the
+# connection closed instead of downloading the rest.
+PROBE_BODY_LIMIT = 64 * 1024
+
+
+def pool_size() -> int:
+    raw = str(os.getenv("HQ_HEALTH_POOL_SIZE") or "4").strip()
+    try:
+        return max(1, min(int(raw), 64))
+    except ValueError:
+        return 4
+
+
+def max_origins() -> int:
+    raw = str(os.getenv("HQ_HEALTH_MAX_ORIGINS") or "256").strip()
+    try:
+        return max(1, min(int(raw), 4096))
+    except ValueError:
+        return 256
+
+
+def origin_of(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}"
+
+
+class ProbeSessions:
+    """Keep-alive `requests` sessions for health probes, one per origin (scheme, host, port).
+
+    Repeated refreshes against the same origin reuse its pooled connections, so HTTPS targets
+    skip the TCP and TLS handshakes after the first probe. Each session holds at most
+    `HQ_HEALTH_POOL_SIZE` connections; past `HQ_HEALTH_MAX_ORIGINS` origins the least recently
+    probed session is closed.
+
+    `status()` probes with `get` (a streamed GET that stops after headers plus a small body) or
+    `head`; servers that reject HEAD with 405/501 are retried with GET.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions: OrderedDict[str, requests.Session] = OrderedDict()
+        self.probes = 0
+        self.sessions_created = 0
+        self.sessions_evicted = 0
+        self.head_fallbacks = 0
+
+    def _session(self, url: str) -> requests.Session:
+        origin = origin_of(url)
+        evicted = []
+        with self._lock:
+            session = self._sessions.get(origin)
+            if session is not None:
+                self._sessions.move_to_end(origin)
+                return session
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size())
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._sessions[origin] = session
+            self.sessions_created += 1
+            while len(self._sessions) > max_origins():
+                evicted.append(self._sessions.popitem(last=False)[1])
+                self.sessions_evicted += 1
+        for stale in evicted:
+            stale.close()
+        return session
+
+    def status(self, url: str, method: str, timeout: float) -> int:
+        """HTTP status code of `url`; raises `requests.RequestException` on transport errors."""
+        session = self._session(url)
+        with self._lock:
+            self.probes += 1
+        if method == "head":
+            response = session.head(url, timeout=timeout, allow_redirects=True)
+            status_code = response.status_code
+            response.close()
+            if status_code not in (405, 501):
+                return status_code
+            with self._lock:
+                self.head_fallbacks += 1
+        response = session.get(url, timeout=timeout, stream=True)
+        try:
+            read = 0
+            for chunk in response.iter_content(16 * 1024):
+                read += len(chunk)
+                if read > PROBE_BODY_LIMIT:
+                    break
+            return response.status_code
+        finally:
+            response.close()
+
+    def close(self) -> None:
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "origins": len(self._sessions),
+                "probes": self.probes,
+                "sessions_created": self.sessions_created,
+                "sessions_evicted": self.sessions_evicted,
+                "head_fallbacks": self.head_fallbacks,
+            }
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import os
+import random
+import threading
+import time
+from typing import Callable, Iterable
+
+from controller.health_checks import deadline_seconds
+
+
+def default_interval_seconds() -> float:
+    raw = str(os.getenv("HQ_HEALTH_INTERVAL_SECONDS") or "60").strip()
+    try:
+        return max(5.0, min(float(raw), 86400.0))
+    except ValueError:
+        return 60.0
+
+
+def jitter_ratio() -> float:
+    raw = str(os.getenv("HQ_HEALTH_JITTER_RATIO") or "0.1").strip()
+    try:
+        return max(0.0, min(float(raw), 0.5))
+    except ValueError:
+        return 0.1
+
+
+def scheduler_enabled() -> bool:
+    return str(os.getenv("HQ_HEALTH_SCHEDULER") or "1").strip().lower() not in {"0", "false", "off", "no"}
+
+
+def target_interval(record: dict) -> float:
+    try:
+        configured = int(record.get("health_interval_seconds") or 0)
+    except (TypeError, ValueError):
+        configured = 0
+    return float(configured) if configured > 0 else default_interval_seconds()
+
+
+class HealthScheduler:
+    """Owns health refreshes for projects and host runners.
+
+    A background thread refreshes every target on its own interval (with jitter so targets
+    sharing an interval spread out) and publishes through `refresh`, which writes the caches.
+    `check_now` is the on-demand path: targets already being checked are waited on instead of
+    probed again, so concurrent callers coalesce onto one in-flight check.
+    """
+
+    def __init__(
+        self,
+        load_targets: Callable[[], tuple[list[dict], list[dict]]],
+        refresh: Callable[[list[dict], list[dict]], object],
+        *,
+        tick_seconds: float = 1.0,
+    ):
+        self._load_targets = load_targets
+        self._refresh = refresh
+        self._tick_seconds = tick_seconds
+        self._lock = threading.Lock()
+        self._next_due: dict[tuple[str, str], float] = {}
+        self._inflight: dict[tuple[str, str], threading.Event] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.cycles = 0
+        self.coalesced = 0
+
+    # --- lifecycle ---
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="hq-health-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_due()
+            except Exception as exc:  # keep the scheduler alive through a bad catalog read
+                print(f"[Health] Scheduled refresh failed: {exc}")
+            self._stop.wait(self._tick_seconds)
+
+    # --- scheduling ---
+    def _schedule_next(self, key: tuple[str, str], record: dict, now: float) -> None:
+        interval = target_interval(record)
+        jitter = interval * jitter_ratio()
+        self._next_due[key] = now + interval + random.uniform(-jitter, jitter)
+
+    def run_due(self) -> None:
+        """Refresh every target whose interval has elapsed (one scheduler tick)."""
+        projects, hosts = self._load_targets()
+        now = time.monotonic()
+        records = _records_by_key(projects, hosts)
+        with self._lock:
+            for key in list(self._next_due):
+                if key not in records:
+                    del self._next_due[key]
+            for key, record in records.items():
+                if key not in self._next_due:
+                    # Spread the first round over a short window instead of one burst.
+                    self._next_due[key] = now + random.uniform(0, min(5.0, target_interval(record)))
+            due = [key for key, at in self._next_due.items() if at <= now and key not in self._inflight]
+        if due:
+            self._run_cycle(records, due, wait=False)
+
+    def check_now(
+        self,
+        project_slugs: Iterable[str] | None = None,
+        host_slugs: Iterable[str] | None = None,
+        timeout: float | None = None,
+    ) -> None:
+        """Refresh the given targets now (all when None), joining checks that are already running."""
+        projects, hosts = self._load_targets()
+        records = _records_by_key(projects, hosts)
+        wanted_projects = None if project_slugs is None else set(project_slugs)
+        wanted_hosts = None if host_slugs is None else set(host_slugs)
+        keys = [
+            key
+            for key in records
+            if (key[0] == "project" and (wanted_projects is None or key[1] in wanted_projects))
+            or (key[0] == "host" and (wanted_hosts is None or key[1] in wanted_hosts))
+        ]
+        self._run_cycle(records, keys, wait=True, timeout=timeout)
+
+    def _run_cycle(
+        self,
+        records: dict[tuple[str, str], dict],
+        keys: list[tuple[str, str]],
+        *,
+        wait: bool,
+        timeout: float | None = None,
+    ) -> None:
+        event = threading.Event()
+        with self._lock:
+            joined = [self._inflight[key] for key in keys if key in self._inflight]
+            mine = [key for key in keys if key not in self._inflight]
+            for key in mine:
+                self._inflight[key] = event
+            self.coalesced += len(joined)
+        try:
+            if mine:
+                self._refresh(
+                    [records[key] for key in mine if key[0] == "project"],
+                    [records[key] for key in mine if key[0] == "host"],
+                )
+        finally:
+            now = time.monotonic()
+            with self._lock:
+                for key in mine:
+                    self._inflight.pop(key, None)
+                    self._schedule_next(key, records[key], now)
+                self.cycles += 1
+            event.set()
+        if wait:
+            limit = timeout if timeout is not None else deadline_seconds() + 1
+            deadline = time.monotonic() + limit
+            for other in set(joined):
+                other.wait(max(0.0, deadline - time.monotonic()))
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "running": self.running,
+                "targets": len(self._next_due),
+                "in_flight": len(self._inflight),
+                "cycles": self.cycles,
+                "coalesced": self.coalesced,
+                "next_due_in_seconds": (
+                    round(max(0.0, min(self._next_due.values()) - now), 1) if self._next_due else None
+                ),
+            }
+
+
+def _records_by_key(projects: list[dict], hosts: list[dict]) -> dict[tuple[str, str], dict]:
+    records = {("project", project["slug"]): project for project in projects}
+    records.update({("host", host["slug"]): host for host in hosts})
+    return records
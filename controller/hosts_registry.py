@@ -2,11 +2,14 @@ from __future__ import annotations
 
 import json
 import os
+import threading
 from copy import deepcopy
 from pathlib import Path
 from urllib.parse import urlparse
 
 from controller.projects_registry import ProjectValidationError
+from controller.registry_sqlite import SqliteRegistry, open_hosts_registry, registry_backend
+from controller.registry_store import apply_journal, atomic_write_text, file_key, save_records
 
 
 HOST_TRANSPORTS = {"none", "socket", "http"}
@@ -19,6 +22,7 @@ HOST_REQUIRED_FIELDS = {
     "token_env_var",
     "location",
     "notes",
+    "health_interval_seconds",
     "updated_at",
 }
 
@@ -42,21 +46,111 @@ def ensure_hosts_store() -> Path:
     return path
 
 
-def _load_hosts_raw() -> list[dict]:
-    path = ensure_hosts_store()
+def _load_hosts_raw(path: Path | None = None) -> list[dict]:
+    path = path or ensure_hosts_store()
     try:
         data = json.loads(path.read_text(encoding="utf-8"))
     except json.JSONDecodeError as exc:
         raise ProjectValidationError(f"Invalid host registry JSON: {exc}") from exc
     if not isinstance(data, list):
         raise ProjectValidationError("Host registry must be a JSON array.")
-    return [normalize_host(item) for item in data]
+    return [normalize_host(item) for item in apply_journal(path, data)]
+
+
+# Held by every mutation from reading the current records until the new ones are saved and
+# cached, so concurrent writes cannot both start from the same snapshot (see projects_registry).
+_write_lock = threading.Lock()
+
 
+def _write_hosts(hosts: list[dict], change: dict | None = None) -> None:
+    """Persist already-normalized records; `change` is the mutation, for the journal.
 
-def _write_hosts(hosts: list[dict]) -> None:
+    Callers hold `_write_lock` from reading `_cached_registry()` through this call.
+    """
     path = ensure_hosts_store()
-    payload = [normalize_host(host) for host in hosts]
-    path.write_text(f"{json.dumps(payload, indent=2)}\n", encoding="utf-8")
+    payload = list(hosts)
+    save_records(path, payload, change)
+    with _cache_lock:
+        _install_cache(file_key(path), payload)
+
+
+# -------------------------------------------------------------
+# In-memory registry cache
+# -------------------------------------------------------------
+# Same scheme as the projects registry: normalized records plus a slug index, revalidated by
+# the file's (mtime, size, inode) on every call. The slug index doubles as the host index that
+# project normalization validates `deployment_host` against.
+_cache: dict = {"key": None, "records": [], "by_slug": {}, "ordered": []}
+_cache_lock = threading.Lock()
+_cache_stats = {"hits": 0, "reloads": 0}
+
+
+def _install_cache(key: tuple, records: list[dict]) -> None:
+    _cache["key"] = key
+    _cache["records"] = records
+    _cache["by_slug"] = {record["slug"]: record for record in records}
+    _cache["ordered"] = sorted(records, key=lambda item: (item["title"].lower(), item["slug"]))
+
+
+def _cached_registry() -> dict:
+    """Current cache snapshot; the records in it are shared and must not be mutated."""
+    path = ensure_hosts_store()
+    key = file_key(path)
+    with _cache_lock:
+        if _cache["key"] == key:
+            _cache_stats["hits"] += 1
+            return dict(_cache)
+    records = _load_hosts_raw(path)
+    with _cache_lock:
+        _install_cache(key, records)
+        _cache_stats["reloads"] += 1
+        return dict(_cache)
+
+
+def host_index() -> dict[str, dict]:
+    """Read-only slug -> host mapping for validating many records against one hosts.json read."""
+    registry = _sqlite_registry()
+    if registry:
+        return {host["slug"]: host for host in registry.list()}
+    return _cached_registry()["by_slug"]
+
+
+def hosts_cache_stats() -> dict:
+    with _cache_lock:
+        return {"backend": registry_backend(), **_cache_stats, "hosts": len(_cache["records"])}
+
+
+# -------------------------------------------------------------
+# SQLite backend
+# -------------------------------------------------------------
+# The `hosts` table of the registry database, used with HQ_REGISTRY_BACKEND=sqlite; seeded from
+# hosts.json on first open, like the projects table.
+def _sqlite_registry() -> SqliteRegistry | None:
+    if registry_backend() != "sqlite":
+        return None
+    registry = open_hosts_registry()
+    if not registry.imported():
+        registry.replace_all(_load_hosts_raw())
+    return registry
+
+
+def import_hosts_registry(source: Path | None = None) -> int:
+    """Replace the SQLite hosts table with the records of a hosts.json file."""
+    records = _load_hosts_raw(source) if source else _load_hosts_raw()
+    open_hosts_registry().replace_all(records)
+    return len(records)
+
+
+def dump_hosts_registry(destination: Path | None = None) -> int:
+    """Write the current records in hosts.json format (by default over hosts.json itself)."""
+    registry = _sqlite_registry()
+    records = registry.records_in_file_order() if registry else list(_cached_registry()["records"])
+    if destination is None:
+        save_records(ensure_hosts_store(), records)
+    else:
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(destination, f"{json.dumps(records, indent=2)}\n")
+    return len(records)
 
 
 def _slugify(value: str) -> str:
@@ -88,6 +182,10 @@ def normalize_host(payload: dict) -> dict:
     location = str(payload.get("location") or "").strip()
     notes = str(payload.get("notes") or "").strip()
     updated_at = str(payload.get("updated_at") or "").strip()
+    try:
+        health_interval_seconds = int(payload.get("health_interval_seconds") or 0)
+    except (TypeError, ValueError) as exc:
+        raise ProjectValidationError("Host health_interval_seconds must be an integer.") from exc
 
     if not slug:
         raise ProjectValidationError("Host slug is required.")
@@ -101,6 +199,8 @@ def normalize_host(payload: dict) -> dict:
         raise ProjectValidationError("HTTP runner hosts require a runner_url.")
     if transport == "socket" and not runner_socket_path:
         raise ProjectValidationError("Socket runner hosts require a runner_socket_path.")
+    if health_interval_seconds < 0:
+        raise ProjectValidationError("Host health_interval_seconds must not be negative.")
     if transport == "http" and not token_env_var:
         raise ProjectValidationError("HTTP runner hosts require a token_env_var.")
     if transport != "http":
@@ -117,6 +217,7 @@ def normalize_host(payload: dict) -> dict:
         "token_env_var": token_env_var,
         "location": location,
         "notes": notes,
+        "health_interval_seconds": health_interval_seconds,
         "updated_at": updated_at,
     }
 
@@ -127,61 +228,76 @@ def normalize_host(payload: dict) -> dict:
 
 
 def list_hosts() -> list[dict]:
-    hosts = _load_hosts_raw()
-    return sorted(hosts, key=lambda item: (item["title"].lower(), item["slug"]))
+    registry = _sqlite_registry()
+    if registry:
+        return registry.list()
+    return [dict(host) for host in _cached_registry()["ordered"]]
 
 
 def get_host(slug: str) -> dict | None:
-    target = _slugify(slug)
-    for host in _load_hosts_raw():
-        if host["slug"] == target:
-            return host
-    return None
+    registry = _sqlite_registry()
+    if registry:
+        return registry.get(_slugify(slug))
+    host = _cached_registry()["by_slug"].get(_slugify(slug))
+    return dict(host) if host else None
 
 
 def create_host(payload: dict) -> dict:
-    hosts = _load_hosts_raw()
     host = normalize_host(payload)
-    if any(existing["slug"] == host["slug"] for existing in hosts):
-        raise ProjectValidationError("Host slug already exists.")
-    hosts.append(host)
-    _write_hosts(hosts)
-    return host
+    with _write_lock:
+        registry = _sqlite_registry()
+        if registry:
+            if not registry.insert(host):
+                raise ProjectValidationError("Host slug already exists.")
+            return dict(host)
+        cached = _cached_registry()
+        if host["slug"] in cached["by_slug"]:
+            raise ProjectValidationError("Host slug already exists.")
+        _write_hosts([*cached["records"], host], {"op": "put", "slug": host["slug"], "record": host})
+    return dict(host)
 
 
 def update_host(slug: str, payload: dict) -> dict:
     target = _slugify(slug)
-    hosts = _load_hosts_raw()
-    for index, existing in enumerate(hosts):
-        if existing["slug"] != target:
-            continue
+    with _write_lock:
+        registry = _sqlite_registry()
+        cached = None if registry else _cached_registry()
+        existing = registry.get(target) if registry else cached["by_slug"].get(target)
+        if existing is None:
+            raise ProjectValidationError("Host not found.")
         merged = deepcopy(existing)
         merged.update(payload or {})
         merged["slug"] = target
-        hosts[index] = normalize_host(merged)
-        _write_hosts(hosts)
-        return hosts[index]
-    raise ProjectValidationError("Host not found.")
+        host = normalize_host(merged)
+        if registry:
+            registry.update(host)
+        else:
+            hosts = [host if item["slug"] == target else item for item in cached["records"]]
+            _write_hosts(hosts, {"op": "put", "slug": target, "record": host})
+    return dict(host)
 
 
 def delete_host(slug: str) -> dict:
     target = _slugify(slug)
-    from controller.projects_registry import list_projects
-
-    dependents = [
-        project["slug"]
-        for project in list_projects()
-        if str(project.get("deployment_host") or "").strip() == target
-    ]
-    if dependents:
-        raise ProjectValidationError(
-            f"Cannot delete host '{target}' while projects still reference it: {', '.join(sorted(dependents))}."
+    from controller.projects_registry import list_projects_on_host
+
+    with _write_lock:
+        dependents = [project["slug"] for project in list_projects_on_host(target)]
+        if dependents:
+            raise ProjectValidationError(
+                f"Cannot delete host '{target}' while projects still reference it: {', '.join(sorted(dependents))}."
+            )
+        registry = _sqlite_registry()
+        if registry:
+            removed = registry.get(target)
+            if removed is None or not registry.delete(target):
+                raise ProjectValidationError("Host not found.")
+            return removed
+        cached = _cached_registry()
+        removed = cached["by_slug"].get(target)
+        if removed is None:
+            raise ProjectValidationError("Host not found.")
+        _write_hosts(
+            [item for item in cached["records"] if item["slug"] != target], {"op": "delete", "slug": target}
         )
-    hosts = _load_hosts_raw()
-    for index, existing in enumerate(hosts):
-        if existing["slug"] != target:
-            continue
-        removed = hosts.pop(index)
-        _write_hosts(hosts)
-        return removed
-    raise ProjectValidationError("Host not found.")
+    return dict(removed)
@@ -3,24 +3,43 @@ import os
 import subprocess
 import psutil
 import sys
+import threading
+from functools import lru_cache
 from pathlib import Path
 
 from controller.db import (
     get_tool_by_name,
+    list_tools,
+    mark_tools_stopped,
     update_tool_pid,
     update_tool_status
 )
+from controller.supervisor import SUPERVISOR
+from controller.tool_logs import LOG_DIR, LOG_STREAMS, log_path, rotate_log
 
 # Base directory of the whole project (hq/)
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 
+# (pid, create_time, expected entry) -> whether that process runs the entry. A pid plus its
+# create time identifies one process for its whole life, so a match never needs re-inspecting.
+_MATCH_MEMO: dict[tuple[int, float, str], bool] = {}
+_MATCH_MEMO_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=256)
+def _entry_path(process_path: str | None) -> Path | None:
+    if not process_path:
+        return None
+    return (BASE_DIR / process_path).resolve()
+
+
 class ProcessManager:
     @staticmethod
     def _expected_entry_path(tool) -> Path | None:
-        if not tool or not tool.process_path:
+        if not tool:
             return None
-        return (BASE_DIR / tool.process_path).resolve()
+        return _entry_path(tool.process_path)
 
     @staticmethod
     def _pid_matches_entry(pid: int, expected_entry: Path | None) -> bool:
@@ -103,12 +122,13 @@ class ProcessManager:
         cmd += entry_args
 
         # 1. Create a logs directory in the project root
-        log_dir = BASE_DIR / "logs"
-        log_dir.mkdir(exist_ok=True)
+        LOG_DIR.mkdir(exist_ok=True)
 
-        # 2. Open log files for this specific tool
-        stdout_f = open(log_dir / f"{name}.out.log", "a") 
-        stderr_f = open(log_dir / f"{name}.err.log", "a")
+        # 2. Open log files for this specific tool (rotating oversized ones first)
+        for stream in LOG_STREAMS:
+            rotate_log(log_path(name, stream))
+        stdout_f = open(log_path(name, "out"), "a")
+        stderr_f = open(log_path(name, "err"), "a")
 
         try:
             proc = subprocess.Popen(
@@ -119,9 +139,14 @@ class ProcessManager:
             )
         except Exception as e:
             return {"error": f"Failed to launch: {str(e)}"}
+        finally:
+            # The child holds its own copies of the log descriptors.
+            stdout_f.close()
+            stderr_f.close()
 
         update_tool_pid(name, proc.pid)
         update_tool_status(name, "running")
+        SUPERVISOR.track(name, proc)
 
         return {"started": True, "pid": proc.pid}
 
@@ -163,6 +188,9 @@ class ProcessManager:
             update_tool_status(name, "stopped")
             return {"alive": False}
 
+        if SUPERVISOR.owns(tool.pid):
+            return {"alive": True, "pid": tool.pid}
+
         expected_entry = ProcessManager._expected_entry_path(tool)
         alive = ProcessManager._pid_matches_entry(tool.pid, expected_entry)
         if not alive:
@@ -171,6 +199,55 @@ class ProcessManager:
 
         return {"alive": alive, "pid": tool.pid}
 
+    @staticmethod
+    def _pid_matches_entry_memoized(pid: int, expected_entry: Path | None) -> bool:
+        try:
+            create_time = psutil.Process(pid).create_time()
+        except Exception:
+            return False
+        key = (pid, create_time, str(expected_entry))
+        with _MATCH_MEMO_LOCK:
+            if key in _MATCH_MEMO:
+                return _MATCH_MEMO[key]
+        matched = ProcessManager._pid_matches_entry(pid, expected_entry)
+        with _MATCH_MEMO_LOCK:
+            _MATCH_MEMO[key] = matched
+        return matched
+
+    @staticmethod
+    def statuses(tools: list[dict] | None = None) -> dict[str, dict]:
+        """Check every registered tool against one snapshot of running pids.
+
+        Returns `is_alive`-shaped results keyed by tool name. Dead or foreign pids are cleared
+        with a single DB transaction.
+        """
+        tools = list_tools() if tools is None else tools
+        running = set(psutil.pids())
+        with _MATCH_MEMO_LOCK:
+            for key in [key for key in _MATCH_MEMO if key[0] not in running]:
+                del _MATCH_MEMO[key]
+
+        results = {}
+        stale = []
+        for tool in tools:
+            name = tool["name"]
+            pid = tool.get("pid")
+            if not pid:
+                if tool.get("status") != "stopped":
+                    stale.append(name)
+                results[name] = {"alive": False}
+                continue
+            alive = SUPERVISOR.owns(pid) or (
+                pid in running
+                and ProcessManager._pid_matches_entry_memoized(pid, _entry_path(tool.get("process_path")))
+            )
+            if not alive:
+                stale.append(name)
+            results[name] = {"alive": alive, "pid": pid}
+
+        mark_tools_stopped(stale)
+        return results
+
     @staticmethod
     def _pid_alive(pid: int):
         return psutil.pid_exists(pid)
@@ -2,13 +2,18 @@ from __future__ import annotations
 
 import json
 import os
+import threading
 from copy import deepcopy
 from datetime import datetime, UTC
 from pathlib import Path
 from urllib.parse import urlparse
 
+from controller.registry_sqlite import SqliteRegistry, open_projects_registry, registry_backend
+from controller.registry_store import apply_journal, atomic_write_text, file_key, save_records
+
 
 PUBLIC_MODES = {"hidden", "demo", "full", "source"}
+HEALTH_PROBE_METHODS = {"get", "head"}
 URL_FIELDS = {
     "primary_url",
     "repo_url",
@@ -32,6 +37,8 @@ REQUIRED_FIELDS = {
     "runtime_path",
     "health_public_url",
     "health_private_url",
+    "health_interval_seconds",
+    "health_probe_method",
     "deploy_command",
     "start_command",
     "restart_command",
@@ -91,21 +98,113 @@ def ensure_projects_store() -> Path:
     return path
 
 
-def _load_projects_raw() -> list[dict]:
-    path = ensure_projects_store()
+def _load_projects_raw(path: Path | None = None) -> list[dict]:
+    path = path or ensure_projects_store()
     try:
         data = json.loads(path.read_text(encoding="utf-8"))
     except json.JSONDecodeError as exc:
         raise ProjectValidationError(f"Invalid project registry JSON: {exc}") from exc
     if not isinstance(data, list):
         raise ProjectValidationError("Project registry must be a JSON array.")
-    return [normalize_project(item) for item in data]
+    data = apply_journal(path, data)
+    from controller.hosts_registry import host_index
+
+    hosts = host_index()
+    return [normalize_project(item, hosts) for item in data]
+
+
+# Held by every mutation from reading the current records until the new ones are saved and
+# cached, so concurrent writes apply one after another instead of each starting from the same
+# snapshot and the last one dropping the other's change.
+_write_lock = threading.Lock()
+
+
+def _write_projects(projects: list[dict], change: dict | None = None) -> None:
+    """Persist already-normalized records; `change` is the mutation, for the journal.
+
+    Callers hold `_write_lock` from reading `_cached_registry()` through this call.
+    """
+    path = ensure_projects_store()
+    payload = list(projects)
+    save_records(path, payload, change)
+    with _cache_lock:
+        _install_cache(file_key(path), payload)
+
+
+# -------------------------------------------------------------
+# In-memory registry cache
+# -------------------------------------------------------------
+# projects.json is read by every project endpoint and health refresh but changes rarely. The
+# normalized records are kept with a slug index and the sorted list, and revalidated with one
+# stat() per call: a different (mtime, size, inode) - a hand edit or an editor's atomic
+# rename - reloads the file. Our own writes refresh the cache directly.
+_cache: dict = {"key": None, "records": [], "by_slug": {}, "ordered": []}
+_cache_lock = threading.Lock()
+_cache_stats = {"hits": 0, "reloads": 0}
+
+
+def _install_cache(key: tuple, records: list[dict]) -> None:
+    _cache["key"] = key
+    _cache["records"] = records
+    _cache["by_slug"] = {record["slug"]: record for record in records}
+    _cache["ordered"] = sorted(
+        records, key=lambda item: (item["sort_order"], item["title"].lower(), item["slug"])
+    )
 
 
-def _write_projects(projects: list[dict]) -> None:
+def _cached_registry() -> dict:
+    """Current cache snapshot; the records in it are shared and must not be mutated."""
     path = ensure_projects_store()
-    payload = [normalize_project(project) for project in projects]
-    path.write_text(f"{json.dumps(payload, indent=2)}\n", encoding="utf-8")
+    key = file_key(path)
+    with _cache_lock:
+        if _cache["key"] == key:
+            _cache_stats["hits"] += 1
+            return dict(_cache)
+    records = _load_projects_raw(path)
+    with _cache_lock:
+        _install_cache(key, records)
+        _cache_stats["reloads"] += 1
+        return dict(_cache)
+
+
+def registry_cache_stats() -> dict:
+    with _cache_lock:
+        return {"backend": registry_backend(), **_cache_stats, "projects": len(_cache["records"])}
+
+
+# -------------------------------------------------------------
+# SQLite backend
+# -------------------------------------------------------------
+# With HQ_REGISTRY_BACKEND=sqlite the records live in the `projects` table of the registry
+# database instead of projects.json, and lookups by slug or deployment_host and the sorted list
+# are indexed queries. The table is seeded from projects.json the first time it is opened;
+# `import_projects_registry` / `dump_projects_registry` move records between the two formats.
+def _sqlite_registry() -> SqliteRegistry | None:
+    if registry_backend() != "sqlite":
+        return None
+    registry = open_projects_registry()
+    if not registry.imported():
+        registry.replace_all(_load_projects_raw())
+    return registry
+
+
+def import_projects_registry(source: Path | None = None) -> int:
+    """Replace the SQLite projects table with the records of a projects.json file."""
+    records = _load_projects_raw(source) if source else _load_projects_raw()
+    open_projects_registry().replace_all(records)
+    return len(records)
+
+
+def dump_projects_registry(destination: Path | None = None) -> int:
+    """Write the current records in projects.json format (by default over projects.json itself)."""
+    registry = _sqlite_registry()
+    records = registry.records_in_file_order() if registry else list(_cached_registry()["records"])
+    if destination is None:
+        save_records(ensure_projects_store(), records)
+    else:
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(destination, f"{json.dumps(records, indent=2)}\n")
+    return len(records)
 
 
 def _slugify(value: str) -> str:
@@ -128,7 +227,12 @@ def _validate_optional_url(field_name: str, value: str) -> str:
     return cleaned
 
 
-def normalize_project(payload: dict) -> dict:
+def normalize_project(payload: dict, hosts: dict[str, dict] | None = None) -> dict:
+    """Validate and normalize a project record.
+
+    `hosts` is a slug -> host index to validate `deployment_host` against; pass one when
+    normalizing many records so the hosts registry is consulted once.
+    """
     if not isinstance(payload, dict):
         raise ProjectValidationError("Project payload must be an object.")
 
@@ -158,6 +262,17 @@ def normalize_project(payload: dict) -> dict:
         sort_order = int(payload.get("sort_order", 0))
     except (TypeError, ValueError) as exc:
         raise ProjectValidationError("sort_order must be an integer.") from exc
+    try:
+        health_interval_seconds = int(payload.get("health_interval_seconds") or 0)
+    except (TypeError, ValueError) as exc:
+        raise ProjectValidationError("health_interval_seconds must be an integer.") from exc
+    if health_interval_seconds < 0:
+        raise ProjectValidationError("health_interval_seconds must not be negative.")
+    health_probe_method = str(payload.get("health_probe_method") or "get").strip().lower()
+    if health_probe_method not in HEALTH_PROBE_METHODS:
+        raise ProjectValidationError(
+            f"health_probe_method must be one of: {', '.join(sorted(HEALTH_PROBE_METHODS))}."
+        )
 
     linked_tools_raw = payload.get("linked_tools") or []
     if not isinstance(linked_tools_raw, list):
@@ -187,9 +302,13 @@ def normalize_project(payload: dict) -> dict:
     if public_mode == "source" and not repo_url:
         raise ProjectValidationError("source projects require a public repo_url.")
     if deployment_host:
-        from controller.hosts_registry import get_host
+        if hosts is None:
+            from controller.hosts_registry import get_host
 
-        if not get_host(deployment_host):
+            known = get_host(deployment_host) is not None
+        else:
+            known = _slugify(deployment_host) in hosts
+        if not known:
             raise ProjectValidationError(f"Unknown deployment_host '{deployment_host}'.")
 
     updated_at = str(payload.get("updated_at") or "").strip() or _now_iso()
@@ -205,11 +324,13 @@ def normalize_project(payload: dict) -> dict:
         "linked_tools": linked_tools,
         "depends_on": depends_on,
         "private_url": private_url,
-        "deployment_host": deployment_host,
+        "deployment_host": _slugify(deployment_host),
         "deployment_location": deployment_location,
         "runtime_path": runtime_path,
         "health_public_url": health_public_url,
         "health_private_url": health_private_url,
+        "health_interval_seconds": health_interval_seconds,
+        "health_probe_method": health_probe_method,
         "deploy_command": deploy_command,
         "start_command": start_command,
         "restart_command": restart_command,
@@ -225,55 +346,103 @@ def normalize_project(payload: dict) -> dict:
 
 
 def list_projects() -> list[dict]:
-    projects = _load_projects_raw()
-    return sorted(projects, key=lambda item: (item["sort_order"], item["title"].lower(), item["slug"]))
+    registry = _sqlite_registry()
+    if registry:
+        return registry.list()
+    return [dict(project) for project in _cached_registry()["ordered"]]
+
+
+def list_projects_on_host(host_slug: str) -> list[dict]:
+    """Projects deployed to a host, in list order."""
+    target = _slugify(host_slug)
+    registry = _sqlite_registry()
+    if registry:
+        return registry.where("deployment_host", target)
+    return [
+        dict(project)
+        for project in _cached_registry()["ordered"]
+        if str(project.get("deployment_host") or "").strip() == target
+    ]
 
 
 def get_project(slug: str) -> dict | None:
-    target = _slugify(slug)
-    for project in _load_projects_raw():
-        if project["slug"] == target:
-            return project
-    return None
+    registry = _sqlite_registry()
+    if registry:
+        return registry.get(_slugify(slug))
+    project = _cached_registry()["by_slug"].get(_slugify(slug))
+    return dict(project) if project else None
+
+
+def _check_dependencies(project: dict, registry: SqliteRegistry | None, cached: dict | None) -> None:
+    from controller.dependency_graph import check_dependencies
+
+    catalog = {item["slug"]: item for item in registry.list()} if registry else cached["by_slug"]
+    check_dependencies(project["slug"], project["depends_on"], catalog)
 
 
 def create_project(payload: dict) -> dict:
-    projects = _load_projects_raw()
     project = normalize_project(payload)
-    if any(existing["slug"] == project["slug"] for existing in projects):
-        raise ProjectValidationError("Project slug already exists.")
     project["updated_at"] = _now_iso()
-    projects.append(project)
-    _write_projects(projects)
-    return project
+    with _write_lock:
+        registry = _sqlite_registry()
+        cached = None if registry else _cached_registry()
+        if cached and project["slug"] in cached["by_slug"]:
+            raise ProjectValidationError("Project slug already exists.")
+        if project["depends_on"]:
+            _check_dependencies(project, registry, cached)
+        if registry:
+            if not registry.insert(project):
+                raise ProjectValidationError("Project slug already exists.")
+            return dict(project)
+        _write_projects([*cached["records"], project], {"op": "put", "slug": project["slug"], "record": project})
+    return dict(project)
 
 
 def update_project(slug: str, payload: dict) -> dict:
     target = _slugify(slug)
-    projects = _load_projects_raw()
-    for index, existing in enumerate(projects):
-        if existing["slug"] != target:
-            continue
+    with _write_lock:
+        registry = _sqlite_registry()
+        cached = None if registry else _cached_registry()
+        existing = registry.get(target) if registry else cached["by_slug"].get(target)
+        if existing is None:
+            raise ProjectValidationError("Project not found.")
         merged = deepcopy(existing)
         merged.update(payload or {})
         merged["slug"] = target
         merged["updated_at"] = _now_iso()
-        projects[index] = normalize_project(merged)
-        _write_projects(projects)
-        return projects[index]
-    raise ProjectValidationError("Project not found.")
+        project = normalize_project(merged)
+        if project["depends_on"] != existing.get("depends_on"):
+            _check_dependencies(project, registry, cached)
+        if registry:
+            registry.update(project)
+        else:
+            projects = [project if item["slug"] == target else item for item in cached["records"]]
+            _write_projects(projects, {"op": "put", "slug": target, "record": project})
+    return dict(project)
 
 
 def delete_project(slug: str) -> dict:
     target = _slugify(slug)
-    projects = _load_projects_raw()
-    for index, existing in enumerate(projects):
-        if existing["slug"] != target:
-            continue
-        removed = projects.pop(index)
-        _write_projects(projects)
-        return removed
-    raise ProjectValidationError("Project not found.")
+    with _write_lock:
+        dependents = [project["slug"] for project in list_projects() if target in (project.get("depends_on") or [])]
+        if dependents:
+            raise ProjectValidationError(
+                f"Cannot delete project '{target}' while projects still depend on it: {', '.join(sorted(dependents))}."
+            )
+        registry = _sqlite_registry()
+        if registry:
+            removed = registry.get(target)
+            if removed is None or not registry.delete(target):
+                raise ProjectValidationError("Project not found.")
+            return removed
+        cached = _cached_registry()
+        removed = cached["by_slug"].get(target)
+        if removed is None:
+            raise ProjectValidationError("Project not found.")
+        _write_projects(
+            [item for item in cached["records"] if item["slug"] != target], {"op": "delete", "slug": target}
+        )
+    return dict(removed)
 
 
 def export_projects(destination: Path | None = None) -> dict:
@@ -285,13 +454,13 @@ def export_projects(destination: Path | None = None) -> dict:
         if project["public_mode"] != "hidden"
     ]
     payload = f"{json.dumps(exported, indent=2)}\n"
-    export_path.write_text(payload, encoding="utf-8")
+    atomic_write_text(export_path, payload)
 
     synced_paths: list[str] = []
     portfolio_export_path = _portfolio_export_path()
     if portfolio_export_path:
         portfolio_export_path.parent.mkdir(parents=True, exist_ok=True)
-        portfolio_export_path.write_text(payload, encoding="utf-8")
+        atomic_write_text(portfolio_export_path, payload)
         synced_paths.append(str(portfolio_export_path))
 
     return {
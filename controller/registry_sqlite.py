@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable
+
+BASE_DIR = Path(__file__).resolve().parent
+DEFAULT_REGISTRY_DB_PATH = BASE_DIR.parent / "runtime" / "registry.db"
+
+
+def registry_backend() -> str:
+    raw = str(os.getenv("HQ_REGISTRY_BACKEND") or "json").strip().lower()
+    return "sqlite" if raw == "sqlite" else "json"
+
+
+def registry_db_path() -> Path:
+    configured = os.getenv("HQ_REGISTRY_DB_PATH")
+    if configured:
+        return Path(configured)
+    return DEFAULT_REGISTRY_DB_PATH
+
+
+class SqliteRegistry:
+    """One registry (projects or hosts) stored as rows of a SQLite table.
+
+    Each row keeps the full normalized record as JSON plus the columns that lookups filter or
+    sort on, so `get`, `where` and the ordered `list` are index scans instead of a full parse.
+    `position` preserves insertion order for round-trips to the JSON snapshot format.
+    """
+
+    def __init__(self, db_path: Path, table: str, columns: dict[str, tuple[str, Callable[[dict], object]]],
+                 order_by: str, indexes: tuple[tuple[str, ...], ...]):
+        self.table = table
+        self.columns = columns  # name -> (SQL type, extractor)
+        self.order_by = order_by
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._lock = threading.Lock()
+        extra = "".join(f", {name} {sql_type}" for name, (sql_type, _extract) in columns.items())
+        with self._lock:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                f"slug TEXT PRIMARY KEY, position INTEGER NOT NULL{extra}, record TEXT NOT NULL)"
+            )
+            for index_columns in indexes:
+                name = f"{table}_{'_'.join(index_columns)}"
+                self._conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(index_columns)})")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS registry_meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    def _row(self, record: dict) -> list:
+        return [record["slug"], *(extract(record) for _sql_type, extract in self.columns.values()), json.dumps(record)]
+
+    def _select(self, where: str = "", params: tuple = ()) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT record FROM {self.table} {where} ORDER BY {self.order_by}", params
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def list(self) -> list[dict]:
+        return self._select()
+
+    def records_in_file_order(self) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(f"SELECT record FROM {self.table} ORDER BY position").fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def where(self, column: str, value) -> list[dict]:
+        if column not in self.columns:
+            raise ValueError(f"{self.table}.{column} is not an indexed column.")
+        return self._select(f"WHERE {column} = ?", (value,))
+
+    def get(self, slug: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute(f"SELECT record FROM {self.table} WHERE slug = ?", (slug,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def insert(self, record: dict) -> bool:
+        """Add a new record; False if the slug already exists."""
+        names = ", ".join(["slug", "position", *self.columns, "record"])
+        slots = ", ".join(["?", f"(SELECT COALESCE(MAX(position), -1) + 1 FROM {self.table})"] + ["?"] * (len(self.columns) + 1))
+        try:
+            with self._lock:
+                self._conn.execute(f"INSERT INTO {self.table} ({names}) VALUES ({slots})", self._row(record))
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def update(self, record: dict) -> bool:
+        assignments = ", ".join(f"{name} = ?" for name in [*self.columns, "record"])
+        slug, *values = self._row(record)
+        with self._lock:
+            cursor = self._conn.execute(f"UPDATE {self.table} SET {assignments} WHERE slug = ?", (*values, slug))
+        return cursor.rowcount > 0
+
+    def delete(self, slug: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(f"DELETE FROM {self.table} WHERE slug = ?", (slug,))
+        return cursor.rowcount > 0
+
+    def replace_all(self, records: list[dict]) -> None:
+        names = ", ".join(["slug", "position", *self.columns, "record"])
+        slots = ", ".join(["?"] * (len(self.columns) + 3))
+        rows = [(slug, position, *rest) for position, (slug, *rest) in enumerate(self._row(r) for r in records)]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(f"DELETE FROM {self.table}")
+                self._conn.executemany(f"INSERT INTO {self.table} ({names}) VALUES ({slots})", rows)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO registry_meta (key, value) VALUES (?, '1')", (f"{self.table}_imported",)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def imported(self) -> bool:
+        """True once the table has been seeded (from the JSON registry or by an explicit import)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM registry_meta WHERE key = ?", (f"{self.table}_imported",)
+            ).fetchone()
+        return row is not None
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_registries: dict[tuple[str, str], SqliteRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def open_projects_registry() -> SqliteRegistry:
+    return _open(
+        "projects",
+        {
+            "title_key": ("TEXT NOT NULL", lambda record: record["title"].lower()),
+            "sort_order": ("INTEGER NOT NULL", lambda record: int(record.get("sort_order") or 0)),
+            "deployment_host": ("TEXT NOT NULL", lambda record: str(record.get("deployment_host") or "")),
+        },
+        "sort_order, title_key, slug",
+        (("deployment_host",), ("sort_order", "title_key", "slug")),
+    )
+
+
+def open_hosts_registry() -> SqliteRegistry:
+    return _open(
+        "hosts",
+        {"title_key": ("TEXT NOT NULL", lambda record: record["title"].lower())},
+        "title_key, slug",
+        (("title_key", "slug"),),
+    )
+
+
+def _open(table, columns, order_by, indexes) -> SqliteRegistry:
+    db_path = registry_db_path()
+    key = (str(db_path), table)
+    with _registries_lock:
+        registry = _registries.get(key)
+        if registry is None:
+            registry = _registries[key] = SqliteRegistry(db_path, table, columns, order_by, indexes)
+        return registry
+
+
+def close_registries() -> None:
+    with _registries_lock:
+        registries = list(_registries.values())
+        _registries.clear()
+    for registry in registries:
+        registry.close()
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Callable
+
+
+def journal_enabled() -> bool:
+    raw = str(os.getenv("HQ_REGISTRY_JOURNAL") or "0").strip().lower()
+    return raw in {"1", "true", "yes", "on"}
+
+
+def compact_interval_seconds() -> float:
+    raw = str(os.getenv("HQ_REGISTRY_COMPACT_INTERVAL_SECONDS") or "30").strip()
+    try:
+        return max(1.0, min(float(raw), 3600.0))
+    except ValueError:
+        return 30.0
+
+
+def journal_max_entries() -> int:
+    raw = str(os.getenv("HQ_REGISTRY_JOURNAL_MAX_ENTRIES") or "500").strip()
+    try:
+        return max(1, min(int(raw), 100000))
+    except ValueError:
+        return 500
+
+
+def journal_path(path: Path) -> Path:
+    return path.with_name(f"{path.name}.journal")
+
+
+_path_locks: dict[str, threading.Lock] = {}
+_path_locks_guard = threading.Lock()
+_journal_counts: dict[str, int] = {}
+
+
+def _lock_for(path: Path) -> threading.Lock:
+    with _path_locks_guard:
+        return _path_locks.setdefault(str(path), threading.Lock())
+
+
+def _fsync_dir(directory: Path) -> None:
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return  # not supported on this platform
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """Replace `path` with `text` via temp file + fsync + rename, so readers never see a torn file."""
+    temp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(temp, "w", encoding="utf-8") as handle:
+            handle.write(text)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temp, path)
+    finally:
+        if temp.exists():
+            temp.unlink()
+    _fsync_dir(path.parent)
+
+
+def file_key(path: Path) -> tuple:
+    """Cache validator for a registry: (mtime, size, inode) of the snapshot and of its journal."""
+    stat = path.stat()
+    key = (str(path), stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    try:
+        journal = journal_path(path).stat()
+    except FileNotFoundError:
+        return key
+    return key + (journal.st_mtime_ns, journal.st_size, journal.st_ino)
+
+
+def _read_journal(path: Path) -> list[dict]:
+    try:
+        lines = journal_path(path).read_text(encoding="utf-8").splitlines()
+    except FileNotFoundError:
+        return []
+    entries = []
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            # A torn last line is what a crash mid-append leaves behind; anything else is damage.
+            if number != len(lines):
+                print(f"[Registry] Skipping unreadable line {number} of {journal_path(path).name}.")
+            continue
+        if isinstance(entry, dict) and entry.get("op") in {"put", "delete"} and entry.get("slug"):
+            entries.append(entry)
+    return entries
+
+
+def apply_journal(path: Path, records: list) -> list:
+    """Replay the journal of `path` onto its snapshot records (a list of dicts keyed by `slug`)."""
+    entries = _read_journal(path)
+    if not entries:
+        return records
+    by_slug = {str(record.get("slug") or ""): record for record in records if isinstance(record, dict)}
+    for entry in entries:
+        if entry["op"] == "put" and isinstance(entry.get("record"), dict):
+            by_slug[entry["slug"]] = entry["record"]
+        elif entry["op"] == "delete":
+            by_slug.pop(entry["slug"], None)
+    return list(by_slug.values())
+
+
+def save_records(path: Path, records: list[dict], change: dict | None = None) -> None:
+    """Persist a registry after one mutation.
+
+    With `HQ_REGISTRY_JOURNAL` on and a `change` (`{"op": "put", "slug", "record"}` or
+    `{"op": "delete", "slug"}`) this is a single fsynced journal append; otherwise the whole
+    snapshot is replaced atomically. A journal past `HQ_REGISTRY_JOURNAL_MAX_ENTRIES` is folded
+    into the snapshot right away instead of waiting for the background compactor.
+    """
+    with _lock_for(path):
+        if change is None or not journal_enabled():
+            atomic_write_text(path, f"{json.dumps(records, indent=2)}\n")
+            journal = journal_path(path)
+            if journal.exists():
+                journal.unlink()
+            _journal_counts.pop(str(path), None)
+            return
+        with open(journal_path(path), "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(change) + "\n")
+            handle.flush()
+            os.fsync(handle.fileno())
+        count = _journal_counts.get(str(path))
+        count = len(_read_journal(path)) if count is None else count + 1
+        _journal_counts[str(path)] = count
+        if count >= journal_max_entries():
+            _compact_locked(path)
+
+
+def _compact_locked(path: Path) -> bool:
+    journal = journal_path(path)
+    if not journal.exists():
+        return False
+    try:
+        snapshot = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        print(f"[Registry] Not compacting {journal.name}: snapshot unreadable ({exc}).")
+        return False
+    if not isinstance(snapshot, list):
+        return False
+    records = apply_journal(path, snapshot)
+    # Snapshot first, then drop the journal: a crash in between replays puts/deletes that
+    # are already in the snapshot, which is harmless.
+    atomic_write_text(path, f"{json.dumps(records, indent=2)}\n")
+    journal.unlink()
+    _journal_counts.pop(str(path), None)
+    return True
+
+
+def compact_journal(path: Path) -> bool:
+    """Fold the journal of `path` into its snapshot. Returns True if there was one."""
+    with _lock_for(path):
+        return _compact_locked(path)
+
+
+class JournalCompactor:
+    """Background thread that folds registry journals into their snapshots every interval."""
+
+    def __init__(self, paths: list[Callable[[], Path]]):
+        self._paths = paths
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.compactions = 0
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="hq-registry-compactor", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        self.compact_all()
+
+    def compact_all(self) -> int:
+        compacted = 0
+        for resolve in self._paths:
+            try:
+                compacted += int(compact_journal(resolve()))
+            except OSError as exc:
+                print(f"[Registry] Journal compaction failed: {exc}")
+        self.compactions += compacted
+        return compacted
+
+    def _run(self) -> None:
+        while not self._stop.wait(compact_interval_seconds()):
+            self.compact_all()
+
+    def stats(self) -> dict:
+        return {"enabled": journal_enabled(), "compactions": self.compactions}
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import http.client
+import json
+import os
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Errors that mean a kept-alive connection was closed by the runner while idle in the pool.
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+def max_connections_per_host() -> int:
+    raw = str(os.getenv("HQ_RUNNER_MAX_CONNECTIONS") or "4").strip()
+    try:
+        return max(1, min(int(raw), 64))
+    except ValueError:
+        return 4
+
+
+def max_streams_per_host() -> int:
+    raw = str(os.getenv("HQ_RUNNER_MAX_STREAMS") or "4").strip()
+    try:
+        return max(1, min(int(raw), 64))
+    except ValueError:
+        return 4
+
+
+def idle_seconds() -> float:
+    raw = str(os.getenv("HQ_RUNNER_IDLE_SECONDS") or "20").strip()
+    try:
+        return max(1.0, min(float(raw), 300.0))
+    except ValueError:
+        return 20.0
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: float | None = None):
+        super().__init__("localhost", timeout=timeout)
+        self._socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._socket_path)
+
+
+class _HostPool:
+    def __init__(self, factory, limit: int, stream_limit: int):
+        self.factory = factory
+        self.slots = threading.BoundedSemaphore(limit)
+        # Long-lived streaming requests (`/run` with `"stream": true`) draw from their own budget,
+        # so running deploys never take the slots health checks need.
+        self.stream_slots = threading.BoundedSemaphore(stream_limit)
+        self.idle: list[tuple[http.client.HTTPConnection, float]] = []
+        self.lock = threading.Lock()
+        self.stats = {
+            "requests": 0,
+            "reused": 0,
+            "connections": 0,
+            "errors": 0,
+            "streams": 0,
+            "total_ms": 0.0,
+        }
+
+
+class RunnerClient:
+    """Keep-alive HTTP/1.1 client for host action runners, over Unix sockets or HTTP(S).
+
+    Each runner endpoint gets a small pool: at most `HQ_RUNNER_MAX_CONNECTIONS` requests are in
+    flight per host (others wait for a slot), and finished connections go back to the pool
+    until they have been idle for `HQ_RUNNER_IDLE_SECONDS`. Streaming requests (`stream=True`)
+    count against a separate `HQ_RUNNER_MAX_STREAMS` budget instead. A pooled connection the runner
+    already closed is retried once on a fresh connection.
+    """
+
+    def __init__(self):
+        self._pools: dict[tuple[str, str], _HostPool] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def endpoint_key(runner: dict) -> tuple[str, str]:
+        socket_path = str(runner.get("runner_socket_path") or "").strip()
+        if socket_path:
+            return ("socket", socket_path)
+        parts = urlsplit(str(runner.get("runner_url") or "").strip())
+        return (parts.scheme or "http", parts.netloc)
+
+    def _pool_for(self, runner: dict) -> tuple[_HostPool, str]:
+        key = self.endpoint_key(runner)
+        base_path = "" if key[0] == "socket" else urlsplit(str(runner.get("runner_url") or "")).path.rstrip("/")
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                transport, address = key
+                if transport == "socket":
+                    factory = lambda timeout: UnixHTTPConnection(address, timeout=timeout)  # noqa: E731
+                elif transport == "https":
+                    factory = lambda timeout: http.client.HTTPSConnection(address, timeout=timeout)  # noqa: E731
+                else:
+                    factory = lambda timeout: http.client.HTTPConnection(address, timeout=timeout)  # noqa: E731
+                pool = self._pools[key] = _HostPool(factory, max_connections_per_host(), max_streams_per_host())
+        return pool, base_path
+
+    def _checkout(self, pool: _HostPool, timeout: float) -> tuple[http.client.HTTPConnection, bool]:
+        cutoff = time.monotonic() - idle_seconds()
+        with pool.lock:
+            while pool.idle:
+                connection, idle_since = pool.idle.pop()
+                if idle_since >= cutoff:
+                    connection.timeout = timeout
+                    if connection.sock is not None:
+                        connection.sock.settimeout(timeout)
+                    return connection, True
+                connection.close()
+        return self._checkout_fresh(pool, timeout), False
+
+    def _checkout_fresh(self, pool: _HostPool, timeout: float) -> http.client.HTTPConnection:
+        with pool.lock:
+            pool.stats["connections"] += 1
+        return pool.factory(timeout)
+
+    def _checkin(self, pool: _HostPool, connection: http.client.HTTPConnection, response) -> None:
+        if response.will_close:
+            connection.close()
+            return
+        with pool.lock:
+            pool.idle.append((connection, time.monotonic()))
+
+    def open(
+        self,
+        runner: dict,
+        method: str,
+        path: str,
+        payload: dict | None = None,
+        timeout: float = 10,
+        *,
+        stream: bool = False,
+    ):
+        """Send a request and return `(release, response)` with the body still unread.
+
+        Call `release()` once the body has been consumed (or abandoned) to hand the connection
+        back to the pool. Pass `stream=True` for responses read over minutes (streamed `/run`)
+        so they wait for a stream slot rather than a request slot. Raises
+        `OSError`/`http.client.HTTPException` on transport failures.
+        """
+        pool, base_path = self._pool_for(runner)
+        headers = {}
+        token = str(runner.get("token") or "").strip()
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        body = None
+        if payload is not None:
+            body = json.dumps(payload)
+            headers["Content-Type"] = "application/json"
+
+        slots = pool.stream_slots if stream else pool.slots
+        if not slots.acquire(timeout=timeout):
+            raise TimeoutError(f"No free runner connection within {timeout:g}s.")
+        started = time.perf_counter()
+        try:
+            connection, reused = self._checkout(pool, timeout)
+            try:
+                connection.request(method, f"{base_path}{path}", body=body, headers=headers)
+                response = connection.getresponse()
+            except _STALE_CONNECTION_ERRORS:
+                connection.close()
+                if not reused:
+                    raise
+                connection, reused = self._checkout_fresh(pool, timeout), False
+                connection.request(method, f"{base_path}{path}", body=body, headers=headers)
+                response = connection.getresponse()
+        except Exception:
+            with pool.lock:
+                pool.stats["requests"] += 1
+                pool.stats["errors"] += 1
+            slots.release()
+            raise
+
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if released:
+                return
+            released = True
+            if response.isclosed():
+                self._checkin(pool, connection, response)
+            else:
+                connection.close()
+            with pool.lock:
+                pool.stats["requests"] += 1
+                pool.stats["reused"] += int(reused)
+                pool.stats["streams"] += int(stream)
+                pool.stats["total_ms"] += (time.perf_counter() - started) * 1000
+            slots.release()
+
+        return release, response
+
+    def request(
+        self, runner: dict, method: str, path: str, payload: dict | None = None, timeout: float = 10
+    ) -> tuple[int, str]:
+        """Send one request to a runner and return `(status, body text)`."""
+        release, response = self.open(runner, method, path, payload, timeout)
+        try:
+            return response.status, response.read().decode("utf-8")
+        finally:
+            release()
+
+    def close(self) -> None:
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            with pool.lock:
+                for connection, _idle_since in pool.idle:
+                    connection.close()
+                pool.idle.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            pools = dict(self._pools)
+        result = {}
+        for (transport, address), pool in pools.items():
+            with pool.lock:
+                stats = dict(pool.stats)
+                stats["idle"] = len(pool.idle)
+            requests = stats["requests"]
+            stats["avg_ms"] = round(stats.pop("total_ms") / requests, 1) if requests else None
+            result[f"{transport}:{address}"] = stats
+        return result
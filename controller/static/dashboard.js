@@ -1,5 +1,6 @@
     const REFRESH_RATE = 2000;
     const PROJECT_REFRESH_RATE = 45000;
+    const ACTION_POLL_RATE = 1000;
     const WIDGET_LAYOUT_STORAGE_KEY = 'dashboard.widgetLayout.v1';
     const WIDGET_ORDER_STORAGE_KEY = 'dashboard.widgetOrder.v1';
     const HIDDEN_TOOLS_STORAGE_KEY = 'dashboard.hiddenTools.v1';
@@ -32,7 +33,8 @@
         dragAutoScrollRaf: 0,
         dragPointer: null,
         settings: { ...DEFAULT_SETTINGS },
-        statusRefreshPromise: null
+        statusRefreshPromise: null,
+        eventsConnected: false
     };
     const CATEGORY_ORDER = { display: 0, hybrid: 1, background: 2 };
 
@@ -704,6 +706,9 @@
     }
 
     function projectFeedbackMessage(project) {
+        if (project.action_result?.running) {
+            return `${projectActionLabel(project.action_result.action)} running...`;
+        }
         if (project.action_result?.ok) {
             return `${projectActionLabel(project.action_result.action)} finished successfully.`;
         }
@@ -1023,7 +1028,7 @@
             article.appendChild(
                 el(
                     'div',
-                    `project-action-feedback${project.action_result?.ok ? ' is-success' : ' is-error'}`,
+                    `project-action-feedback${project.action_result?.running ? '' : (project.action_result?.ok ? ' is-success' : ' is-error')}`,
                     actionFeedback
                 )
             );
@@ -1032,14 +1037,14 @@
         if (project.action_result) {
             const panel = el(
                 'div',
-                `project-action-result${project.action_result.ok ? ' is-success' : ' is-error'}`
+                `project-action-result${project.action_result.running ? '' : (project.action_result.ok ? ' is-success' : ' is-error')}`
             );
             const panelHeader = el('div', 'project-action-result-header');
             panelHeader.appendChild(
                 el(
                     'div',
                     'project-action-result-title',
-                    `${projectActionLabel(project.action_result.action)} ${project.action_result.ok ? 'succeeded' : 'failed'}`
+                    `${projectActionLabel(project.action_result.action)} ${project.action_result.running ? 'running' : (project.action_result.ok ? 'succeeded' : 'failed')}`
                 )
             );
             if (project.action_result.ran_at) {
@@ -1324,18 +1329,44 @@
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({ action })
             });
-            const data = await readJsonResponse(resp);
-            if (!resp.ok) {
-                updateProjectState(slug, { action_result: data });
-                throw new Error(data?.detail || data?.stderr || `${action} failed`);
+            const submitted = await readJsonResponse(resp);
+            if (!resp.ok || !submitted?.job) {
+                updateProjectState(slug, { action_result: { ok: false, action, ...submitted } });
+                throw new Error(submitted?.detail || `${action} failed`);
+            }
+            const data = await pollActionJob(slug, submitted.job);
+            if (!data.ok) {
+                throw new Error(data.detail || data.stderr || `${action} failed`);
             }
-            updateProjectState(slug, { action_result: data });
             setProjectsFeedback(`${projectActionLabel(action)} completed.`, 'success');
         } catch (error) {
             setProjectsFeedback(error.message || `Failed to ${action} project.`, 'error');
         }
     }
 
+    // Polls `/actions/{id}` until the job finishes, showing its live output tail meanwhile.
+    async function pollActionJob(slug, job) {
+        let current = job;
+        while (true) {
+            const running = current.status === 'queued' || current.status === 'running';
+            updateProjectState(slug, {
+                action_result: {
+                    ...current,
+                    running,
+                    ok: Boolean(current.ok),
+                    detail: current.status === 'queued' ? 'Waiting for an earlier action on this project...' : current.detail,
+                    ran_at: current.started_at || current.created_at
+                }
+            });
+            if (!running) return current;
+            await new Promise(resolve => setTimeout(resolve, ACTION_POLL_RATE));
+            const resp = await fetch(`/actions/${encodeURIComponent(current.id)}`);
+            const data = await readJsonResponse(resp);
+            if (!resp.ok) throw new Error(data?.detail || 'Failed to read action status.');
+            current = data;
+        }
+    }
+
     async function deleteProjectRecord(project) {
         if (!project?.slug) {
             state.projects = state.projects.filter(item => item.draft_key !== project?.draft_key);
@@ -2331,69 +2362,70 @@
         setTimeout(refreshAllStatuses, 1000);
     }
 
-    async function refreshAllStatuses() {
-        if (state.statusRefreshPromise) return state.statusRefreshPromise;
-        state.statusRefreshPromise = (async () => {
-        try {
-            const resp = await fetch('/tools/status-all');
-            const data = await resp.json();
-            const tools = data.tools || [];
+    function applyToolStatuses(tools) {
+        tools.forEach(tool => {
+            const entry = state.toolMap.get(tool.name);
+            if (!entry) return;
 
-            tools.forEach(tool => {
-                const entry = state.toolMap.get(tool.name);
-                if (!entry) return;
-
-                const { card, statusDot, statusText, btn, sId } = entry;
-                const widgetBox = document.getElementById(`widget-box-${sId}`);
-                const iframe = document.getElementById(`iframe-${sId}`);
-                const resizeControls = widgetBox ? widgetBox.querySelectorAll('.widget-resize-control') : [];
-                const alive = !!tool.alive;
-                entry.statusKnown = true;
-                entry.alive = alive;
-
-                card.dataset.alive = alive ? '1' : '0';
-                card.classList.toggle('status-running', alive);
-                card.classList.toggle('status-stopped', !alive);
-
-                statusDot.classList.toggle('running', alive);
-                statusDot.classList.toggle('stopped', !alive);
-
-                statusText.textContent = alive
-                    ? `Running (PID: ${tool.pid})`
-                    : 'Stopped';
-
-                btn.disabled = false;
-                btn.dataset.action = alive ? 'kill' : 'launch';
-                btn.className = alive ? 'btn-status btn-green' : 'btn-status btn-red';
-                syncToolMenuActions(tool.name);
-
-                if (widgetBox && iframe) {
-                    if (alive) {
-                        if (!iframe.src) {
-                            iframe.src = `/proxy/${encodeURIComponent(tool.name)}/widget`;
-                        }
-                        widgetBox.style.display = 'block';
-                        resizeControls.forEach(node => {
-                            node.style.display = 'block';
-                        });
-                    } else {
-                        widgetBox.style.display = 'none';
-                        iframe.removeAttribute('src');
-                        resizeControls.forEach(node => {
-                            node.style.display = 'none';
-                        });
+            const { card, statusDot, statusText, btn, sId } = entry;
+            const widgetBox = document.getElementById(`widget-box-${sId}`);
+            const iframe = document.getElementById(`iframe-${sId}`);
+            const resizeControls = widgetBox ? widgetBox.querySelectorAll('.widget-resize-control') : [];
+            const alive = !!tool.alive;
+            entry.statusKnown = true;
+            entry.alive = alive;
+
+            card.dataset.alive = alive ? '1' : '0';
+            card.classList.toggle('status-running', alive);
+            card.classList.toggle('status-stopped', !alive);
+
+            statusDot.classList.toggle('running', alive);
+            statusDot.classList.toggle('stopped', !alive);
+
+            statusText.textContent = alive
+                ? `Running (PID: ${tool.pid})`
+                : (tool.exit_code > 0 ? `Exited (code ${tool.exit_code})` : 'Stopped');
+
+            btn.disabled = false;
+            btn.dataset.action = alive ? 'kill' : 'launch';
+            btn.className = alive ? 'btn-status btn-green' : 'btn-status btn-red';
+            syncToolMenuActions(tool.name);
+
+            if (widgetBox && iframe) {
+                if (alive) {
+                    if (!iframe.src) {
+                        iframe.src = `/proxy/${encodeURIComponent(tool.name)}/widget`;
                     }
+                    widgetBox.style.display = 'block';
+                    resizeControls.forEach(node => {
+                        node.style.display = 'block';
+                    });
+                } else {
+                    widgetBox.style.display = 'none';
+                    iframe.removeAttribute('src');
+                    resizeControls.forEach(node => {
+                        node.style.display = 'none';
+                    });
                 }
+            }
 
-                requestAnimationFrame(() => resizeCard(card));
-            });
+            requestAnimationFrame(() => resizeCard(card));
+        });
 
-            enforceCardSpanConstraints();
-            requestAnimationFrame(resizeAllCards);
-            if (state.hiddenToolsMenuOpen) renderHiddenToolsMenu();
-            if (state.reorderModeOpen) renderReorderPanel();
-            updateStatusPills();
+        enforceCardSpanConstraints();
+        requestAnimationFrame(resizeAllCards);
+        if (state.hiddenToolsMenuOpen) renderHiddenToolsMenu();
+        if (state.reorderModeOpen) renderReorderPanel();
+        updateStatusPills();
+    }
 
+    async function refreshAllStatuses() {
+        if (state.statusRefreshPromise) return state.statusRefreshPromise;
+        state.statusRefreshPromise = (async () => {
+        try {
+            const resp = await fetch('/tools/status-all');
+            const data = await resp.json();
+            applyToolStatuses(data.tools || []);
         } catch (e) {
             console.error('Refresh failed', e);
         }
@@ -2406,6 +2438,44 @@
         }
     }
 
+    // Status and health changes are pushed over `/events`; the intervals below only poll while
+    // the stream is down (or EventSource is unavailable).
+    function connectEvents() {
+        if (!window.EventSource) return;
+        const source = new EventSource('/events');
+        source.addEventListener('open', () => {
+            state.eventsConnected = true;
+        });
+        source.addEventListener('error', () => {
+            state.eventsConnected = false;
+        });
+        source.addEventListener('snapshot', event => {
+            applyToolStatuses(JSON.parse(event.data).tools || []);
+        });
+        source.addEventListener('tool_status', event => {
+            const data = JSON.parse(event.data);
+            if ((data.removed || []).length) {
+                loadDashboard();
+                return;
+            }
+            applyToolStatuses(data.tools || []);
+        });
+        source.addEventListener('health', event => {
+            const data = JSON.parse(event.data);
+            if (Object.keys(data.hosts || {}).length) {
+                loadHosts({ silent: true, refreshHealth: false });
+            }
+            if (Object.keys(data.projects || {}).length) {
+                loadProjects({ silent: true, auto: true, refreshHealth: false });
+            }
+        });
+        source.addEventListener('resync', () => {
+            refreshAllStatuses();
+            loadHosts({ silent: true, refreshHealth: false });
+            loadProjects({ silent: true, auto: true, refreshHealth: false });
+        });
+    }
+
     els.container.addEventListener('dragover', event => {
         if (!state.dragSource) return;
         event.preventDefault();
@@ -2547,6 +2617,14 @@
     loadHosts({ silent: true });
     loadProjects({ silent: true });
     loadDashboard();
-    setInterval(refreshAllStatuses, REFRESH_RATE);
-    setInterval(() => refreshHostsHealth({ silent: true }), PROJECT_REFRESH_RATE);
-    setInterval(() => refreshProjectsHealth({ silent: true }), PROJECT_REFRESH_RATE);
+    connectEvents();
+    setInterval(() => {
+        if (!state.eventsConnected) refreshAllStatuses();
+    }, REFRESH_RATE);
+    // The controller's health scheduler keeps these caches warm; polling just reads them.
+    setInterval(() => {
+        if (!state.eventsConnected) loadHosts({ silent: true, refreshHealth: false });
+    }, PROJECT_REFRESH_RATE);
+    setInterval(() => {
+        if (!state.eventsConnected) loadProjects({ silent: true, auto: true, refreshHealth: false });
+    }, PROJECT_REFRESH_RATE);
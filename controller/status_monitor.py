@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import os
+import threading
+from typing import Callable
+
+from controller.events import EventBroker
+
+
+def status_interval_seconds() -> float:
+    raw = str(os.getenv("HQ_STATUS_INTERVAL_SECONDS") or "2").strip()
+    try:
+        return max(0.5, min(float(raw), 60.0))
+    except ValueError:
+        return 2.0
+
+
+class ToolStatusMonitor:
+    """Single poller of tool liveness that publishes `tool_status` deltas to the event broker.
+
+    Only tools whose alive/pid state changed since the previous poll are published. The loop
+    idles while nobody is subscribed to `/events`; `poke()` forces an early poll after a launch
+    or kill so the dashboard does not wait a full interval.
+    """
+
+    def __init__(self, load_statuses: Callable[[], list[dict]], broker: EventBroker):
+        self._load_statuses = load_statuses
+        self._broker = broker
+        self._lock = threading.Lock()
+        self._last: dict[str, tuple[bool, int | None]] = {}
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.polls = 0
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="hq-status-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def poke(self) -> None:
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if self._broker.subscriber_count():
+                try:
+                    self.poll()
+                except Exception as exc:  # keep the monitor alive through a bad DB read
+                    print(f"[Status] Tool status poll failed: {exc}")
+            self._wake.wait(status_interval_seconds())
+            self._wake.clear()
+
+    def poll(self) -> list[dict]:
+        """Read every tool's status, publish what changed, and return the full list."""
+        statuses = self._load_statuses()
+        current = {status["name"]: (bool(status["alive"]), status.get("pid")) for status in statuses}
+        with self._lock:
+            changed = [status for status in statuses if self._last.get(status["name"]) != current[status["name"]]]
+            removed = sorted(set(self._last) - set(current))
+            baseline = self.polls == 0  # every subscriber starts from a full snapshot anyway
+            self._last = current
+            self.polls += 1
+        if (changed or removed) and not baseline:
+            self._broker.publish("tool_status", {"tools": changed, "removed": removed})
+        return statuses
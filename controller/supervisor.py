@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import subprocess
+import threading
+from typing import Callable
+
+from controller.db import record_tool_exit
+
+
+class ProcessSupervisor:
+    """Keeps the Popen handles of launched tools and reaps them as soon as they exit.
+
+    Each child gets a daemon thread blocked in `wait()`, so exits are noticed immediately without
+    polling and no zombie is left behind. The exit code and time are written to the tools table,
+    then every listener is called with `(name, pid, exit_code)`.
+
+    Tools re-adopted after a controller restart are not our children and cannot be waited on;
+    those still go through the psutil checks in `ProcessManager`.
+    """
+
+    def __init__(self):
+        self._children: dict[int, tuple[str, subprocess.Popen]] = {}
+        self._listeners: list[Callable[[str, int, int], object]] = []
+        self._lock = threading.Lock()
+        self.exits = 0
+
+    def add_listener(self, listener: Callable[[str, int, int], object]) -> None:
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[str, int, int], object]) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def track(self, name: str, proc: subprocess.Popen) -> None:
+        with self._lock:
+            self._children[proc.pid] = (name, proc)
+        threading.Thread(
+            target=self._wait, args=(name, proc), name=f"hq-supervise-{name}", daemon=True
+        ).start()
+
+    def owns(self, pid: int | None) -> bool:
+        """True while `pid` is a supervised child that has not exited (an O(1) liveness check)."""
+        with self._lock:
+            return bool(pid) and pid in self._children
+
+    def _wait(self, name: str, proc: subprocess.Popen) -> None:
+        exit_code = proc.wait()
+        try:
+            record_tool_exit(name, proc.pid, exit_code)
+        except Exception as exc:
+            print(f"[Supervisor] Failed to record exit of '{name}': {exc}")
+        with self._lock:
+            self._children.pop(proc.pid, None)
+            self.exits += 1
+            listeners = list(self._listeners)
+        print(f"[Supervisor] '{name}' (pid {proc.pid}) exited with code {exit_code}.")
+        for listener in listeners:
+            try:
+                listener(name, proc.pid, exit_code)
+            except Exception as exc:
+                print(f"[Supervisor] Exit listener failed for '{name}': {exc}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"children": len(self._children), "exits": self.exits}
+
+
+SUPERVISOR = ProcessSupervisor()
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import gzip
+import os
+import shutil
+import threading
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+LOG_DIR = BASE_DIR / "logs"
+LOG_STREAMS = ("out", "err")
+MAX_READ_BYTES = 256 * 1024
+
+
+def max_log_bytes() -> int:
+    raw = str(os.getenv("HQ_TOOL_LOG_MAX_BYTES") or str(10 * 1024 * 1024)).strip()
+    try:
+        return max(64 * 1024, int(raw))
+    except ValueError:
+        return 10 * 1024 * 1024
+
+
+def log_backups() -> int:
+    raw = str(os.getenv("HQ_TOOL_LOG_BACKUPS") or "5").strip()
+    try:
+        return max(1, min(int(raw), 50))
+    except ValueError:
+        return 5
+
+
+def rotate_interval_seconds() -> float:
+    raw = str(os.getenv("HQ_TOOL_LOG_ROTATE_INTERVAL_SECONDS") or "60").strip()
+    try:
+        return max(5.0, min(float(raw), 3600.0))
+    except ValueError:
+        return 60.0
+
+
+def log_path(name: str, stream: str) -> Path:
+    return LOG_DIR / f"{name}.{stream}.log"
+
+
+def rotate_log(path: Path, max_bytes: int | None = None, backups: int | None = None) -> bool:
+    """Copy-truncate rotation: gzip the live file into `.1.gz` and truncate it in place.
+
+    Tools keep their log descriptor open in append mode for their whole life, so the file cannot
+    be renamed out from under them; truncating lets their next write land at offset 0. Lines
+    written between the copy and the truncate are lost, which is the usual copytruncate trade-off.
+    """
+    limit = max_log_bytes() if max_bytes is None else max_bytes
+    keep = log_backups() if backups is None else backups
+    try:
+        if path.stat().st_size <= limit:
+            return False
+    except FileNotFoundError:
+        return False
+
+    for index in range(keep - 1, 0, -1):
+        older = path.with_name(f"{path.name}.{index}.gz")
+        if older.exists():
+            older.replace(path.with_name(f"{path.name}.{index + 1}.gz"))
+    segment = path.with_name(f"{path.name}.1.gz")
+    partial = segment.with_name(segment.name + ".tmp")
+    with open(path, "rb") as src, gzip.open(partial, "wb") as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+    partial.replace(segment)
+    with open(path, "r+b") as live:
+        live.truncate(0)
+    return True
+
+
+def rotate_all_logs() -> list[str]:
+    rotated = []
+    if not LOG_DIR.exists():
+        return rotated
+    for path in sorted(LOG_DIR.glob("*.log")):
+        try:
+            if rotate_log(path):
+                rotated.append(path.name)
+        except OSError as exc:
+            print(f"[Logs] Failed to rotate {path.name}: {exc}")
+    return rotated
+
+
+def read_log(path: Path, offset: int | None = None, tail: int | None = None, limit: int = MAX_READ_BYTES) -> dict:
+    """Read at most `limit` bytes of a log from a byte offset (or the last `tail` bytes).
+
+    Returns the decoded text plus `next_offset` for the following call. An offset past the end
+    means the file was rotated, so reading restarts at 0 and `rotated` is set. Reads that stop
+    before EOF end on a line boundary when one is in range, so lines are not split across calls.
+    """
+    limit = max(1, min(int(limit), MAX_READ_BYTES))
+    try:
+        size = path.stat().st_size
+    except FileNotFoundError:
+        return {"offset": 0, "next_offset": 0, "size": 0, "data": "", "rotated": False, "eof": True}
+
+    rotated = False
+    if offset is None:
+        start = max(0, size - min(tail, limit)) if tail is not None else 0
+    elif offset > size:
+        start, rotated = 0, True
+    else:
+        start = max(0, offset)
+
+    with open(path, "rb") as handle:
+        partial_line = False
+        if offset is None and tail is not None and start > 0:
+            handle.seek(start - 1)
+            partial_line = handle.read(1) != b"\n"
+        handle.seek(start)
+        chunk = handle.read(limit)
+        if partial_line:
+            # Drop the partial first line of a tail read.
+            newline = chunk.find(b"\n")
+            if newline != -1:
+                start += newline + 1
+                chunk = chunk[newline + 1:]
+
+    end = start + len(chunk)
+    if end < size:
+        newline = chunk.rfind(b"\n")
+        if newline != -1:
+            chunk = chunk[:newline + 1]
+            end = start + len(chunk)
+    return {
+        "offset": start,
+        "next_offset": end,
+        "size": size,
+        "data": chunk.decode("utf-8", errors="replace"),
+        "rotated": rotated,
+        "eof": end >= size,
+    }
+
+
+class LogRotator:
+    """Background thread that rotates oversized tool logs every `HQ_TOOL_LOG_ROTATE_INTERVAL_SECONDS`."""
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.rotations = 0
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="hq-log-rotator", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(rotate_interval_seconds()):
+            self.rotations += len(rotate_all_logs())
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+
+import httpx
+
+
+def _env_int(name: str, default: int, minimum: int = 1) -> int:
+    raw = str(os.getenv(name) or "").strip()
+    try:
+        return max(minimum, int(raw)) if raw else default
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = str(os.getenv(name) or "").strip()
+    try:
+        return max(0.1, float(raw)) if raw else default
+    except ValueError:
+        return default
+
+
+class ToolProxyClient:
+    """Long-lived async HTTP clients for proxying to local tools, one keep-alive pool per tool.
+
+    Each tool gets its own `httpx.AsyncClient` so a tool that hangs on every request can
+    only exhaust its own connection slots, never the pools of the other tools.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_connections: int | None = None,
+        max_keepalive_connections: int | None = None,
+        keepalive_expiry: float | None = None,
+        timeout: float | None = None,
+        connect_timeout: float | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections or _env_int("HQ_PROXY_MAX_CONNECTIONS", 20),
+            max_keepalive_connections=(
+                max_keepalive_connections or _env_int("HQ_PROXY_MAX_KEEPALIVE_CONNECTIONS", 10)
+            ),
+            keepalive_expiry=keepalive_expiry or _env_float("HQ_PROXY_KEEPALIVE_EXPIRY_SECONDS", 30.0),
+        )
+        self.timeout = httpx.Timeout(
+            timeout or _env_float("HQ_PROXY_TIMEOUT_SECONDS", 30.0),
+            connect=connect_timeout or _env_float("HQ_PROXY_CONNECT_TIMEOUT_SECONDS", 5.0),
+        )
+        self._transport = transport
+        self._clients: dict[str, tuple[int, httpx.AsyncClient]] = {}
+        self._lock = threading.Lock()
+        self._requests: dict[str, int] = {}
+
+    def client_for(self, name: str, port: int) -> httpx.AsyncClient:
+        """Return the pooled client for a tool, replacing it if the tool moved to another port."""
+        stale = None
+        with self._lock:
+            self._requests[name] = self._requests.get(name, 0) + 1
+            entry = self._clients.get(name)
+            if entry and entry[0] == port:
+                return entry[1]
+            if entry:
+                stale = entry[1]
+            client = httpx.AsyncClient(
+                base_url=f"http://127.0.0.1:{port}",
+                limits=self.limits,
+                timeout=self.timeout,
+                transport=self._transport,
+                follow_redirects=False,
+            )
+            self._clients[name] = (port, client)
+        if stale is not None:
+            _close_later(stale)
+        return client
+
+    async def aclose(self) -> None:
+        with self._lock:
+            clients = [client for _port, client in self._clients.values()]
+            self._clients.clear()
+        for client in clients:
+            await client.aclose()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_connections": self.limits.max_connections,
+                "max_keepalive_connections": self.limits.max_keepalive_connections,
+                "keepalive_expiry": self.limits.keepalive_expiry,
+                "timeout": self.timeout.read,
+                "connect_timeout": self.timeout.connect,
+                "tools": {
+                    name: {"port": port, "requests": self._requests.get(name, 0)}
+                    for name, (port, _client) in sorted(self._clients.items())
+                },
+            }
+
+
+def _close_later(client: httpx.AsyncClient) -> None:
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    loop.create_task(client.aclose())
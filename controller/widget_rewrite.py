@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+# One alternation covering every root-relative reference form a widget can emit. Each branch is
+# bounded in length so a streaming rewriter only needs to hold back a short tail between chunks.
+_ROOT_REFERENCE = re.compile(
+    rb"""
+    (?P<lead>
+        \b(?:src|href|action)=["']          # src="/..."  href='/...'  action="/..."
+      | \bfetch\(\s{0,4}["']                # fetch("/...")
+      | \burl\(\s{0,4}["']?                 # url(/...)  url("/...")
+      | \bimport\s{0,4}\(?\s{0,4}["']       # import "/..."  import("/...")
+      | \bfrom\s{1,4}["']                   # import x from "/..."
+    )
+    /(?!/|proxy/)                           # skip protocol-relative and already-proxied URLs
+    """,
+    re.VERBOSE,
+)
+_HOLDBACK = 64
+
+
+class WidgetRewriter:
+    """Single-pass rewriter for root-relative URLs in widget HTML/JS.
+
+    Feed it chunks as they arrive; a short tail is held back between calls so a reference split
+    across two chunks is still rewritten exactly once.
+    """
+
+    def __init__(self, tool_name: str):
+        self._prefix = f"/proxy/{tool_name}/".encode("utf-8")
+        self._pending = b""
+        self._context = b""
+
+    def feed(self, chunk: bytes, *, final: bool = False) -> bytes:
+        buf = self._context + self._pending + chunk
+        start = len(self._context)
+        limit = len(buf) if final else max(start, len(buf) - _HOLDBACK)
+
+        out = []
+        pos = start
+        for match in _ROOT_REFERENCE.finditer(buf, start):
+            if match.start() >= limit:
+                break
+            out.append(buf[pos:match.start()])
+            out.append(match.group("lead"))
+            out.append(self._prefix)
+            pos = match.end()
+        emit_end = max(pos, limit)
+        out.append(buf[pos:emit_end])
+
+        self._pending = buf[emit_end:]
+        # Keep one already-emitted byte so `\b` at the start of the next scan sees its neighbour.
+        self._context = buf[emit_end - 1:emit_end] if emit_end > 0 else b""
+        return b"".join(out)
+
+    def flush(self) -> bytes:
+        return self.feed(b"", final=True)
+
+
+def rewrite_widget_body(content: bytes, tool_name: str) -> bytes:
+    """Rewrite a complete widget body in one pass."""
+    return WidgetRewriter(tool_name).feed(content, final=True)
+
+
+def content_validator(content: bytes) -> str:
+    return f"sha256:{hashlib.sha256(content).hexdigest()}"
+
+
+def is_http_validator(validator: str) -> bool:
+    return validator.startswith('"') or validator.startswith('W/"')
+
+
+def parse_if_none_match(header: str | None) -> list[str]:
+    return [tag.strip() for tag in str(header or "").split(",") if tag.strip()]
+
+
+def etag_matches(header: str | None, etag: str) -> bool:
+    """Weak comparison, as If-None-Match requires."""
+    tags = parse_if_none_match(header)
+    if "*" in tags:
+        return True
+    bare = etag.removeprefix("W/")
+    return any(tag.removeprefix("W/") == bare for tag in tags)
+
+
+class RewriteCache:
+    """Per-tool LRU of rewritten widget bodies, keyed by path (with its query string) and upstream validator.
+
+    The validator is the upstream ETag when the tool sends one (so the proxy can revalidate
+    with `If-None-Match`), otherwise a hash of the upstream body.
+    """
+
+    def __init__(self, max_entries_per_tool: int = 16, max_entry_bytes: int = 2 * 1024 * 1024):
+        self.max_entries_per_tool = max_entries_per_tool
+        self.max_entry_bytes = max_entry_bytes
+        self._tools: dict[str, OrderedDict[str, tuple[str, bytes, str]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+    def get(self, tool_name: str, path: str, validator: str) -> bytes | None:
+        with self._lock:
+            entries = self._tools.get(tool_name)
+            entry = entries.get(path) if entries else None
+            if entry is None or entry[0] != validator:
+                self.misses += 1
+                return None
+            entries.move_to_end(path)
+            self.hits += 1
+            return entry[1]
+
+    def latest(self, tool_name: str, path: str) -> tuple[str, bytes, str] | None:
+        """Return the cached (validator, body, content type) for a path regardless of validator."""
+        with self._lock:
+            entries = self._tools.get(tool_name)
+            return entries.get(path) if entries else None
+
+    def mark_revalidated(self, tool_name: str, path: str) -> None:
+        with self._lock:
+            entries = self._tools.get(tool_name)
+            if entries and path in entries:
+                entries.move_to_end(path)
+                self.revalidated += 1
+
+    def put(self, tool_name: str, path: str, validator: str, body: bytes, content_type: str = "") -> None:
+        if len(body) > self.max_entry_bytes:
+            return
+        with self._lock:
+            entries = self._tools.setdefault(tool_name, OrderedDict())
+            entries[path] = (validator, body, content_type)
+            entries.move_to_end(path)
+            while len(entries) > self.max_entries_per_tool:
+                entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": sum(len(entries) for entries in self._tools.values()),
+                "max_entries_per_tool": self.max_entries_per_tool,
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidated": self.revalidated,
+            }
@@ -3,12 +3,20 @@ from __future__ import annotations
 
 import json
 import os
+import queue
+import signal
 import subprocess
 import socketserver
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Iterator
 from datetime import UTC, datetime
 from http import HTTPStatus
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib import error as urllib_error, request as urllib_request
 
 
 def _now_iso() -> str:
@@ -47,21 +55,25 @@ def _socket_path() -> str:
     ).strip()
 
 
-def _json_response(handler: BaseHTTPRequestHandler, status: int, payload: dict) -> None:
+def _json_response(handler: BaseHTTPRequestHandler, status: int, payload: dict, *, close: bool = False) -> None:
     body = json.dumps(payload).encode("utf-8")
     handler.send_response(status)
     handler.send_header("Content-Type", "application/json")
     handler.send_header("Content-Length", str(len(body)))
+    if close:
+        # Also sets `close_connection`: the request body was not read, so the connection
+        # cannot be reused.
+        handler.send_header("Connection", "close")
     handler.end_headers()
     handler.wfile.write(body)
 
 
 def _unauthorized(handler: BaseHTTPRequestHandler) -> None:
-    _json_response(handler, HTTPStatus.UNAUTHORIZED, {"detail": "Unauthorized."})
+    _json_response(handler, HTTPStatus.UNAUTHORIZED, {"detail": "Unauthorized."}, close=True)
 
 
 def _forbidden(handler: BaseHTTPRequestHandler) -> None:
-    _json_response(handler, HTTPStatus.FORBIDDEN, {"detail": "Forbidden."})
+    _json_response(handler, HTTPStatus.FORBIDDEN, {"detail": "Forbidden."}, close=True)
 
 
 def _bad_request(handler: BaseHTTPRequestHandler, detail: str) -> None:
@@ -88,19 +100,9 @@ def _check_auth(handler: BaseHTTPRequestHandler) -> bool:
 
 
 def _run_command(payload: dict) -> tuple[int, dict]:
-    action = str(payload.get("action") or "").strip().lower()
-    command = str(payload.get("command") or "").strip()
-    cwd = str(payload.get("cwd") or "").strip() or None
-    timeout_seconds = payload.get("timeout_seconds")
-    try:
-        timeout = max(1, min(int(timeout_seconds), 3600)) if timeout_seconds is not None else _timeout_seconds()
-    except (TypeError, ValueError):
-        timeout = _timeout_seconds()
-
-    if not action:
-        return HTTPStatus.BAD_REQUEST, {"detail": "action is required."}
-    if not command:
-        return HTTPStatus.BAD_REQUEST, {"detail": "command is required."}
+    error, action, command, cwd, timeout = _parse_run_payload(payload)
+    if error:
+        return HTTPStatus.BAD_REQUEST, error
 
     started_at = _now_iso()
     try:
@@ -152,25 +154,270 @@ def _run_command(payload: dict) -> tuple[int, dict]:
     return HTTPStatus.OK if completed.returncode == 0 else HTTPStatus.INTERNAL_SERVER_ERROR, payload
 
 
-def _check_url(payload: dict) -> tuple[int, dict]:
-    label = str(payload.get("label") or "private").strip() or "private"
-    url = str(payload.get("url") or "").strip()
+# Streaming `/run` helpers. The runner is deployed on its own (the controller package is not on
+# its path), so this mirrors `controller/command_stream.py`.
+OUTPUT_TAIL_BYTES = 64 * 1024
+# How long to keep draining pipes after a timeout kill before giving up on them (a grandchild
+# can hold them open).
+_KILL_GRACE_SECONDS = 5.0
+# Lines buffered between the pipe readers and the consumer; a full queue blocks the readers, so
+# a command that outputs faster than it is consumed stalls on its pipe instead of growing memory.
+_QUEUE_LINES = 1024
+
+
+class OutputTail:
+    """Bounded tail of a command's output: keeps the most recent lines within a byte budget."""
+
+    def __init__(self, max_bytes: int = OUTPUT_TAIL_BYTES):
+        self.max_bytes = max_bytes
+        self._lines: deque[str] = deque()
+        self._size = 0
+        self.truncated = False
+
+    def append(self, line: str) -> None:
+        self._lines.append(line)
+        self._size += len(line)
+        while self._size > self.max_bytes and len(self._lines) > 1:
+            self._size -= len(self._lines.popleft())
+            self.truncated = True
+
+    def text(self) -> str:
+        return "".join(self._lines)
+
+
+def _kill_tree(proc: subprocess.Popen) -> None:
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (AttributeError, OSError):
+        proc.kill()
+
+
+def _put(lines: queue.Queue, item: tuple, stop: threading.Event) -> bool:
+    while not stop.is_set():
+        try:
+            lines.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _pump(name: str, pipe, lines: queue.Queue, stop: threading.Event) -> None:
+    try:
+        for line in pipe:
+            if not _put(lines, (name, line), stop):
+                break
+    except (OSError, ValueError):
+        pass
+    finally:
+        _put(lines, (name, None), stop)
+        try:
+            pipe.close()
+        except OSError:
+            pass
+
+
+def iter_command_output(
+    command: str, cwd: str | None, timeout: float, tail_bytes: int = OUTPUT_TAIL_BYTES
+) -> Iterator[dict]:
+    """Run a shell command and yield `stdout`/`stderr` line records, then one `exit` record.
+
+    Only a bounded tail of each stream is kept for the exit record (`stdout`, `stderr`,
+    `truncated`), so arbitrarily long output never accumulates in memory.
+    """
+    try:
+        proc = subprocess.Popen(
+            command,
+            cwd=cwd,
+            shell=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            errors="replace",
+            bufsize=1,
+            start_new_session=True,  # own process group, so a timeout kills the whole tree
+        )
+    except OSError as exc:
+        yield {
+            "type": "exit",
+            "ok": False,
+            "exit_code": None,
+            "stdout": "",
+            "stderr": str(exc),
+            "truncated": False,
+            "detail": str(exc),
+        }
+        return
+
+    lines: queue.Queue = queue.Queue(maxsize=_QUEUE_LINES)
+    stop = threading.Event()
+    completed = False
+    try:
+        for name, pipe in (("stdout", proc.stdout), ("stderr", proc.stderr)):
+            threading.Thread(target=_pump, args=(name, pipe, lines, stop), daemon=True).start()
+        tails = {"stdout": OutputTail(tail_bytes), "stderr": OutputTail(tail_bytes)}
+
+        deadline = time.monotonic() + timeout
+        timed_out = False
+        open_streams = 2
+        while open_streams:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                if timed_out:
+                    break
+                _kill_tree(proc)
+                timed_out = True
+                deadline = time.monotonic() + _KILL_GRACE_SECONDS
+                continue
+            try:
+                name, line = lines.get(timeout=min(remaining, 1.0))
+            except queue.Empty:
+                continue
+            if line is None:
+                open_streams -= 1
+                continue
+            tails[name].append(line)
+            yield {"type": name, "line": line}
+
+        if not timed_out:
+            # Both streams are closed, but the command may still be running (it redirected or
+            # closed its output): it keeps the rest of its deadline.
+            try:
+                proc.wait(timeout=max(deadline - time.monotonic(), 0))
+            except subprocess.TimeoutExpired:
+                _kill_tree(proc)
+                timed_out = True
+        try:
+            exit_code = proc.wait(timeout=_KILL_GRACE_SECONDS)
+        except subprocess.TimeoutExpired:
+            exit_code = None
+        if timed_out:
+            exit_code = None
+            detail = f"Command timed out after {timeout:g} seconds."
+        else:
+            detail = "Command completed successfully." if exit_code == 0 else "Command failed."
+        completed = True
+        yield {
+            "type": "exit",
+            "ok": exit_code == 0,
+            "exit_code": exit_code,
+            "stdout": tails["stdout"].text(),
+            "stderr": tails["stderr"].text(),
+            "truncated": tails["stdout"].truncated or tails["stderr"].truncated,
+            "detail": detail,
+        }
+    finally:
+        # Runs when the consumer stops early too (generator closed, e.g. the `/run` handler
+        # failed mid-stream): kill and reap the whole process group and release the pipe
+        # readers, which close their pipes once the group is gone.
+        stop.set()
+        if not completed:
+            _kill_tree(proc)
+        try:
+            proc.wait(timeout=_KILL_GRACE_SECONDS)
+        except subprocess.TimeoutExpired:
+            pass
+
+
+def _parse_run_payload(payload: dict) -> tuple[dict | None, str, str, str | None, int]:
+    action = str(payload.get("action") or "").strip().lower()
+    command = str(payload.get("command") or "").strip()
+    cwd = str(payload.get("cwd") or "").strip() or None
     timeout_seconds = payload.get("timeout_seconds")
     try:
-        timeout = max(1, min(int(timeout_seconds), 3600)) if timeout_seconds is not None else 5
+        timeout = max(1, min(int(timeout_seconds), 3600)) if timeout_seconds is not None else _timeout_seconds()
     except (TypeError, ValueError):
-        timeout = 5
+        timeout = _timeout_seconds()
+
+    if not action:
+        return {"detail": "action is required."}, action, command, cwd, timeout
+    if not command:
+        return {"detail": "command is required."}, action, command, cwd, timeout
+    return None, action, command, cwd, timeout
+
+
+def _stream_command(handler: BaseHTTPRequestHandler, payload: dict) -> None:
+    """Answer `/run` with chunked NDJSON: output line records as they arrive, then an exit record."""
+    error, action, command, cwd, timeout = _parse_run_payload(payload)
+    if error:
+        _json_response(handler, HTTPStatus.BAD_REQUEST, error)
+        return
+
+    handler.send_response(HTTPStatus.OK)
+    handler.send_header("Content-Type", "application/x-ndjson")
+    handler.send_header("Transfer-Encoding", "chunked")
+    handler.end_headers()
+
+    def write_chunk(data: bytes) -> bool:
+        try:
+            handler.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+            handler.wfile.flush()
+            return True
+        except OSError:
+            return False
+
+    # A disconnected client must not abort a half-finished deploy: keep draining the command's
+    # output until it exits, just stop sending it.
+    connected = True
+    started_at = _now_iso()
+    records = iter_command_output(command, cwd, timeout)
+    try:
+        for record in records:
+            if record["type"] == "exit":
+                record.update({"action": action, "command": command, "cwd": cwd or "", "ran_at": started_at})
+            if connected:
+                connected = write_chunk((json.dumps(record) + "\n").encode("utf-8"))
+    finally:
+        records.close()
+    if connected:
+        write_chunk(b"")
+    else:
+        handler.close_connection = True
 
-    if not url:
-        return HTTPStatus.BAD_REQUEST, {"detail": "url is required."}
 
+MAX_CHECK_TARGETS = 256
+# Largest POST body the runner reads; a full `/check-urls` batch is far below this.
+MAX_BODY_BYTES = 1024 * 1024
+
+
+def _check_concurrency() -> int:
+    raw = str(os.getenv("HQ_ACTION_RUNNER_CHECK_CONCURRENCY") or "16").strip()
+    try:
+        return max(1, min(int(raw), 64))
+    except ValueError:
+        return 16
+
+
+def _probe_timeout(value) -> float:
+    # Fractional: the controller sends adaptive per-target timeouts well under a second.
+    try:
+        return max(0.05, min(float(value), 3600.0)) if value is not None else 5.0
+    except (TypeError, ValueError):
+        return 5.0
+
+
+def _probe_method(value) -> str:
+    return "HEAD" if str(value or "").strip().lower() == "head" else "GET"
+
+
+def _open_probe(url: str, timeout: float, method: str):
+    try:
+        return urllib_request.urlopen(urllib_request.Request(url, method=method), timeout=timeout)
+    except urllib_error.HTTPError as exc:
+        if method == "HEAD" and exc.code in (405, 501):
+            return urllib_request.urlopen(url, timeout=timeout)
+        raise
+
+
+def _probe_url(label: str, url: str, timeout: float, method: str = "GET") -> dict:
+    """Probe `url` with GET or HEAD; the body is never read, only the status line and headers."""
     checked_at = _now_iso()
+    started = time.perf_counter()
     try:
-        from urllib import request as urllib_request
-        with urllib_request.urlopen(url, timeout=timeout) as response:
+        with _open_probe(url, timeout, method) as response:
             status_code = getattr(response, "status", 200)
             healthy = 200 <= status_code < 400
-            return HTTPStatus.OK, {
+            result = {
                 "label": label,
                 "url": url,
                 "status": "healthy" if healthy else "down",
@@ -180,7 +427,7 @@ def _check_url(payload: dict) -> tuple[int, dict]:
                 "detail": f"HTTP {status_code}",
             }
     except Exception as exc:
-        return HTTPStatus.OK, {
+        result = {
             "label": label,
             "url": url,
             "status": "down",
@@ -189,10 +436,66 @@ def _check_url(payload: dict) -> tuple[int, dict]:
             "checked_at": checked_at,
             "detail": str(exc),
         }
+    result["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+def _check_url(payload: dict) -> tuple[int, dict]:
+    label = str(payload.get("label") or "private").strip() or "private"
+    url = str(payload.get("url") or "").strip()
+    if not url:
+        return HTTPStatus.BAD_REQUEST, {"detail": "url is required."}
+    timeout = _probe_timeout(payload.get("timeout_seconds"))
+    return HTTPStatus.OK, _probe_url(label, url, timeout, _probe_method(payload.get("method")))
+
+
+def _check_urls(payload: dict) -> tuple[int, dict]:
+    """Probe a batch of `{label, url, timeout_seconds, method}` targets concurrently; results keep input order."""
+    targets = payload.get("targets")
+    if not isinstance(targets, list):
+        return HTTPStatus.BAD_REQUEST, {"detail": "targets must be a list."}
+    if len(targets) > MAX_CHECK_TARGETS:
+        return HTTPStatus.BAD_REQUEST, {"detail": f"At most {MAX_CHECK_TARGETS} targets per request."}
+
+    def probe(target) -> dict:
+        target = target if isinstance(target, dict) else {}
+        label = str(target.get("label") or "private").strip() or "private"
+        url = str(target.get("url") or "").strip()
+        if not url:
+            return {
+                "label": label,
+                "url": "",
+                "status": "down",
+                "ok": False,
+                "http_status": None,
+                "checked_at": _now_iso(),
+                "detail": "url is required.",
+                "duration_ms": 0.0,
+            }
+        timeout = _probe_timeout(target.get("timeout_seconds"))
+        return _probe_url(label, url, timeout, _probe_method(target.get("method")))
+
+    started = time.perf_counter()
+    if targets:
+        with ThreadPoolExecutor(
+            max_workers=min(_check_concurrency(), len(targets)), thread_name_prefix="hq-runner-check"
+        ) as pool:
+            results = list(pool.map(probe, targets))
+    else:
+        results = []
+    return HTTPStatus.OK, {
+        "results": results,
+        "checked_at": _now_iso(),
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
 
 
 class Handler(BaseHTTPRequestHandler):
     server_version = "HQActionRunner/0.1"
+    # Keep-alive so the controller can reuse one connection for many health checks; idle
+    # connections are dropped after `timeout` seconds so they don't pin handler threads.
+    protocol_version = "HTTP/1.1"
+    timeout = 30
 
     def do_GET(self) -> None:  # noqa: N802
         if self.path != "/health":
@@ -209,14 +512,27 @@ class Handler(BaseHTTPRequestHandler):
         )
 
     def do_POST(self) -> None:  # noqa: N802
-        if self.path not in {"/run", "/check-url"}:
-            _not_found(self)
+        # Route and authenticate before reading anything: rejected requests get
+        # `Connection: close` instead of having their body drained, so an unauthenticated client
+        # cannot make the runner buffer it.
+        if self.path not in {"/run", "/check-url", "/check-urls"}:
+            _json_response(self, HTTPStatus.NOT_FOUND, {"detail": "Not found."}, close=True)
             return
         if not _check_auth(self):
             return
-
-        length = int(self.headers.get("Content-Length") or "0")
+        try:
+            length = int(self.headers.get("Content-Length") or "0")
+        except ValueError:
+            length = -1
+        if length < 0:
+            _json_response(self, HTTPStatus.BAD_REQUEST, {"detail": "Invalid Content-Length."}, close=True)
+            return
+        if length > MAX_BODY_BYTES:
+            detail = f"Body must be at most {MAX_BODY_BYTES} bytes."
+            _json_response(self, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"detail": detail}, close=True)
+            return
         raw_body = self.rfile.read(length) if length > 0 else b"{}"
+
         try:
             payload = json.loads(raw_body.decode("utf-8"))
         except json.JSONDecodeError:
@@ -228,6 +544,11 @@ class Handler(BaseHTTPRequestHandler):
 
         if self.path == "/check-url":
             status, response = _check_url(payload)
+        elif self.path == "/check-urls":
+            status, response = _check_urls(payload)
+        elif payload.get("stream"):
+            _stream_command(self, payload)
+            return
         else:
             status, response = _run_command(payload)
         _json_response(self, status, response)
@@ -0,0 +1,64 @@
+import json
+import os
+import tempfile
+import unittest
+
+from fastapi.testclient import TestClient
+
+from tools.sdk.base_tool import BaseTool
+
+
+class BaseToolConditionalGetTests(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.tempdir.name, "tool.json"), "w", encoding="utf-8") as f:
+            json.dump({"name": "sample", "port": 30001, "title": "Sample"}, f)
+        self.tool = BaseTool(os.path.join(self.tempdir.name, "main.py"))
+        self.renders = 0
+        self.version = "v1"
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def render(self):
+        self.renders += 1
+        return f"<p>{self.version}</p>"
+
+    def test_manifest_honors_if_none_match(self):
+        client = TestClient(self.tool.app)
+
+        first = client.get("/manifest")
+        second = client.get("/manifest", headers={"If-None-Match": first.headers["etag"]})
+
+        self.assertEqual(first.json()["name"], "sample")
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.content, b"")
+
+    def test_widget_etag_comes_from_rendered_body(self):
+        self.tool.add_widget_route(self.render)
+        client = TestClient(self.tool.app)
+
+        first = client.get("/widget")
+        second = client.get("/widget", headers={"If-None-Match": first.headers["etag"]})
+        self.version = "v2"
+        third = client.get("/widget", headers={"If-None-Match": first.headers["etag"]})
+
+        self.assertEqual(first.text, "<p>v1</p>")
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(third.status_code, 200)
+        self.assertEqual(third.text, "<p>v2</p>")
+
+    def test_widget_version_key_skips_render_when_unchanged(self):
+        self.tool.add_widget_route(self.render, etag_func=lambda: self.version)
+        client = TestClient(self.tool.app)
+
+        first = client.get("/widget")
+        second = client.get("/widget", headers={"If-None-Match": first.headers["etag"]})
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(self.renders, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
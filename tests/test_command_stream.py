@@ -0,0 +1,101 @@
+import os
+import sys
+import time
+import unittest
+from unittest.mock import patch
+
+from controller import command_stream
+from host_runner import server as runner_server
+
+
+def python_command(code):
+    return f'"{sys.executable}" -c "{code}"'
+
+
+class CommandStreamTests(unittest.TestCase):
+    module = command_stream
+
+    def iter_command_output(self, *args, **kwargs):
+        return self.module.iter_command_output(*args, **kwargs)
+
+    def test_yields_lines_then_exit_record(self):
+        records = list(
+            self.iter_command_output(
+                python_command("import sys; print('one'); sys.stdout.flush(); print('oops', file=sys.stderr); sys.exit(2)"),
+                None,
+                30,
+            )
+        )
+
+        lines = [(record["type"], record["line"]) for record in records[:-1]]
+        self.assertIn(("stdout", "one\n"), lines)
+        self.assertIn(("stderr", "oops\n"), lines)
+        self.assertEqual(records[-1]["type"], "exit")
+        self.assertEqual(records[-1]["exit_code"], 2)
+        self.assertFalse(records[-1]["ok"])
+        self.assertEqual(records[-1]["stdout"], "one\n")
+
+    def test_exit_record_keeps_only_a_bounded_tail(self):
+        records = list(self.iter_command_output(python_command("[print(i) for i in range(2000)]"), None, 30, tail_bytes=100))
+
+        exit_record = records[-1]
+        self.assertEqual(len(records), 2001)
+        self.assertTrue(exit_record["truncated"])
+        self.assertLessEqual(len(exit_record["stdout"]), 100)
+        self.assertTrue(exit_record["stdout"].endswith("1999\n"))
+
+    def test_timeout_kills_command(self):
+        records = list(self.iter_command_output(python_command("import time; time.sleep(30)"), None, 0.5))
+
+        self.assertEqual(records[-1]["exit_code"], None)
+        self.assertIn("timed out", records[-1]["detail"])
+
+    def test_command_that_closes_its_output_keeps_running_until_it_exits(self):
+        started = time.monotonic()
+        with patch.object(self.module, "_KILL_GRACE_SECONDS", 0.2):
+            records = list(self.iter_command_output("exec >/dev/null 2>&1; sleep 1; exit 3", None, 30))
+
+        self.assertGreaterEqual(time.monotonic() - started, 1)
+        self.assertEqual(records[-1]["exit_code"], 3)
+        self.assertEqual(records[-1]["detail"], "Command failed.")
+
+    def test_command_that_closes_its_output_is_still_bound_by_the_timeout(self):
+        started = time.monotonic()
+        records = list(self.iter_command_output("exec >/dev/null 2>&1; sleep 30", None, 0.5))
+
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(records[-1]["exit_code"], None)
+        self.assertIn("timed out", records[-1]["detail"])
+
+    def test_closing_the_stream_early_kills_and_reaps_the_process_group(self):
+        records = self.iter_command_output("echo $$; sleep 30 & sleep 30; wait", None, 30)
+
+        first = next(records)
+        pgid = int(first["line"])
+        records.close()
+
+        self.assertEqual(first["type"], "stdout")
+        # The shell is reaped by close(); its killed background child is reparented and reaped
+        # by init, which can take a moment.
+        deadline = time.monotonic() + 5
+        with self.assertRaises(ProcessLookupError):
+            while time.monotonic() < deadline:
+                os.killpg(pgid, 0)
+                time.sleep(0.05)
+
+    def test_tail_keeps_last_line_even_when_oversized(self):
+        tail = self.module.OutputTail(max_bytes=4)
+        tail.append("abcdefgh\n")
+
+        self.assertEqual(tail.text(), "abcdefgh\n")
+        self.assertFalse(tail.truncated)
+
+
+class RunnerCommandStreamTests(CommandStreamTests):
+    """The host runner carries its own copy of the streaming helpers; hold it to the same behavior."""
+
+    module = runner_server
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import importlib
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+
+class ToolRegistryCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        os.environ["CONTROLLER_DB_PATH"] = os.path.join(self.tempdir.name, "tools.db")
+        import controller.db as controller_db
+
+        self.db = importlib.reload(controller_db)
+        self.db.init_db()
+        self.db.add_tool("jobber", "tools/jobber/main.py", 8020)
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+        os.environ.pop("CONTROLLER_DB_PATH", None)
+
+    def test_repeat_lookups_are_served_from_memory(self):
+        first = self.db.get_tool_by_name("jobber")
+
+        with patch.object(self.db, "get_session", side_effect=AssertionError("DB hit")):
+            second = self.db.get_tool_by_name("jobber")
+
+        self.assertEqual(first.port, 8020)
+        self.assertIs(second, first)
+        self.assertEqual(self.db.tool_cache_stats()["hits"], 1)
+        self.assertEqual(self.db.tool_cache_stats()["misses"], 1)
+
+    def test_writes_invalidate_cached_rows(self):
+        self.db.get_tool_by_name("jobber")
+
+        self.db.update_tool_pid("jobber", 4242)
+        self.db.update_tool_metadata("jobber", port=8021)
+
+        tool = self.db.get_tool_by_name("jobber")
+        self.assertEqual(tool.pid, 4242)
+        self.assertEqual(tool.status, "running")
+        self.assertEqual(tool.port, 8021)
+
+    def test_list_tools_fills_cache_for_unknown_names(self):
+        self.db.list_tools()
+
+        with patch.object(self.db, "get_session", side_effect=AssertionError("DB hit")):
+            self.assertEqual([tool["name"] for tool in self.db.list_tools()], ["jobber"])
+            self.assertIsNone(self.db.get_tool_by_name("missing"))
+
+        self.db.add_tool("missing", "tools/missing/main.py", 8030)
+        self.assertEqual(self.db.get_tool_by_name("missing").port, 8030)
+
+    def test_misses_are_bounded_expire_and_are_invalidated_on_insert(self):
+        with patch.object(self.db, "TOOL_MISS_CACHE_SIZE", 3):
+            for index in range(10):
+                self.assertIsNone(self.db.get_tool_by_name(f"random-{index}"))
+        self.assertEqual(self.db.tool_cache_stats()["miss_entries"], 3)
+
+        with patch.object(self.db, "get_session", side_effect=AssertionError("DB hit")):
+            self.assertIsNone(self.db.get_tool_by_name("random-9"))
+
+        self.db.add_tool("random-9", "tools/random/main.py", 8040)
+        self.assertEqual(self.db.get_tool_by_name("random-9").port, 8040)
+
+        with patch.object(self.db.time, "monotonic", return_value=self.db.time.monotonic() + 60):
+            calls = []
+            real_session = self.db.get_session
+            with patch.object(self.db, "get_session", side_effect=lambda: calls.append(1) or real_session()):
+                self.assertIsNone(self.db.get_tool_by_name("random-8"))
+            self.assertEqual(calls, [1])
+
+    def test_no_op_status_writes_skip_the_database(self):
+        self.db.get_tool_by_name("jobber")
+
+        with patch.object(self.db, "get_session", side_effect=AssertionError("DB hit")):
+            self.db.update_tool_status("jobber", "stopped")
+            self.db.update_tool_pid("jobber", None)
+
+        self.assertEqual(self.db.tool_cache_stats()["skipped_writes"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
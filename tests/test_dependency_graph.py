@@ -0,0 +1,82 @@
+import importlib
+import unittest
+
+
+def project(slug, depends_on=()):
+    return {"slug": slug, "title": slug.title(), "private_url": "", "depends_on": list(depends_on)}
+
+
+class DependencyGraphTests(unittest.TestCase):
+    def setUp(self):
+        import controller.dependency_graph as dependency_graph
+
+        self.module = importlib.reload(dependency_graph)
+        # db <- api <- web, api <- worker; cache stands alone
+        self.projects = [
+            project("web", ["api"]),
+            project("worker", ["api"]),
+            project("api", ["db"]),
+            project("db"),
+            project("cache"),
+        ]
+
+    def test_topological_order_and_blast_radius(self):
+        graph = self.module.DependencyGraph({p["slug"]: p["depends_on"] for p in self.projects})
+
+        self.assertLess(graph.position["db"], graph.position["api"])
+        self.assertLess(graph.position["api"], graph.position["web"])
+        self.assertEqual(
+            graph.downstream("db"),
+            [{"slug": "api", "depth": 1}, {"slug": "web", "depth": 2}, {"slug": "worker", "depth": 2}],
+        )
+        self.assertEqual(graph.upstream("web"), [{"slug": "db", "depth": 2}, {"slug": "api", "depth": 1}])
+
+    def test_waves_order_selected_projects_through_unselected_dependencies(self):
+        graph = self.module.DependencyGraph({p["slug"]: p["depends_on"] for p in self.projects})
+
+        self.assertEqual(
+            graph.waves(["web", "worker", "api", "db", "cache"]), [["cache", "db"], ["api"], ["web", "worker"]]
+        )
+        self.assertEqual(graph.waves(["web", "db", "cache"]), [["cache", "db"], ["web"]])
+        self.assertEqual(graph.waves([]), [])
+
+    def test_hand_edited_cycles_and_missing_slugs_are_tolerated(self):
+        graph = self.module.DependencyGraph({"a": ["b"], "b": ["a"], "c": ["ghost"]})
+
+        self.assertEqual(graph.cyclic, {"a", "b"})
+        self.assertEqual(graph.order[-2:], ["a", "b"])
+        self.assertEqual(graph.missing, {"c": ["ghost"]})
+
+    def test_health_change_reevaluates_only_downstream(self):
+        view = self.module.DependencyView()
+        health = {p["slug"]: "healthy" for p in self.projects}
+        view.sync(self.projects, health)
+        evaluations = view.evaluations
+
+        state = view.sync(self.projects, {**health, "db": "down"})
+
+        self.assertEqual(view.evaluations - evaluations, 4)  # db, api, web, worker; not cache
+        self.assertEqual(state["api"][1], "degraded")
+        self.assertEqual(state["web"][0]["items"][0]["status"], "degraded")
+        self.assertEqual(state["web"][1], "degraded")
+        self.assertEqual(state["cache"][1], "healthy")
+        self.assertEqual(view.rebuilds, 1)
+
+        evaluations = view.evaluations
+        view.sync(self.projects, {**health, "db": "down"})
+        self.assertEqual(view.evaluations, evaluations)
+
+    def test_impact_lists_dependents_with_their_state(self):
+        view = self.module.DependencyView()
+        view.sync(self.projects, {p["slug"]: "healthy" for p in self.projects})
+
+        impact = view.impact("api")
+
+        self.assertEqual([entry["slug"] for entry in impact["dependents"]], ["web", "worker"])
+        self.assertEqual(impact["dependencies"][0]["slug"], "db")
+        self.assertEqual(impact["dependents"][0]["ops_summary"], "healthy")
+        self.assertFalse(impact["on_cycle"])
+
+
+if __name__ == "__main__":
+    unittest.main()
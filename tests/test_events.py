@@ -0,0 +1,65 @@
+import asyncio
+import unittest
+
+from controller.events import EventBroker, format_sse
+from controller.status_monitor import ToolStatusMonitor
+
+
+class EventBrokerTests(unittest.TestCase):
+    def test_published_events_reach_subscribers(self):
+        async def run():
+            broker = EventBroker()
+            queue = broker.subscribe()
+            broker.publish("tool_status", {"tools": [{"name": "jobber", "alive": True}]})
+            event = await asyncio.wait_for(queue.get(), 1)
+            broker.unsubscribe(queue)
+            return broker, event
+
+        broker, event = asyncio.run(run())
+
+        self.assertEqual(event["event"], "tool_status")
+        self.assertEqual(broker.stats()["subscribers"], 0)
+        self.assertEqual(
+            format_sse(event),
+            'id: 1\nevent: tool_status\ndata: {"tools": [{"name": "jobber", "alive": true}]}\n\n',
+        )
+
+    def test_slow_subscriber_gets_resync_instead_of_backlog(self):
+        async def run():
+            broker = EventBroker(max_queue=2)
+            queue = broker.subscribe()
+            for index in range(3):
+                broker.publish("tool_status", {"index": index})
+            await asyncio.sleep(0)
+            return broker, [queue.get_nowait() for _ in range(queue.qsize())]
+
+        broker, events = asyncio.run(run())
+
+        self.assertEqual([event["event"] for event in events], ["resync"])
+        self.assertEqual(broker.stats()["resyncs"], 1)
+
+
+class ToolStatusMonitorTests(unittest.TestCase):
+    def test_poll_publishes_only_changed_tools(self):
+        published = []
+        statuses = [
+            {"name": "jobber", "alive": True, "pid": 10, "port": 9001},
+            {"name": "downloader", "alive": False, "pid": None, "port": 9002},
+        ]
+        broker = EventBroker()
+        broker.publish = lambda event_type, data: published.append((event_type, data))
+        monitor = ToolStatusMonitor(lambda: [dict(status) for status in statuses], broker)
+
+        monitor.poll()
+        monitor.poll()
+        statuses[1] = {"name": "downloader", "alive": True, "pid": 11, "port": 9002}
+        statuses.pop(0)
+        monitor.poll()
+
+        self.assertEqual(len(published), 1)
+        self.assertEqual(published[0][1]["tools"], [{"name": "downloader", "alive": True, "pid": 11, "port": 9002}])
+        self.assertEqual(published[0][1]["removed"], ["jobber"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import importlib
+import os
+import unittest
+from unittest.mock import patch
+
+
+class FakeClock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class HealthBreakerTests(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.dict(
+            os.environ, {"HQ_HEALTH_BREAKER_FAILURES": "2", "HQ_HEALTH_BREAKER_OPEN_SECONDS": "60"}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        import controller.health_breaker as health_breaker
+
+        self.clock = FakeClock()
+        self.breakers = importlib.reload(health_breaker).HealthBreakers(clock=self.clock)
+
+    def fail(self, key="t"):
+        self.assertIsNone(self.breakers.before_probe(key))
+        self.breakers.record(key, False, None, {"status": "down", "detail": "timed out"})
+
+    def test_opens_after_threshold_and_reuses_last_result(self):
+        self.fail()
+        self.assertEqual(self.breakers.state("t")["state"], "closed")
+        self.fail()
+
+        state = self.breakers.state("t")
+        self.assertEqual((state["state"], state["consecutive_failures"]), ("open", 2))
+        self.assertEqual(state["next_probe_at"], "2023-11-14T22:14:20Z")
+        self.assertEqual(self.breakers.before_probe("t")["detail"], "timed out")
+        self.assertEqual(self.breakers.stats()["short_circuited"], 1)
+
+    def test_half_open_probe_closes_or_doubles_the_open_period(self):
+        self.fail()
+        self.fail()
+        self.clock.now += 60
+
+        self.assertIsNone(self.breakers.before_probe("t"))
+        self.assertIsNotNone(self.breakers.before_probe("t"))  # one probe at a time
+        self.breakers.record("t", False, None, {"status": "down"})
+        self.assertEqual(self.breakers.state("t")["next_probe_at"], "2023-11-14T22:16:20Z")
+
+        self.clock.now += 120
+        self.assertIsNone(self.breakers.before_probe("t"))
+        self.breakers.record("t", True, 20, {"status": "healthy"})
+        self.assertEqual(self.breakers.state("t")["state"], "closed")
+        self.assertIsNone(self.breakers.before_probe("t"))
+
+    def test_cancelled_probe_lets_the_next_caller_probe(self):
+        self.fail()
+        self.fail()
+        self.clock.now += 60
+        self.assertIsNone(self.breakers.before_probe("t"))
+
+        self.breakers.cancel_probe("t")
+
+        self.assertIsNone(self.breakers.before_probe("t"))
+
+    def test_timeout_tracks_latency_and_backs_off_on_failure(self):
+        self.assertEqual(self.breakers.timeout_seconds("t"), 5.0)
+        for _ in range(20):
+            self.breakers.record("t", True, 200, {"status": "healthy"})
+        fast = self.breakers.timeout_seconds("t")
+        self.assertLess(fast, 1.5)
+        self.assertGreaterEqual(fast, 1.0)
+
+        self.breakers.record("t", False, None, {"status": "down"})
+        self.breakers.record("t", True, 2000, {"status": "healthy"})
+
+        self.assertGreater(self.breakers.timeout_seconds("t"), fast)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import importlib
+import os
+import tempfile
+import unittest
+
+
+class FakeClock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class HealthHistoryTests(unittest.TestCase):
+    def setUp(self):
+        import controller.health_history as health_history
+
+        self.module = importlib.reload(health_history)
+        self.clock = FakeClock()
+        self.history = self.module.HealthHistory(max_samples=5, clock=self.clock)
+
+    def record(self, status, duration_ms=100, step=60):
+        self.history.record("project:jobby", status, 200, duration_ms)
+        self.clock.now += step
+
+    def test_windows_report_uptime_percentiles_and_flaps(self):
+        for status in ["healthy"] * 8 + ["down", "healthy"]:
+            self.record(status, duration_ms=100 if status == "healthy" else 1000)
+
+        windows = self.history.summary("project:jobby")["windows"]
+
+        self.assertEqual(windows["1h"]["samples"], 10)
+        self.assertEqual(windows["1h"]["uptime_pct"], 90.0)
+        self.assertEqual(windows["1h"]["flaps"], 2)
+        self.assertAlmostEqual(windows["1h"]["p50_ms"], 100, delta=15)
+        self.assertGreater(windows["1h"]["p95_ms"], 700)
+        self.assertEqual(windows["7d"], windows["24h"])
+
+    def test_old_buckets_expire_from_short_windows_only(self):
+        self.record("down")
+        self.clock.now += 2 * 3600
+        self.record("healthy")
+
+        windows = self.history.summary("project:jobby")["windows"]
+
+        self.assertEqual((windows["1h"]["samples"], windows["1h"]["uptime_pct"]), (1, 100.0))
+        self.assertEqual((windows["24h"]["samples"], windows["24h"]["flaps"]), (2, 1))
+
+    def test_recent_samples_are_a_bounded_ring(self):
+        for _ in range(8):
+            self.record("healthy")
+        self.history.record("project:jobby", "unconfigured")
+
+        self.assertEqual(len(self.history.summary("project:jobby", recent=50)["recent"]), 5)
+        self.assertEqual(self.history.summary("project:other")["windows"]["1h"]["samples"], 0)
+
+    def test_rollups_survive_flush_and_load(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            os.environ["CONTROLLER_DB_PATH"] = os.path.join(tempdir, "tools.db")
+            try:
+                import controller.db as controller_db
+
+                db = importlib.reload(controller_db)
+                db.init_db()
+                for status in ("healthy", "healthy", "down"):
+                    self.record(status)
+                self.assertGreater(self.history.flush(), 0)
+
+                restored = self.module.HealthHistory(clock=self.clock)
+                restored.load()
+                db.engine.dispose()
+            finally:
+                os.environ.pop("CONTROLLER_DB_PATH", None)
+
+        before = self.history.summary("project:jobby")["windows"]
+        self.assertEqual(restored.summary("project:jobby")["windows"], before)
+
+
+    def test_forgotten_targets_stay_gone_after_a_restart(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            os.environ["CONTROLLER_DB_PATH"] = os.path.join(tempdir, "tools.db")
+            try:
+                import controller.db as controller_db
+
+                db = importlib.reload(controller_db)
+                db.init_db()
+                for status in ("healthy", "down"):
+                    self.record(status)
+                    self.history.record("project:jobby:public", status, 200, 50)
+                    self.history.record("project:jobby-two", status, 200, 50)
+                self.history.flush()
+
+                self.history.forget("project:jobby")
+                restored = self.module.HealthHistory(clock=self.clock)
+                restored.load()
+                db.engine.dispose()
+            finally:
+                os.environ.pop("CONTROLLER_DB_PATH", None)
+
+        for target in ("project:jobby", "project:jobby:public"):
+            self.assertEqual(restored.summary(target)["windows"]["24h"]["samples"], 0)
+        self.assertEqual(restored.summary("project:jobby-two")["windows"]["24h"]["samples"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
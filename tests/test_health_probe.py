@@ -0,0 +1,66 @@
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from controller.health_probe import ProbeSessions
+
+
+class _HealthHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections: set = set()
+    methods: list = []
+
+    def _reply(self, status: int, body: bytes) -> None:
+        self.connections.add(self.client_address)
+        self.methods.append(self.command)
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._reply(200, b'{"ok": true}')
+
+    def do_HEAD(self):
+        if self.path == "/no-head":
+            self._reply(405, b"")
+        else:
+            self._reply(204, b"")
+
+    def log_message(self, *_args):
+        pass
+
+
+class ProbeSessionsTests(unittest.TestCase):
+    def setUp(self):
+        _HealthHandler.connections = set()
+        _HealthHandler.methods = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _HealthHandler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.sessions = ProbeSessions()
+        self.addCleanup(self.sessions.close)
+
+    def test_repeated_probes_reuse_one_connection_per_origin(self):
+        for _ in range(5):
+            self.assertEqual(self.sessions.status(f"{self.base}/health", "get", 2), 200)
+        self.assertEqual(self.sessions.status(f"{self.base}/other", "get", 2), 200)
+
+        self.assertEqual(len(_HealthHandler.connections), 1)
+        self.assertEqual(self.sessions.stats()["origins"], 1)
+        self.assertEqual(self.sessions.stats()["probes"], 6)
+
+    def test_head_probe_falls_back_to_get_when_rejected(self):
+        self.assertEqual(self.sessions.status(f"{self.base}/health", "head", 2), 204)
+        self.assertEqual(self.sessions.status(f"{self.base}/no-head", "head", 2), 200)
+
+        self.assertEqual(_HealthHandler.methods, ["HEAD", "HEAD", "GET"])
+        self.assertEqual(self.sessions.stats()["head_fallbacks"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
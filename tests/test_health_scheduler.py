@@ -0,0 +1,101 @@
+import os
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from controller import health_checks, health_scheduler
+
+
+class HealthSchedulerTests(unittest.TestCase):
+    def setUp(self):
+        self.projects = [
+            {"slug": "janus", "health_interval_seconds": 0},
+            {"slug": "jobby", "health_interval_seconds": 600},
+        ]
+        self.hosts = [{"slug": "srv", "health_interval_seconds": 0}]
+        self.refreshed = []
+
+    def make_scheduler(self, refresh=None):
+        def default_refresh(projects, hosts):
+            self.refreshed.append(
+                (sorted(p["slug"] for p in projects), sorted(h["slug"] for h in hosts))
+            )
+
+        return health_scheduler.HealthScheduler(
+            lambda: (self.projects, self.hosts),
+            refresh or default_refresh,
+        )
+
+    def test_run_due_only_refreshes_targets_whose_interval_elapsed(self):
+        scheduler = self.make_scheduler()
+        clock = [1000.0]
+
+        with patch.object(health_scheduler.time, "monotonic", side_effect=lambda: clock[0]), patch.object(
+            health_scheduler.random, "uniform", return_value=0.0
+        ):
+            scheduler.run_due()
+            clock[0] += 61
+            scheduler.run_due()
+
+        self.assertEqual(self.refreshed[0], (["janus", "jobby"], ["srv"]))
+        self.assertEqual(self.refreshed[1], (["janus"], ["srv"]))
+
+    def test_check_now_coalesces_with_in_flight_checks(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_refresh(projects, hosts):
+            self.refreshed.append(sorted(p["slug"] for p in projects))
+            started.set()
+            release.wait(5)
+
+        scheduler = self.make_scheduler(slow_refresh)
+        first = threading.Thread(target=scheduler.check_now)
+        first.start()
+        started.wait(5)
+
+        second = threading.Thread(target=scheduler.check_now, kwargs={"project_slugs": ["janus"], "host_slugs": []})
+        second.start()
+        while scheduler.stats()["coalesced"] == 0 and second.is_alive():
+            time.sleep(0.01)
+        release.set()
+        first.join(5)
+        second.join(5)
+
+        self.assertEqual(self.refreshed, [["janus", "jobby"]])
+        self.assertEqual(scheduler.stats()["coalesced"], 1)
+
+    def test_singleflight_shares_in_flight_result(self):
+        group = health_checks.Singleflight()
+        release = threading.Event()
+        calls = []
+
+        def probe():
+            calls.append(1)
+            release.wait(5)
+            return {"status": "healthy"}
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(group.do("url", probe))) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + 5
+        while group.stats()["joined"] < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"status": "healthy"}] * 3)
+        self.assertEqual(group.stats(), {"probes": 1, "coalesced": 0, "joined": 2, "in_flight": 0})
+
+    def test_record_interval_overrides_default(self):
+        with patch.dict(os.environ, {"HQ_HEALTH_INTERVAL_SECONDS": "30"}):
+            self.assertEqual(health_scheduler.target_interval({"health_interval_seconds": 0}), 30.0)
+            self.assertEqual(health_scheduler.target_interval({"health_interval_seconds": 300}), 300.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
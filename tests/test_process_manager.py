@@ -0,0 +1,85 @@
+import importlib
+import os
+import tempfile
+import types
+import unittest
+from unittest.mock import patch
+
+
+class FakeProcess:
+    def __init__(self, table, pid):
+        if pid not in table:
+            raise ProcessLookupError(pid)
+        self.entry = table[pid]
+
+    def create_time(self):
+        return self.entry["create_time"]
+
+    def cmdline(self):
+        self.entry["cmdline_reads"] += 1
+        return self.entry["cmdline"]
+
+
+class BatchStatusTests(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        os.environ["CONTROLLER_DB_PATH"] = os.path.join(self.tempdir.name, "tools.db")
+
+        import controller.db as controller_db
+        import controller.process_manager as process_manager
+
+        self.db = importlib.reload(controller_db)
+        self.pm = importlib.reload(process_manager)
+        self.db.init_db()
+        for name, pid in (("jobber", 101), ("downloader", 102), ("clipboard", 103)):
+            self.db.add_tool(name, f"tools/{name}/main.py", 9000 + pid)
+            self.db.update_tool_pid(name, pid)
+        self.db.add_tool("notes", "tools/notes/main.py", 9200)
+
+        base = self.pm.BASE_DIR
+        self.processes = {
+            101: {"create_time": 1.0, "cmdline": ["python", str(base / "tools/jobber/main.py")], "cmdline_reads": 0},
+            # pid 102 was reused by something that is not the downloader
+            102: {"create_time": 2.0, "cmdline": ["/usr/sbin/sshd"], "cmdline_reads": 0},
+        }
+        self.fake_psutil = types.SimpleNamespace(
+            pids=lambda: list(self.processes),
+            pid_exists=lambda pid: pid in self.processes,
+            Process=lambda pid: FakeProcess(self.processes, pid),
+        )
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+        os.environ.pop("CONTROLLER_DB_PATH", None)
+
+    def test_statuses_checks_all_tools_and_clears_stale_pids_in_one_write(self):
+        with patch.object(self.pm, "psutil", self.fake_psutil), patch.object(
+            self.pm, "mark_tools_stopped", wraps=self.db.mark_tools_stopped
+        ) as mark_mock:
+            results = self.pm.ProcessManager.statuses()
+
+        self.assertEqual(results["jobber"], {"alive": True, "pid": 101})
+        self.assertEqual(results["downloader"], {"alive": False, "pid": 102})
+        self.assertEqual(results["clipboard"], {"alive": False, "pid": 103})
+        self.assertEqual(results["notes"], {"alive": False})
+        mark_mock.assert_called_once_with(["downloader", "clipboard"])
+        self.assertIsNone(self.db.get_tool_by_name("downloader").pid)
+        self.assertEqual(self.db.get_tool_by_name("clipboard").status, "stopped")
+        self.assertEqual(self.db.get_tool_by_name("jobber").pid, 101)
+
+    def test_unchanged_processes_are_not_reinspected(self):
+        with patch.object(self.pm, "psutil", self.fake_psutil):
+            self.pm.ProcessManager.statuses()
+            self.pm.ProcessManager.statuses()
+            self.assertEqual(self.processes[101]["cmdline_reads"], 1)
+
+            # Same pid, new process: the memo key changes, so it is inspected again.
+            self.processes[101]["create_time"] = 5.0
+            results = self.pm.ProcessManager.statuses()
+
+        self.assertEqual(self.processes[101]["cmdline_reads"], 2)
+        self.assertTrue(results["jobber"]["alive"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,14 @@
+import asyncio
 import importlib
 import json
 import os
 import sys
 import tempfile
+import threading
+import time
 import types
 import unittest
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, Mock, patch
 import fastapi.templating as fastapi_templating
 import starlette.templating as starlette_templating
 
@@ -24,6 +27,7 @@ class ProjectOpsApiTests(unittest.TestCase):
         os.environ.pop("HQ_ACTION_RUNNER_TOKEN", None)
         sys.modules["psutil"] = types.SimpleNamespace(
             pid_exists=lambda _pid: False,
+            pids=lambda: [],
             Process=lambda _pid: None,
             NoSuchProcess=Exception,
             AccessDenied=Exception,
@@ -46,7 +50,7 @@ class ProjectOpsApiTests(unittest.TestCase):
         import controller.projects_registry as projects_registry
         import controller.controller_main as controller_main
 
-        importlib.reload(controller_db)
+        importlib.reload(controller_db).init_db()
         self.hosts_registry = importlib.reload(hosts_registry)
         self.registry = importlib.reload(projects_registry)
         self.main = importlib.reload(controller_main)
@@ -152,6 +156,7 @@ class ProjectOpsApiTests(unittest.TestCase):
         )
 
     def tearDown(self):
+        self.main.ACTION_JOBS.shutdown()
         self.tempdir.cleanup()
         os.environ.pop("HQ_PROJECTS_PATH", None)
         os.environ.pop("HQ_PROJECTS_EXPORT_PATH", None)
@@ -170,10 +175,32 @@ class ProjectOpsApiTests(unittest.TestCase):
             return response
         return json.loads(response.body.decode("utf-8"))
 
+    def run_action(self, slug, action):
+        """Submit an action job, wait for it, and return the finished job."""
+        response = self.main.run_project_action(slug, {"action": action})
+        self.assertEqual(response.status_code, 202)
+        job_id = self.read_payload(response)["job"]["id"]
+        self.assertTrue(self.main.ACTION_JOBS.wait(job_id, timeout=5))
+        return self.read_payload(self.main.get_action(job_id))
+
+    def fake_command_output(self, stdout):
+        calls = []
+
+        def fake(command, cwd, timeout):
+            calls.append({"command": command, "cwd": cwd})
+            yield {"type": "stdout", "line": stdout}
+            yield {"type": "exit", "ok": True, "exit_code": 0, "stdout": stdout, "stderr": "", "detail": "done"}
+
+        return fake, calls
+
+    def runner_json_response(self, body):
+        encoded = json.dumps(body).encode("utf-8")
+        return Mock(status=200, getheader=lambda name: "application/json", read=lambda: encoded)
+
     def test_health_check_reports_summary(self):
-        response_ok = Mock(status_code=200)
+        response_ok = MagicMock(status_code=200)
 
-        with patch.object(self.main.requests, "get", return_value=response_ok) as get_mock:
+        with patch.object(self.main.requests.Session, "get", return_value=response_ok) as get_mock:
             response = self.main.check_project_health("jobby")
 
         payload = self.read_payload(response)
@@ -182,33 +209,119 @@ class ProjectOpsApiTests(unittest.TestCase):
         self.assertEqual(payload["checks"]["private"]["status"], "healthy")
         self.assertEqual(get_mock.call_count, 2)
 
+    def test_health_check_publishes_event_only_when_status_changes(self):
+        published = []
+        self.main.EVENT_BROKER.publish = lambda event_type, data: published.append((event_type, data))
+
+        with patch.object(self.main.requests.Session, "get", return_value=MagicMock(status_code=200)):
+            self.main.check_project_health("jobby")
+            self.main.check_project_health("jobby")
+        with patch.object(self.main.requests.Session, "get", return_value=MagicMock(status_code=503)):
+            self.main.check_project_health("jobby")
+
+        self.assertEqual(
+            published,
+            [
+                ("health", {"projects": {"jobby": "healthy"}, "hosts": {}}),
+                ("health", {"projects": {"jobby": "down"}, "hosts": {}}),
+            ],
+        )
+
+    def test_health_history_reports_uptime_and_flaps(self):
+        with patch.object(self.main.requests.Session, "get", return_value=MagicMock(status_code=200)):
+            self.main.check_project_health("jobby")
+            self.main.check_project_health("jobby")
+        with patch.object(self.main.requests.Session, "get", return_value=MagicMock(status_code=503)):
+            self.main.check_project_health("jobby")
+
+        payload = self.read_payload(self.main.get_project_health_history("jobby", recent=2))
+
+        hour = payload["summary"]["windows"]["1h"]
+        self.assertEqual((hour["samples"], hour["uptime_pct"], hour["flaps"]), (3, 66.667, 1))
+        self.assertEqual([sample["status"] for sample in payload["summary"]["recent"]], ["healthy", "down"])
+        self.assertEqual(payload["checks"]["public"]["recent"][-1]["http_status"], 503)
+        self.assertIsNotNone(payload["checks"]["public"]["windows"]["7d"]["p95_ms"])
+        self.assertEqual(self.read_payload(self.main.get_project_health_history("missing")).get("detail"), "Project not found.")
+
+    def test_project_impact_lists_dependents_and_dependencies(self):
+        payload = self.read_payload(self.main.get_project_impact("janus"))
+
+        self.assertEqual([entry["slug"] for entry in payload["dependents"]], ["jobby"])
+        self.assertEqual(payload["dependents"][0]["depth"], 1)
+        self.assertEqual(payload["dependencies"], [])
+        self.assertEqual(
+            [entry["slug"] for entry in self.read_payload(self.main.get_project_impact("jobby"))["dependencies"]],
+            ["hermes", "janus"],
+        )
+        self.assertEqual(self.read_payload(self.main.get_project_impact("missing")).get("detail"), "Project not found.")
+
+    def test_dead_health_target_is_short_circuited_by_breaker(self):
+        self.registry.update_project("jobby", {"health_private_url": ""})
+        timeouts = []
+
+        def dead(url, timeout=5, **kwargs):
+            timeouts.append(timeout)
+            raise self.main.requests.ConnectionError("connection refused")
+
+        with patch.dict(os.environ, {"HQ_HEALTH_BREAKER_FAILURES": "2"}):
+            with patch.object(self.main.requests.Session, "get", side_effect=dead):
+                for _ in range(4):
+                    payload = self.read_payload(self.main.check_project_health("jobby"))
+
+        public = payload["checks"]["public"]
+        self.assertEqual(len(timeouts), 2)
+        self.assertEqual(public["status"], "down")
+        self.assertEqual(public["breaker"]["state"], "open")
+        self.assertTrue(public["breaker"]["next_probe_at"])
+        self.assertIn("circuit open", public["detail"])
+
+    def test_breaker_is_kept_per_probe_method(self):
+        url = "https://auth.dimy.dev/health"
+        heads = []
+
+        def dead_head(url, timeout=5, **kwargs):
+            heads.append(url)
+            raise self.main.requests.ConnectionError("connection reset")
+
+        with patch.dict(os.environ, {"HQ_HEALTH_BREAKER_FAILURES": "1"}), patch.object(
+            self.main.requests.Session, "head", side_effect=dead_head
+        ), patch.object(self.main.requests.Session, "get", return_value=MagicMock(status_code=200)):
+            for _ in range(2):
+                head = self.main._check_health_target("public", url, "head")
+            get = self.main._check_health_target("public", url, "get")
+
+        self.assertEqual(len(heads), 1)
+        self.assertEqual(head["breaker"]["state"], "open")
+        self.assertEqual(get["status"], "healthy")
+        self.assertEqual(get["breaker"]["state"], "closed")
+
     def test_project_action_runs_configured_command(self):
         self.registry.update_project("jobby", {"deployment_host": ""})
-        completed = Mock(returncode=0, stdout="restarted\n", stderr="")
+        fake, calls = self.fake_command_output("restarted\n")
 
-        with patch.object(self.main.subprocess, "run", return_value=completed) as run_mock:
-            response = self.main.run_project_action("jobby", {"action": "restart"})
+        with patch.object(self.main, "iter_command_output", side_effect=fake):
+            job = self.run_action("jobby", "restart")
 
-        payload = self.read_payload(response)
-        self.assertTrue(payload["ok"])
-        self.assertEqual(payload["action"], "restart")
-        self.assertEqual(payload["stdout"], "restarted\n")
-        run_mock.assert_called_once()
-        self.assertEqual(run_mock.call_args.kwargs["cwd"], "/srv/stacks/jobby")
-        self.assertEqual(payload["cwd"], "/srv/stacks/jobby")
+        self.assertTrue(job["ok"])
+        self.assertEqual(job["status"], "succeeded")
+        self.assertEqual(job["action"], "restart")
+        self.assertEqual(job["stdout"], "restarted\n")
+        self.assertEqual(job["exit_code"], 0)
+        self.assertEqual(calls, [{"command": "docker compose restart", "cwd": "/srv/stacks/jobby"}])
+        self.assertEqual(job["cwd"], "/srv/stacks/jobby")
+        self.assertIsNotNone(job["duration_ms"])
 
     def test_project_logs_action_runs_configured_command(self):
         self.registry.update_project("hermes", {"deployment_host": ""})
-        completed = Mock(returncode=0, stdout="recent logs\n", stderr="")
+        fake, calls = self.fake_command_output("recent logs\n")
 
-        with patch.object(self.main.subprocess, "run", return_value=completed) as run_mock:
-            response = self.main.run_project_action("hermes", {"action": "logs"})
+        with patch.object(self.main, "iter_command_output", side_effect=fake):
+            job = self.run_action("hermes", "logs")
 
-        payload = self.read_payload(response)
-        self.assertTrue(payload["ok"])
-        self.assertEqual(payload["action"], "logs")
-        self.assertIn("recent logs", payload["stdout"])
-        self.assertEqual(run_mock.call_args.kwargs["cwd"], "/srv/stacks/hermes")
+        self.assertTrue(job["ok"])
+        self.assertEqual(job["action"], "logs")
+        self.assertIn("recent logs", job["stdout"])
+        self.assertEqual(calls[0]["cwd"], "/srv/stacks/hermes")
 
     def test_project_action_uses_host_runner_when_configured(self):
         self.hosts_registry.update_host(
@@ -220,41 +333,31 @@ class ProjectOpsApiTests(unittest.TestCase):
         )
         os.environ["HQ_ACTION_RUNNER_TOKEN"] = "runner-token"
 
-        runner_response = Mock(
-            status_code=200,
-            text=json.dumps(
-                {
-                    "ok": True,
-                    "action": "restart",
-                    "command": "docker compose restart",
-                    "cwd": "/srv/stacks/jobby",
-                    "exit_code": 0,
-                    "stdout": "runner ok\n",
-                    "stderr": "",
-                    "detail": "Command completed successfully.",
-                    "ran_at": "2026-03-17T13:00:00Z",
-                }
-            ),
+        runner_response = self.runner_json_response(
+            {
+                "ok": True,
+                "action": "restart",
+                "command": "docker compose restart",
+                "cwd": "/srv/stacks/jobby",
+                "exit_code": 0,
+                "stdout": "runner ok\n",
+                "stderr": "",
+                "detail": "Command completed successfully.",
+                "ran_at": "2026-03-17T13:00:00Z",
+            }
         )
 
-        with patch.object(self.main.requests, "post", return_value=runner_response) as post_mock:
-            response = self.main.run_project_action("jobby", {"action": "restart"})
+        with patch.object(self.main.RUNNER_CLIENT, "open", return_value=(Mock(), runner_response)) as open_mock:
+            job = self.run_action("jobby", "restart")
 
-        payload = self.read_payload(response)
-        self.assertTrue(payload["ok"])
-        self.assertEqual(payload["stdout"], "runner ok\n")
-        self.assertEqual(
-            post_mock.call_args.args[0],
-            "http://runner.local:8051/run",
-        )
-        self.assertEqual(
-            post_mock.call_args.kwargs["headers"]["Authorization"],
-            "Bearer runner-token",
-        )
-        self.assertEqual(
-            post_mock.call_args.kwargs["json"]["cwd"],
-            "/srv/stacks/jobby",
-        )
+        runner, method, path, body = open_mock.call_args.args
+        self.assertTrue(job["ok"])
+        self.assertEqual(job["stdout"], "runner ok\n")
+        self.assertEqual(job["host_slug"], "srv")
+        self.assertEqual(job["runner_transport"], "http")
+        self.assertEqual((runner["runner_url"], method, path), ("http://runner.local:8051", "POST", "/run"))
+        self.assertEqual(runner["token"], "runner-token")
+        self.assertEqual(body["cwd"], "/srv/stacks/jobby")
 
     def test_project_action_uses_host_runner_socket_when_configured(self):
         self.hosts_registry.update_host(
@@ -267,24 +370,19 @@ class ProjectOpsApiTests(unittest.TestCase):
 
         with patch.object(
             self.main,
-            "_run_project_command_via_runner",
-            return_value={
-                "ok": True,
-                "action": "logs",
-                "command": "docker compose logs --tail 100",
-                "cwd": "/srv/stacks/jobby",
-                "exit_code": 0,
-                "stdout": "runner socket ok\n",
-                "stderr": "",
-                "detail": "Command completed successfully.",
-                "ran_at": "2026-03-17T13:00:00Z",
-            },
+            "_stream_project_command_via_runner",
+            return_value=iter(
+                [
+                    {"type": "stdout", "line": "runner socket ok\n"},
+                    {"type": "exit", "ok": True, "exit_code": 0, "stdout": "runner socket ok\n", "stderr": ""},
+                ]
+            ),
         ) as via_runner_mock:
-            response = self.main.run_project_action("jobby", {"action": "logs"})
+            job = self.run_action("jobby", "logs")
 
-        payload = self.read_payload(response)
-        self.assertTrue(payload["ok"])
-        self.assertEqual(payload["stdout"], "runner socket ok\n")
+        self.assertTrue(job["ok"])
+        self.assertEqual(job["stdout"], "runner socket ok\n")
+        self.assertEqual(job["runner_transport"], "socket")
         via_runner_mock.assert_called_once()
 
     def test_project_action_uses_remote_host_token_env_var(self):
@@ -298,30 +396,26 @@ class ProjectOpsApiTests(unittest.TestCase):
         )
         os.environ["HQ_ACTION_RUNNER_TOKEN_DESK"] = "desk-token"
 
-        runner_response = Mock(
-            status_code=200,
-            text=json.dumps(
-                {
-                    "ok": True,
-                    "action": "logs",
-                    "command": "docker compose logs --tail 100",
-                    "cwd": "/srv/stacks/jobby",
-                    "exit_code": 0,
-                    "stdout": "desk ok\n",
-                    "stderr": "",
-                    "detail": "Command completed successfully.",
-                    "ran_at": "2026-03-17T13:00:00Z",
-                }
-            ),
+        runner_response = self.runner_json_response(
+            {
+                "ok": True,
+                "action": "logs",
+                "command": "docker compose logs --tail 100",
+                "cwd": "/srv/stacks/jobby",
+                "exit_code": 0,
+                "stdout": "desk ok\n",
+                "stderr": "",
+                "detail": "Command completed successfully.",
+                "ran_at": "2026-03-17T13:00:00Z",
+            }
         )
 
-        with patch.object(self.main.requests, "post", return_value=runner_response) as post_mock:
-            response = self.main.run_project_action("jobby", {"action": "logs"})
+        with patch.object(self.main.RUNNER_CLIENT, "open", return_value=(Mock(), runner_response)) as open_mock:
+            job = self.run_action("jobby", "logs")
 
-        payload = self.read_payload(response)
-        self.assertTrue(payload["ok"])
-        self.assertEqual(payload["stdout"], "desk ok\n")
-        self.assertEqual(post_mock.call_args.kwargs["headers"]["Authorization"], "Bearer desk-token")
+        self.assertTrue(job["ok"])
+        self.assertEqual(job["stdout"], "desk ok\n")
+        self.assertEqual(open_mock.call_args.args[0]["token"], "desk-token")
 
     def test_http_runner_without_configured_token_is_treated_as_unconfigured(self):
         self.hosts_registry.update_host(
@@ -352,15 +446,16 @@ class ProjectOpsApiTests(unittest.TestCase):
             },
         )
         os.environ["HQ_ACTION_RUNNER_TOKEN"] = "runner-token"
-        response_ok = Mock(status_code=200, text=json.dumps({"ok": True, "service": "hq-action-runner"}))
+        response_ok = (200, json.dumps({"ok": True, "service": "hq-action-runner"}))
 
-        with patch.object(self.main.requests, "get", return_value=response_ok) as get_mock:
+        with patch.object(self.main.RUNNER_CLIENT, "request", return_value=response_ok) as request_mock:
             response = self.main.refresh_hosts_health()
 
         payload = self.read_payload(response)
         by_slug = {item["slug"]: item for item in payload["hosts"]}
         self.assertEqual(by_slug["srv"]["runner_snapshot"]["status"], "healthy")
-        self.assertEqual(get_mock.call_args.args[0], "http://runner.local:8051/health")
+        self.assertEqual(request_mock.call_args.args[0]["runner_url"], "http://runner.local:8051")
+        self.assertEqual(request_mock.call_args.args[1:3], ("GET", "/health"))
 
     def test_project_action_rejects_missing_command(self):
         self.registry.update_project("jobby", {"stop_command": ""})
@@ -388,15 +483,261 @@ class ProjectOpsApiTests(unittest.TestCase):
 
     def test_project_action_without_deployment_host_runs_locally(self):
         self.registry.update_project("jobby", {"deployment_host": ""})
-        completed = Mock(returncode=0, stdout="local ok\n", stderr="")
+        fake, calls = self.fake_command_output("local ok\n")
 
-        with patch.object(self.main.subprocess, "run", return_value=completed) as run_mock:
-            response = self.main.run_project_action("jobby", {"action": "logs"})
+        with patch.object(self.main, "iter_command_output", side_effect=fake):
+            job = self.run_action("jobby", "logs")
 
-        payload = self.read_payload(response)
-        self.assertTrue(payload["ok"])
-        self.assertEqual(payload["stdout"], "local ok\n")
-        self.assertEqual(run_mock.call_args.kwargs["cwd"], "/srv/stacks/jobby")
+        self.assertTrue(job["ok"])
+        self.assertEqual(job["stdout"], "local ok\n")
+        self.assertEqual(job["host_slug"], "")
+        self.assertEqual(calls[0]["cwd"], "/srv/stacks/jobby")
+
+    def test_project_actions_are_serialized_per_project(self):
+        self.registry.update_project("jobby", {"deployment_host": ""})
+        self.registry.update_project("hermes", {"deployment_host": ""})
+        release = threading.Event()
+        active = []
+        overlaps = []
+        lock = threading.Lock()
+
+        def slow(command, cwd, timeout):
+            with lock:
+                if cwd in active:
+                    overlaps.append(cwd)
+                active.append(cwd)
+            release.wait(5)
+            with lock:
+                active.remove(cwd)
+            yield {"type": "exit", "ok": True, "exit_code": 0, "stdout": "", "stderr": ""}
+
+        with patch.object(self.main, "iter_command_output", side_effect=slow):
+            first = self.read_payload(self.main.run_project_action("jobby", {"action": "deploy"}))["job"]
+            second = self.read_payload(self.main.run_project_action("jobby", {"action": "deploy"}))["job"]
+            other = self.read_payload(self.main.run_project_action("hermes", {"action": "logs"}))["job"]
+            deadline = time.monotonic() + 5
+            while len(active) < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            self.assertEqual(sorted(active), ["/srv/stacks/hermes", "/srv/stacks/jobby"])
+            self.assertEqual(self.read_payload(self.main.get_action(first["id"]))["status"], "running")
+            self.assertEqual(self.read_payload(self.main.get_action(second["id"]))["status"], "queued")
+            release.set()
+            for job in (first, second, other):
+                self.assertTrue(self.main.ACTION_JOBS.wait(job["id"], timeout=5))
+
+        self.assertEqual(overlaps, [])
+        history = self.read_payload(self.main.get_project_actions("jobby"))["jobs"]
+        self.assertEqual([job["id"] for job in history], [second["id"], first["id"]])
+        self.assertTrue(all(job["status"] == "succeeded" for job in history))
+
+    def test_action_job_closes_its_record_stream_after_the_exit_record(self):
+        closed = []
+
+        def records():
+            try:
+                yield {"type": "stdout", "line": "done\n"}
+                yield {"type": "exit", "ok": True, "exit_code": 0, "stdout": "done\n", "stderr": ""}
+                yield {"type": "stdout", "line": "never read\n"}
+            finally:
+                closed.append(True)
+
+        stream = records()
+        job = self.main.create_action_job("jobby", "deploy")
+        self.main.ACTION_JOBS.submit("jobby", job["id"], stream)
+
+        self.assertTrue(self.main.ACTION_JOBS.wait(job["id"], timeout=5))
+        self.assertEqual(closed, [True])
+        self.assertEqual(self.read_payload(self.main.get_action(job["id"]))["status"], "succeeded")
+
+    def run_bulk(self, payload):
+        response = self.main.run_bulk_project_action(payload)
+        self.assertEqual(response.status_code, 202, self.read_payload(response))
+        plan = self.read_payload(response)["plan"]
+        self.assertTrue(self.main.BULK_ACTIONS.wait(plan["id"], timeout=5))
+        return self.read_payload(self.main.get_bulk_action(plan["id"]))
+
+    def test_bulk_action_runs_dependency_waves_and_stops_on_failure(self):
+        for slug in ("janus", "hermes", "jobby"):
+            self.registry.update_project(slug, {"deployment_host": "", "stop_command": f"stop {slug}"})
+        order = []
+        failing = set()
+
+        def fake(command, cwd, timeout):
+            slug = cwd.rsplit("/", 1)[-1]
+            order.append(slug)
+            ok = slug not in failing
+            yield {"type": "exit", "ok": ok, "exit_code": 0 if ok else 1, "stdout": "", "stderr": ""}
+
+        with patch.object(self.main, "iter_command_output", side_effect=fake):
+            plan = self.run_bulk({"action": "deploy", "slugs": ["jobby", "janus", "hermes"]})
+            self.assertEqual(plan["waves"], [["hermes", "janus"], ["jobby"]])
+            self.assertEqual(plan["status"], "succeeded")
+            self.assertEqual(order[-1], "jobby")
+            self.assertIsNotNone(plan["wall_clock_ms"])
+            steps = {step["slug"]: step for step in plan["steps"]}
+            job = self.read_payload(self.main.get_action(steps["jobby"]["job_id"]))
+            self.assertEqual(job["status"], "succeeded")
+            self.assertTrue(all(step["duration_ms"] is not None for step in plan["steps"]))
+
+            stop = self.run_bulk({"action": "stop", "slugs": ["janus", "jobby"]})
+            self.assertEqual(stop["waves"], [["jobby"], ["janus"]])
+
+            failing.add("hermes")
+            order.clear()
+            plan = self.run_bulk({"action": "deploy", "slugs": ["jobby", "hermes"]})
+
+        steps = {step["slug"]: step for step in plan["steps"]}
+        self.assertEqual(plan["status"], "failed")
+        self.assertEqual(plan["failed"], ["hermes"])
+        self.assertEqual(steps["jobby"]["status"], "skipped")
+        self.assertEqual(order, ["hermes"])
+
+    def test_bulk_step_deadline_starts_when_its_job_does(self):
+        for slug in ("hermes", "jobby"):
+            self.registry.update_project(slug, {"deployment_host": ""})
+        gates = []
+
+        def fake(command, cwd, timeout):
+            if cwd.endswith("/hermes") and gates:
+                gates.pop().wait(5)
+            yield {"type": "exit", "ok": True, "exit_code": 0, "stdout": "", "stderr": ""}
+
+        with patch.object(self.main, "iter_command_output", side_effect=fake), patch.object(
+            self.main, "BULK_STEP_TIMEOUT_SECONDS", 0.5
+        ):
+            # Queued behind a slower hermes job for longer than the step timeout: still succeeds.
+            hold = threading.Event()
+            gates.append(hold)
+            earlier = self.read_payload(self.main.run_project_action("hermes", {"action": "deploy"}))["job"]
+            threading.Timer(1.0, hold.set).start()
+            plan = self.run_bulk({"action": "deploy", "slugs": ["jobby", "hermes"]})
+            self.assertEqual(plan["status"], "succeeded")
+            self.assertTrue(self.main.ACTION_JOBS.wait(earlier["id"], timeout=5))
+
+            # Running past it: the step is timed out, its job left running and jobby never started.
+            hold = threading.Event()
+            gates.append(hold)
+            plan = self.run_bulk({"action": "deploy", "slugs": ["jobby", "hermes"]})
+            steps = {step["slug"]: step for step in plan["steps"]}
+            self.assertEqual(plan["status"], "failed")
+            self.assertEqual(steps["hermes"]["status"], "timed_out")
+            self.assertEqual(steps["jobby"]["status"], "skipped")
+            stuck = steps["hermes"]["job_id"]
+            self.assertEqual(self.read_payload(self.main.get_action(stuck))["status"], "running")
+            hold.set()
+            self.assertTrue(self.main.ACTION_JOBS.wait(stuck, timeout=5))
+
+        self.assertEqual(self.read_payload(self.main.get_action(stuck))["status"], "succeeded")
+
+    def test_bulk_action_rejects_plans_it_cannot_run(self):
+        response = self.main.run_bulk_project_action({"action": "deploy", "host": "srv"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("janus", self.read_payload(response)["detail"])
+        response = self.main.run_bulk_project_action({"action": "start", "slugs": ["hermes", "ghost"]})
+        self.assertEqual(self.read_payload(response)["detail"], "Unknown project(s): ghost.")
+        self.assertEqual(self.main.run_bulk_project_action({"action": "deploy"}).status_code, 400)
+        self.assertEqual(self.main.run_bulk_project_action({"action": "deploy", "host": "nope"}).status_code, 404)
+        self.assertEqual(self.read_payload(self.main.get_bulk_action(99)).get("detail"), "Bulk action not found.")
+
+    def test_get_action_returns_404_for_unknown_job(self):
+        self.assertEqual(self.main.get_action(999).status_code, 404)
+
+    def test_unfinished_jobs_are_failed_on_startup(self):
+        job = self.main.create_action_job("jobby", "deploy")
+
+        self.assertEqual(self.main.fail_unfinished_action_jobs("restarted"), 1)
+
+        stored = self.read_payload(self.main.get_action(job["id"]))
+        self.assertEqual((stored["status"], stored["detail"]), ("failed", "restarted"))
+
+    def test_stream_project_action_relays_runner_records(self):
+        self.hosts_registry.update_host(
+            "srv",
+            {
+                "transport": "http",
+                "runner_url": "http://runner.local:8051",
+            },
+        )
+        os.environ["HQ_ACTION_RUNNER_TOKEN"] = "runner-token"
+        lines = [
+            json.dumps({"type": "stdout", "line": "step 1\n"}).encode("utf-8") + b"\n",
+            json.dumps({"type": "exit", "ok": True, "exit_code": 0, "stdout": "step 1\n", "stderr": ""}).encode("utf-8")
+            + b"\n",
+        ]
+        response = Mock(status=200, getheader=lambda name: "application/x-ndjson")
+        response.__iter__ = lambda _self: iter(lines)
+        release = Mock()
+
+        with patch.object(self.main.RUNNER_CLIENT, "open", return_value=(release, response)) as open_mock:
+            records = list(self.main._stream_project_command(self.registry.get_project("jobby"), "restart"))
+
+        self.assertTrue(open_mock.call_args.args[3]["stream"])
+        self.assertEqual(records[0], {"type": "stdout", "line": "step 1\n"})
+        self.assertEqual(records[-1]["type"], "exit")
+        self.assertEqual(records[-1]["host_slug"], "srv")
+        self.assertEqual(records[-1]["command"], "docker compose restart")
+        release.assert_called_once()
+
+    def test_stream_project_action_rejects_missing_command_before_streaming(self):
+        self.registry.update_project("jobby", {"deploy_command": ""})
+
+        response = self.main.stream_project_action("jobby", {"action": "deploy"})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_stream_project_action_runs_as_a_queued_job(self):
+        self.registry.update_project("jobby", {"deployment_host": ""})
+        release = threading.Event()
+
+        def slow(command, cwd, timeout):
+            release.wait(5)
+            yield {"type": "stdout", "line": "deployed\n"}
+            yield {"type": "exit", "ok": True, "exit_code": 0, "stdout": "deployed\n", "stderr": ""}
+
+        async def collect(response):
+            return [chunk async for chunk in response.body_iterator]
+
+        with patch.object(self.main, "iter_command_output", side_effect=slow):
+            first = self.read_payload(self.main.run_project_action("jobby", {"action": "deploy"}))["job"]
+            response = self.main.stream_project_action("jobby", {"action": "deploy"})
+            streamed = self.read_payload(self.main.get_project_actions("jobby"))["jobs"][0]
+
+            self.assertEqual(response.media_type, "application/x-ndjson")
+            self.assertNotEqual(streamed["id"], first["id"])
+            self.assertEqual(self.read_payload(self.main.get_action(streamed["id"]))["status"], "queued")
+            release.set()
+            records = [json.loads(chunk) for chunk in asyncio.run(collect(response))]
+
+        self.assertEqual(records[0], {"type": "stdout", "line": "deployed\n"})
+        self.assertEqual(records[-1]["type"], "exit")
+        self.assertEqual(records[-1]["job_id"], streamed["id"])
+        self.assertTrue(records[-1]["ok"])
+        self.assertEqual(records[-1]["stdout"], "deployed\n")
+        self.assertTrue(self.main.ACTION_JOBS.wait(first["id"], timeout=5))
+        history = self.read_payload(self.main.get_project_actions("jobby"))["jobs"]
+        self.assertEqual([job["id"] for job in history], [streamed["id"], first["id"]])
+        self.assertTrue(all(job["status"] == "succeeded" for job in history))
+
+    def test_mixed_case_deployment_host_resolves_to_its_runner(self):
+        self.hosts_registry.update_host(
+            "srv",
+            {
+                "transport": "http",
+                "runner_url": "http://runner.local:8051",
+            },
+        )
+        os.environ["HQ_ACTION_RUNNER_TOKEN"] = "runner-token"
+
+        updated = self.registry.update_project("jobby", {"deployment_host": " SRV "})
+        self.assertEqual(updated["deployment_host"], "srv")
+
+        # A record stored before references were slugified still resolves through the index.
+        legacy = {**updated, "deployment_host": "Srv"}
+        self.assertEqual(self.main._resolve_project_host(legacy, self.main.host_index())["slug"], "srv")
+        direct, runner = self.main._project_health_check_plan(legacy, self.main.host_index())
+        self.assertNotIn("private", direct)
+        self.assertEqual(runner["private"][0], updated["health_private_url"])
 
     def test_get_projects_returns_cached_unknown_state_without_refresh(self):
         response = self.main.get_projects()
@@ -417,10 +758,7 @@ class ProjectOpsApiTests(unittest.TestCase):
         )
         os.environ["HQ_ACTION_RUNNER_TOKEN"] = "runner-token"
         responses = {
-            "https://auth.dimy.dev/health": Mock(status_code=200),
-            "http://runner.local:8051/health": Mock(
-                status_code=200, text=json.dumps({"ok": True, "service": "hq-action-runner"})
-            ),
+            "https://auth.dimy.dev/health": MagicMock(status_code=200),
         }
         runner_health = {
             "http://100.124.230.107:8100/health": {
@@ -455,18 +793,24 @@ class ProjectOpsApiTests(unittest.TestCase):
         def fake_get(url, timeout=5, **kwargs):
             return responses[url]
 
-        def fake_post(url, headers=None, json=None, timeout=10, **kwargs):
-            if url == "http://runner.local:8051/check-url":
-                return Mock(status_code=200, text=json_module.dumps(runner_health[json["url"]]))
-            raise AssertionError(f"Unexpected POST {url}")
+        batches = []
 
-        json_module = json
+        def fake_runner_request(runner, method, path, payload=None, timeout=10):
+            if path == "/health":
+                return 200, json.dumps({"ok": True, "service": "hq-action-runner"})
+            if path == "/check-urls":
+                batches.append([target["url"] for target in payload["targets"]])
+                return 200, json.dumps({"results": [runner_health[target["url"]] for target in payload["targets"]]})
+            raise AssertionError(f"Unexpected runner request {method} {path}")
 
-        with patch.object(self.main.requests, "get", side_effect=fake_get), patch.object(
-            self.main.requests, "post", side_effect=fake_post
+        with patch.object(self.main.requests.Session, "get", side_effect=fake_get), patch.object(
+            self.main.RUNNER_CLIENT, "request", side_effect=fake_runner_request
         ):
             response = self.main.refresh_projects_health()
 
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(sorted(batches[0]), sorted(runner_health))
+
         payload = self.read_payload(response)
         by_slug = {item["slug"]: item for item in payload["projects"]}
         self.assertEqual(by_slug["jobby"]["health_snapshot"]["summary"], "healthy")
@@ -474,6 +818,50 @@ class ProjectOpsApiTests(unittest.TestCase):
         self.assertEqual(by_slug["jobby"]["ops_summary"], "degraded")
         self.assertEqual(by_slug["jobby"]["host_snapshot"]["status"], "healthy")
 
+    def test_refresh_projects_health_runs_checks_concurrently_with_deadline(self):
+        os.environ["HQ_HEALTH_DEADLINE_SECONDS"] = "0.5"
+        self.addCleanup(os.environ.pop, "HQ_HEALTH_DEADLINE_SECONDS", None)
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def fake_get(url, timeout=5, **kwargs):
+            if url == "http://100.124.230.107:8010/health":
+                release.wait(5)
+            return MagicMock(status_code=200)
+
+        started = time.perf_counter()
+        with patch.object(self.main.requests.Session, "get", side_effect=fake_get):
+            response = self.main.refresh_projects_health()
+        elapsed = time.perf_counter() - started
+
+        payload = self.read_payload(response)
+        by_slug = {item["slug"]: item for item in payload["projects"]}
+        hermes_private = by_slug["hermes"]["health_snapshot"]["checks"]["private"]
+        self.assertLess(elapsed, 3)
+        self.assertEqual(hermes_private["status"], "unknown")
+        self.assertIn("deadline", hermes_private["detail"])
+        self.assertEqual(by_slug["janus"]["health_snapshot"]["summary"], "healthy")
+        self.assertIn("duration_ms", by_slug["janus"]["health_snapshot"]["checks"]["public"])
+
+    def test_refresh_probes_shared_health_urls_once(self):
+        self.registry.update_project("hermes", {"health_private_url": "http://100.124.230.107:8100/health"})
+        calls = []
+
+        def fake_get(url, timeout=5, **kwargs):
+            calls.append(url)
+            return MagicMock(status_code=200)
+
+        with patch.object(self.main.requests.Session, "get", side_effect=fake_get):
+            response = self.main.refresh_projects_health()
+
+        self.assertEqual(calls.count("https://auth.dimy.dev/health"), 1)
+        self.assertEqual(calls.count("http://100.124.230.107:8100/health"), 1)
+        by_slug = {item["slug"]: item for item in self.read_payload(response)["projects"]}
+        self.assertEqual(by_slug["jobby"]["health_snapshot"]["checks"]["public"]["label"], "public")
+        self.assertEqual(by_slug["hermes"]["health_snapshot"]["checks"]["private"]["label"], "private")
+        self.assertEqual(by_slug["hermes"]["health_snapshot"]["checks"]["private"]["status"], "healthy")
+        self.assertEqual(self.main.get_metrics()["health_probes"]["coalesced"], 2)
+
     def test_private_health_uses_host_runner_when_available(self):
         self.hosts_registry.update_host(
             "srv",
@@ -484,31 +872,59 @@ class ProjectOpsApiTests(unittest.TestCase):
         )
         os.environ["HQ_ACTION_RUNNER_TOKEN"] = "runner-token"
 
-        with patch.object(self.main.requests, "get", return_value=Mock(status_code=200)) as get_mock, patch.object(
-            self.main.requests,
-            "post",
-            return_value=Mock(
-                status_code=200,
-                text=json.dumps(
+        with patch.object(
+            self.main.requests.Session, "get", return_value=MagicMock(status_code=200)
+        ) as get_mock, patch.object(
+            self.main.RUNNER_CLIENT,
+            "request",
+            return_value=(
+                200,
+                json.dumps(
                     {
-                        "label": "private",
-                        "url": "http://100.124.230.107:8010/health",
-                        "status": "healthy",
-                        "ok": True,
-                        "http_status": 200,
-                        "checked_at": "2026-03-17T13:00:00Z",
-                        "detail": "HTTP 200",
+                        "results": [
+                            {
+                                "label": "private",
+                                "url": "http://100.124.230.107:8010/health",
+                                "status": "healthy",
+                                "ok": True,
+                                "http_status": 200,
+                                "checked_at": "2026-03-17T13:00:00Z",
+                                "detail": "HTTP 200",
+                                "duration_ms": 12.5,
+                            }
+                        ]
                     }
                 ),
             ),
-        ) as post_mock:
+        ) as request_mock:
             snapshot = self.main.check_project_health("hermes")
 
         payload = self.read_payload(snapshot)
         self.assertEqual(payload["summary"], "healthy")
         self.assertEqual(payload["checks"]["private"]["status"], "healthy")
+        self.assertEqual(payload["checks"]["private"]["duration_ms"], 12.5)
         self.assertEqual(get_mock.call_count, 0)
-        self.assertEqual(post_mock.call_args.args[0], "http://runner.local:8051/check-url")
+        self.assertEqual(request_mock.call_args.args[0]["runner_url"], "http://runner.local:8051")
+        self.assertEqual(request_mock.call_args.args[1:3], ("POST", "/check-urls"))
+
+    def test_private_health_falls_back_to_single_checks_for_old_runners(self):
+        self.hosts_registry.update_host("srv", {"transport": "http", "runner_url": "http://runner.local:8051"})
+        os.environ["HQ_ACTION_RUNNER_TOKEN"] = "runner-token"
+        paths = []
+
+        def fake_runner_request(runner, method, path, payload=None, timeout=10):
+            paths.append(path)
+            if path == "/check-urls":
+                return 404, json.dumps({"detail": "Not found."})
+            return 200, json.dumps({"label": "private", "url": payload["url"], "status": "healthy", "ok": True})
+
+        with patch.object(self.main.requests.Session, "get", return_value=MagicMock(status_code=200)), patch.object(
+            self.main.RUNNER_CLIENT, "request", side_effect=fake_runner_request
+        ):
+            payload = self.read_payload(self.main.check_project_health("hermes"))
+
+        self.assertEqual(paths, ["/check-urls", "/check-url"])
+        self.assertEqual(payload["checks"]["private"]["status"], "healthy")
 
     def test_publish_project_catalog_returns_publish_payload(self):
         with patch.object(
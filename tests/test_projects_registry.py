@@ -3,6 +3,7 @@ import json
 import os
 import tempfile
 import unittest
+from unittest.mock import patch
 
 
 class ProjectRegistryTests(unittest.TestCase):
@@ -55,6 +56,8 @@ class ProjectRegistryTests(unittest.TestCase):
         os.environ.pop("HQ_HOSTS_PATH", None)
 
     def test_create_project_with_ops_fields(self):
+        for slug in ("janus", "hermes"):
+            self.registry.create_project({"slug": slug, "title": slug.title(), "public_summary": "Service."})
         project = self.registry.create_project(
             {
                 "slug": "jobby",
@@ -86,6 +89,31 @@ class ProjectRegistryTests(unittest.TestCase):
         self.assertEqual(project["restart_command"], "docker compose restart")
         self.assertEqual(project["logs_command"], "docker compose logs --tail 100")
         self.assertEqual(project["depends_on"], ["janus", "hermes"])
+        self.assertEqual(project["health_probe_method"], "get")
+        updated = self.registry.update_project("jobby", {"health_probe_method": "HEAD"})
+        self.assertEqual(updated["health_probe_method"], "head")
+        with self.assertRaisesRegex(self.registry.ProjectValidationError, "health_probe_method"):
+            self.registry.update_project("jobby", {"health_probe_method": "options"})
+
+    def test_depends_on_is_validated_at_write_time(self):
+        def create(slug, depends_on=()):
+            return self.registry.create_project(
+                {"slug": slug, "title": slug.title(), "public_summary": "Service.", "depends_on": list(depends_on)}
+            )
+
+        create("db")
+        create("api", ["db"])
+        create("web", ["api"])
+
+        with self.assertRaisesRegex(self.registry.ProjectValidationError, "Unknown depends_on project"):
+            create("worker", ["queue"])
+        with self.assertRaisesRegex(self.registry.ProjectValidationError, "db -> web -> api -> db"):
+            self.registry.update_project("db", {"depends_on": ["web"]})
+        with self.assertRaisesRegex(self.registry.ProjectValidationError, "cannot depend on itself"):
+            self.registry.update_project("db", {"depends_on": ["db"]})
+        with self.assertRaisesRegex(self.registry.ProjectValidationError, "still depend on it: web"):
+            self.registry.delete_project("api")
+        self.assertEqual(self.registry.update_project("api", {"title": "API"})["depends_on"], ["db"])
 
     def test_create_project_rejects_unknown_deployment_host(self):
         with self.assertRaises(self.registry.ProjectValidationError):
@@ -114,6 +142,56 @@ class ProjectRegistryTests(unittest.TestCase):
                 }
             )
 
+    def test_lookups_are_served_from_cache_until_the_file_changes(self):
+        self.registry.create_project({"slug": "jobby", "title": "Jobby", "public_summary": "Jobs."})
+        reloads = self.registry.registry_cache_stats()["reloads"]
+
+        self.assertEqual(self.registry.get_project("Jobby")["title"], "Jobby")
+        self.assertEqual([project["slug"] for project in self.registry.list_projects()], ["jobby"])
+        self.assertEqual(self.registry.registry_cache_stats()["reloads"], reloads)
+
+        edited = json.loads(open(self.projects_path, encoding="utf-8").read())
+        edited[0]["title"] = "Jobby (edited by hand)"
+        replacement = self.projects_path + ".tmp"
+        with open(replacement, "w", encoding="utf-8") as handle:
+            json.dump(edited, handle)
+        os.replace(replacement, self.projects_path)
+
+        self.assertEqual(self.registry.get_project("jobby")["title"], "Jobby (edited by hand)")
+        self.assertEqual(self.registry.registry_cache_stats()["reloads"], reloads + 1)
+
+    def test_loading_catalog_reads_each_registry_file_once(self):
+        projects = [
+            {"slug": f"app-{index}", "title": f"App {index}", "public_summary": "App.", "deployment_host": "srv"}
+            for index in range(50)
+        ]
+        with open(self.projects_path, "w", encoding="utf-8") as handle:
+            json.dump(projects, handle)
+        replacement = self.hosts_path + ".tmp"
+        with open(self.hosts_path, encoding="utf-8") as src, open(replacement, "w", encoding="utf-8") as dst:
+            dst.write(src.read())
+        os.replace(replacement, self.hosts_path)  # new inode: the hosts cache must reload
+
+        with patch.object(
+            self.hosts_registry, "_load_hosts_raw", wraps=self.hosts_registry._load_hosts_raw
+        ) as hosts_load, patch.object(
+            self.registry, "_load_projects_raw", wraps=self.registry._load_projects_raw
+        ) as projects_load:
+            listed = self.registry.list_projects()
+            for project in listed:
+                self.hosts_registry.get_host(project["deployment_host"])
+
+        self.assertEqual(len(listed), 50)
+        self.assertEqual(hosts_load.call_count, 1)
+        self.assertEqual(projects_load.call_count, 1)
+
+    def test_returned_records_do_not_alias_the_cache(self):
+        self.registry.create_project({"slug": "jobby", "title": "Jobby", "public_summary": "Jobs."})
+
+        self.registry.get_project("jobby")["title"] = "mutated"
+
+        self.assertEqual(self.registry.get_project("jobby")["title"], "Jobby")
+
     def test_export_keeps_public_fields_only(self):
         self.registry.create_project(
             {
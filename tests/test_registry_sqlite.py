@@ -0,0 +1,97 @@
+import importlib
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+
+class RegistrySqliteTests(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        root = Path(self.tempdir.name)
+        self.projects_path = root / "projects.json"
+        self.hosts_path = root / "hosts.json"
+        self.hosts_path.write_text(
+            json.dumps([{"slug": "desk", "title": "Desk"}, {"slug": "box", "title": "Box"}]), encoding="utf-8"
+        )
+        self.projects_path.write_text(
+            json.dumps(
+                [
+                    {"slug": "zeta", "title": "Zeta", "public_summary": "Z.", "deployment_host": "desk"},
+                    {"slug": "alpha", "title": "Alpha", "public_summary": "A.", "sort_order": 1},
+                    {"slug": "beta", "title": "Beta", "public_summary": "B.", "deployment_host": "desk"},
+                ]
+            ),
+            encoding="utf-8",
+        )
+        env = {
+            "HQ_PROJECTS_PATH": str(self.projects_path),
+            "HQ_HOSTS_PATH": str(self.hosts_path),
+            "HQ_PROJECTS_EXPORT_PATH": str(root / "projects.generated.json"),
+            "HQ_REGISTRY_BACKEND": "sqlite",
+            "HQ_REGISTRY_DB_PATH": str(root / "registry.db"),
+        }
+        patcher = patch.dict(os.environ, env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tempdir.cleanup)
+
+        import controller.hosts_registry as hosts_registry
+        import controller.projects_registry as projects_registry
+        import controller.registry_sqlite as registry_sqlite
+
+        self.sqlite = importlib.reload(registry_sqlite)
+        self.addCleanup(self.sqlite.close_registries)
+        self.projects = importlib.reload(projects_registry)
+        self.hosts = importlib.reload(hosts_registry)
+
+    def test_first_open_imports_json_registries(self):
+        self.assertEqual([p["slug"] for p in self.projects.list_projects()], ["beta", "zeta", "alpha"])
+        self.assertEqual([h["slug"] for h in self.hosts.list_hosts()], ["box", "desk"])
+        self.assertEqual(self.projects.get_project("Zeta")["deployment_host"], "desk")
+
+    def test_writes_go_to_sqlite_and_leave_json_untouched(self):
+        before = self.projects_path.read_text(encoding="utf-8")
+
+        self.projects.create_project({"slug": "gamma", "title": "Gamma", "public_summary": "G."})
+        self.projects.update_project("alpha", {"title": "Alpha Prime", "deployment_host": "box"})
+        self.projects.delete_project("zeta")
+        with self.assertRaises(self.projects.ProjectValidationError):
+            self.projects.create_project({"slug": "gamma", "title": "Again", "public_summary": "G."})
+
+        self.assertEqual(self.projects_path.read_text(encoding="utf-8"), before)
+        reloaded = importlib.reload(self.projects)
+        self.assertEqual([p["slug"] for p in reloaded.list_projects()], ["beta", "gamma", "alpha"])
+        self.assertEqual(reloaded.get_project("alpha")["title"], "Alpha Prime")
+
+    def test_host_filter_and_delete_check_use_deployment_host_index(self):
+        plan = self.sqlite.open_projects_registry()._conn.execute(
+            "EXPLAIN QUERY PLAN SELECT record FROM projects WHERE deployment_host = ? ORDER BY sort_order", ("desk",)
+        ).fetchall()
+
+        self.assertIn("projects_deployment_host", " ".join(str(row) for row in plan))
+        self.assertEqual([p["slug"] for p in self.projects.list_projects_on_host("desk")], ["beta", "zeta"])
+        with self.assertRaisesRegex(self.projects.ProjectValidationError, "beta, zeta"):
+            self.hosts.delete_host("desk")
+        self.assertEqual(self.hosts.delete_host("box")["slug"], "box")
+
+    def test_dump_round_trips_to_json_format_and_export_still_works(self):
+        self.projects.update_project("beta", {"public_mode": "source", "repo_url": "https://github.com/x/beta"})
+        destination = Path(self.tempdir.name) / "dump" / "projects.json"
+
+        self.assertEqual(self.projects.dump_projects_registry(destination), 3)
+        dumped = json.loads(destination.read_text(encoding="utf-8"))
+        self.assertEqual([p["slug"] for p in dumped], ["zeta", "alpha", "beta"])
+        self.assertEqual(dumped[2]["public_mode"], "source")
+
+        exported = self.projects.export_projects()
+        self.assertEqual([p["slug"] for p in exported["projects"]], ["beta"])
+
+        with patch.dict(os.environ, {"HQ_PROJECTS_PATH": str(destination)}):
+            self.assertEqual(self.projects.import_projects_registry(), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
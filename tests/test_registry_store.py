@@ -0,0 +1,122 @@
+import importlib
+import json
+import os
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+
+class RegistryStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.projects_path = Path(self.tempdir.name) / "projects.json"
+        self.journal = Path(self.tempdir.name) / "projects.json.journal"
+        env = {
+            "HQ_PROJECTS_PATH": str(self.projects_path),
+            "HQ_HOSTS_PATH": os.path.join(self.tempdir.name, "hosts.json"),
+            "HQ_REGISTRY_JOURNAL": "1",
+        }
+        patcher = patch.dict(os.environ, env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tempdir.cleanup)
+
+        import controller.projects_registry as projects_registry
+        import controller.registry_store as registry_store
+
+        self.store = importlib.reload(registry_store)
+        self.registry = importlib.reload(projects_registry)
+
+    def create(self, slug):
+        return self.registry.create_project({"slug": slug, "title": slug.title(), "public_summary": "Summary."})
+
+    def reload_registry(self):
+        """A fresh process: nothing cached, state comes from snapshot + journal."""
+        return importlib.reload(self.registry)
+
+    def test_mutations_append_to_journal_and_replay_on_load(self):
+        self.create("alpha")
+        self.create("beta")
+        snapshot_before = self.projects_path.read_text(encoding="utf-8")
+
+        self.registry.update_project("alpha", {"title": "Alpha Prime"})
+        self.registry.delete_project("beta")
+
+        self.assertEqual(self.projects_path.read_text(encoding="utf-8"), snapshot_before)
+        ops = [json.loads(line)["op"] for line in self.journal.read_text(encoding="utf-8").splitlines()]
+        self.assertEqual(ops, ["put", "put", "put", "delete"])
+        registry = self.reload_registry()
+        self.assertEqual([(p["slug"], p["title"]) for p in registry.list_projects()], [("alpha", "Alpha Prime")])
+
+    def test_concurrent_writes_do_not_drop_each_other(self):
+        save_records = self.registry.save_records
+
+        def slow_save(*args, **kwargs):
+            time.sleep(0.01)  # widen the window between reading the records and saving them
+            save_records(*args, **kwargs)
+
+        slugs = [f"app-{index}" for index in range(12)]
+        with patch.dict(os.environ, {"HQ_REGISTRY_JOURNAL": "0"}), patch.object(
+            self.registry, "save_records", side_effect=slow_save
+        ), ThreadPoolExecutor(max_workers=6) as pool:
+            list(pool.map(self.create, slugs))
+
+        self.assertEqual(sorted(p["slug"] for p in self.registry.list_projects()), sorted(slugs))
+        registry = self.reload_registry()
+        self.assertEqual(sorted(p["slug"] for p in registry.list_projects()), sorted(slugs))
+
+    def test_torn_last_journal_line_is_ignored(self):
+        self.create("alpha")
+        with open(self.journal, "a", encoding="utf-8") as handle:
+            handle.write('{"op": "put", "slug": "beta", "rec')
+
+        registry = self.reload_registry()
+
+        self.assertEqual([p["slug"] for p in registry.list_projects()], ["alpha"])
+
+    def test_compaction_folds_journal_into_snapshot(self):
+        self.create("alpha")
+        self.registry.update_project("alpha", {"title": "Alpha Prime"})
+
+        self.assertTrue(self.store.compact_journal(self.projects_path))
+
+        self.assertFalse(self.journal.exists())
+        snapshot = json.loads(self.projects_path.read_text(encoding="utf-8"))
+        self.assertEqual([(p["slug"], p["title"]) for p in snapshot], [("alpha", "Alpha Prime")])
+        self.assertEqual(self.registry.get_project("alpha")["title"], "Alpha Prime")
+        self.assertFalse(self.store.compact_journal(self.projects_path))
+
+    def test_journal_is_compacted_inline_past_max_entries(self):
+        with patch.dict(os.environ, {"HQ_REGISTRY_JOURNAL_MAX_ENTRIES": "3"}):
+            self.create("alpha")
+            self.create("beta")
+            self.assertTrue(self.journal.exists())
+            self.create("gamma")
+
+        self.assertFalse(self.journal.exists())
+        self.assertEqual(len(json.loads(self.projects_path.read_text(encoding="utf-8"))), 3)
+
+    def test_without_journal_writes_replace_snapshot_atomically(self):
+        with patch.dict(os.environ, {"HQ_REGISTRY_JOURNAL": "0"}):
+            self.create("alpha")
+
+        self.assertFalse(self.journal.exists())
+        self.assertEqual(json.loads(self.projects_path.read_text(encoding="utf-8"))[0]["slug"], "alpha")
+        self.assertEqual([p.name for p in self.projects_path.parent.iterdir() if p.name.endswith(".tmp")], [])
+
+    def test_failed_atomic_write_keeps_previous_file(self):
+        self.projects_path.write_text("[]\n", encoding="utf-8")
+
+        with patch.object(self.store.os, "replace", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.store.atomic_write_text(self.projects_path, '[{"slug": "half"')
+
+        self.assertEqual(self.projects_path.read_text(encoding="utf-8"), "[]\n")
+        self.assertEqual([p.name for p in self.projects_path.parent.iterdir()], ["projects.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
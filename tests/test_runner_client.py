@@ -0,0 +1,175 @@
+import http.client
+import json
+import os
+import socket
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer
+from unittest.mock import patch
+
+from controller.runner_client import RunnerClient
+from host_runner import server as runner_server
+
+
+class RunnerClientTests(unittest.TestCase):
+    def start(self, server):
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+    def test_health_checks_share_pooled_keep_alive_connections(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), runner_server.Handler)
+        server.daemon_threads = True
+        self.start(server)
+        runner = {"runner_url": f"http://127.0.0.1:{server.server_address[1]}", "token": ""}
+        client = RunnerClient()
+        self.addCleanup(client.close)
+
+        def check(index):
+            payload = {"label": "private", "url": f"http://127.0.0.1:1/health-{index}", "timeout_seconds": 1}
+            return client.request(runner, "POST", "/check-url", payload)
+
+        with patch.dict(os.environ, {"HQ_ACTION_RUNNER_TOKEN": ""}), ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(check, range(30)))
+
+        stats = client.stats()[f"http:127.0.0.1:{server.server_address[1]}"]
+        self.assertTrue(all(status == 200 for status, _body in results))
+        self.assertEqual(json.loads(results[0][1])["status"], "down")
+        self.assertEqual(stats["requests"], 30)
+        self.assertLessEqual(stats["connections"], 4)
+        self.assertGreaterEqual(stats["reused"], 26)
+
+    def test_batch_check_probes_targets_concurrently(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), runner_server.Handler)
+        server.daemon_threads = True
+        self.start(server)
+        runner = {"runner_url": f"http://127.0.0.1:{server.server_address[1]}", "token": ""}
+        client = RunnerClient()
+        self.addCleanup(client.close)
+        release = threading.Barrier(4, timeout=5)
+
+        def fake_probe(label, url, timeout, method="GET"):
+            if url.endswith("/missing"):
+                return {"label": label, "url": url, "status": "down", "ok": False}
+            release.wait()  # only passes once all four probes run at the same time
+            return {"label": label, "url": url, "status": "healthy", "ok": True}
+
+        targets = [{"label": "private", "url": f"http://127.0.0.1:1/{index}"} for index in range(4)]
+        targets.append({"label": "private", "url": "http://127.0.0.1:1/missing"})
+        targets.append({"label": "private"})
+        with patch.dict(os.environ, {"HQ_ACTION_RUNNER_TOKEN": ""}), patch.object(
+            runner_server, "_probe_url", side_effect=fake_probe
+        ):
+            status, body = client.request(runner, "POST", "/check-urls", {"targets": targets})
+
+        results = json.loads(body)["results"]
+        self.assertEqual(status, 200)
+        self.assertEqual([result["status"] for result in results], ["healthy"] * 4 + ["down", "down"])
+        self.assertEqual(results[4]["url"], "http://127.0.0.1:1/missing")
+        self.assertEqual(results[5]["detail"], "url is required.")
+
+    def test_open_streams_do_not_take_request_slots(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), runner_server.Handler)
+        server.daemon_threads = True
+        self.start(server)
+        runner = {"runner_url": f"http://127.0.0.1:{server.server_address[1]}", "token": ""}
+        client = RunnerClient()
+        self.addCleanup(client.close)
+        limits = {"HQ_ACTION_RUNNER_TOKEN": "", "HQ_RUNNER_MAX_CONNECTIONS": "1", "HQ_RUNNER_MAX_STREAMS": "1"}
+
+        with patch.dict(os.environ, limits):
+            release_stream, _response = client.open(runner, "GET", "/health", stream=True)
+            self.addCleanup(release_stream)
+            # The request slot is still free while the stream is held open...
+            status, _body = client.request(runner, "GET", "/health", timeout=1)
+            # ...but the stream budget is spent.
+            with self.assertRaises(TimeoutError):
+                client.open(runner, "GET", "/health", timeout=0.2, stream=True)
+
+        self.assertEqual(status, 200)
+
+    def test_unix_socket_transport_reuses_connection(self):
+        tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        socket_path = os.path.join(tempdir.name, "runner.sock")
+        server = runner_server.ThreadingUnixHTTPServer(socket_path, runner_server.Handler)
+        self.start(server)
+        client = RunnerClient()
+        self.addCleanup(client.close)
+        runner = {"runner_socket_path": socket_path}
+
+        first = client.request(runner, "GET", "/health")
+        second = client.request(runner, "GET", "/health")
+
+        stats = client.stats()[f"socket:{socket_path}"]
+        self.assertEqual(first[0], 200)
+        self.assertTrue(json.loads(second[1])["ok"])
+        self.assertEqual((stats["connections"], stats["reused"]), (1, 1))
+
+    def test_rejected_post_closes_connection_instead_of_draining_body(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), runner_server.Handler)
+        server.daemon_threads = True
+        self.start(server)
+        runner = {"runner_url": f"http://127.0.0.1:{server.server_address[1]}", "token": ""}
+        client = RunnerClient()
+        self.addCleanup(client.close)
+
+        missing = client.request(runner, "POST", "/nope", {"padding": "x" * 100})
+        health = client.request(runner, "GET", "/health")
+
+        self.assertEqual(missing[0], 404)
+        self.assertEqual(health[0], 200)
+        self.assertEqual(client.stats()[f"http:127.0.0.1:{server.server_address[1]}"]["connections"], 2)
+
+    def raw_post(self, port, headers):
+        """Send POST /run headers without a body; return the status and whether the runner hung up."""
+        with socket.create_connection(("127.0.0.1", port), timeout=5) as sock:
+            lines = ["POST /run HTTP/1.1", "Host: runner", *headers, "", ""]
+            sock.sendall("\r\n".join(lines).encode("ascii"))
+            response = http.client.HTTPResponse(sock)
+            response.begin()
+            response.read()
+            return response.status, sock.recv(1) == b""
+
+    def test_post_headers_are_checked_before_the_body_is_read(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), runner_server.Handler)
+        server.daemon_threads = True
+        self.start(server)
+        port = server.server_address[1]
+
+        with patch.dict(os.environ, {"HQ_ACTION_RUNNER_TOKEN": "secret"}):
+            self.assertEqual(self.raw_post(port, ["Content-Length: 10000000000"]), (401, True))
+            auth = "Authorization: Bearer secret"
+            self.assertEqual(self.raw_post(port, [auth, "Content-Length: 10000000000"]), (413, True))
+            self.assertEqual(self.raw_post(port, [auth, "Content-Length: lots"]), (400, True))
+            self.assertEqual(self.raw_post(port, [auth, "Content-Length: -5"]), (400, True))
+
+    def test_streaming_run_sends_lines_before_exit_record(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), runner_server.Handler)
+        server.daemon_threads = True
+        self.start(server)
+        runner = {"runner_url": f"http://127.0.0.1:{server.server_address[1]}", "token": ""}
+        client = RunnerClient()
+        self.addCleanup(client.close)
+        payload = {"action": "deploy", "command": "echo building; echo done", "stream": True}
+
+        with patch.dict(os.environ, {"HQ_ACTION_RUNNER_TOKEN": ""}):
+            release, response = client.open(runner, "POST", "/run", payload)
+            try:
+                records = [json.loads(line) for line in response if line.strip()]
+            finally:
+                release()
+            health = client.request(runner, "GET", "/health")
+
+        self.assertEqual(response.getheader("Content-Type"), "application/x-ndjson")
+        self.assertEqual([record.get("line") for record in records[:-1]], ["building\n", "done\n"])
+        self.assertEqual(records[-1]["type"], "exit")
+        self.assertEqual((records[-1]["exit_code"], records[-1]["action"]), (0, "deploy"))
+        self.assertEqual(health[0], 200)
+        self.assertEqual(client.stats()[f"http:127.0.0.1:{server.server_address[1]}"]["connections"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import importlib
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+
+
+class SupervisorTests(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tempdir.name, "tools.db")
+        os.environ["CONTROLLER_DB_PATH"] = self.db_path
+
+        import controller.db as controller_db
+        import controller.supervisor as supervisor
+
+        self.db = importlib.reload(controller_db)
+        self.supervisor = importlib.reload(supervisor)
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+        os.environ.pop("CONTROLLER_DB_PATH", None)
+
+    def test_child_exit_is_recorded_and_published(self):
+        self.db.init_db()
+        self.db.add_tool("crashy", "tools/crashy/main.py", 9300)
+        exited = threading.Event()
+        seen = []
+
+        def listener(name, pid, exit_code):
+            seen.append((name, pid, exit_code))
+            exited.set()
+
+        supervisor = self.supervisor.ProcessSupervisor()
+        supervisor.add_listener(listener)
+        proc = subprocess.Popen([sys.executable, "-c", "import sys; sys.stdin.read(); sys.exit(3)"], stdin=subprocess.PIPE)
+        self.db.update_tool_pid("crashy", proc.pid)
+        supervisor.track("crashy", proc)
+
+        self.assertTrue(supervisor.owns(proc.pid))
+        proc.stdin.close()
+        self.assertTrue(exited.wait(10))
+
+        tool = self.db.get_tool_by_name("crashy")
+        self.assertEqual(seen, [("crashy", proc.pid, 3)])
+        self.assertFalse(supervisor.owns(proc.pid))
+        self.assertIsNone(tool.pid)
+        self.assertEqual(tool.status, "stopped")
+        self.assertEqual(tool.exit_code, 3)
+        self.assertIsNotNone(tool.exited_at)
+        self.assertIsNotNone(proc.returncode)
+
+    def test_exit_does_not_clear_pid_of_a_relaunched_tool(self):
+        self.db.init_db()
+        self.db.add_tool("crashy", "tools/crashy/main.py", 9300)
+        self.db.update_tool_pid("crashy", 4242)
+
+        self.db.record_tool_exit("crashy", 4141, 1)
+
+        tool = self.db.get_tool_by_name("crashy")
+        self.assertEqual(tool.pid, 4242)
+        self.assertIsNone(tool.exit_code)
+
+    def test_init_db_adds_exit_columns_to_existing_table(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            "CREATE TABLE tools (id INTEGER PRIMARY KEY, name VARCHAR UNIQUE, process_path VARCHAR,"
+            " port INTEGER, pid INTEGER, status VARCHAR, last_heartbeat DATETIME, registered_at DATETIME)"
+        )
+        conn.commit()
+        conn.close()
+
+        self.db.init_db()
+        self.db.add_tool("legacy", "tools/legacy/main.py", 9301)
+
+        self.assertIsNone(self.db.get_tool_by_name("legacy").as_dict()["exit_code"])
+
+
+if __name__ == "__main__":
+    unittest.main()
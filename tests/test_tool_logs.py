@@ -0,0 +1,128 @@
+import asyncio
+import gzip
+import importlib
+import os
+import sys
+import tempfile
+import threading
+import types
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from starlette.requests import Request
+
+from controller import tool_logs
+
+
+def make_request():
+    scope = {"type": "http", "method": "GET", "path": "/", "query_string": b"", "headers": []}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    return Request(scope, receive)
+
+
+class ToolLogTests(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tempdir.name) / "downloader.out.log"
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_read_from_offset_and_tail(self):
+        self.path.write_bytes(b"one\ntwo\nthree\n")
+
+        first = tool_logs.read_log(self.path, offset=0, limit=6)
+        rest = tool_logs.read_log(self.path, offset=first["next_offset"])
+        tail = tool_logs.read_log(self.path, tail=8)
+
+        self.assertEqual(first["data"], "one\n")
+        self.assertFalse(first["eof"])
+        self.assertEqual(rest["data"], "two\nthree\n")
+        self.assertTrue(rest["eof"])
+        self.assertEqual(tail["data"], "three\n")
+        self.assertEqual(tail["next_offset"], 14)
+
+    def test_offset_past_end_restarts_after_rotation(self):
+        self.path.write_bytes(b"fresh\n")
+
+        result = tool_logs.read_log(self.path, offset=500)
+
+        self.assertTrue(result["rotated"])
+        self.assertEqual(result["data"], "fresh\n")
+
+    def test_rotate_compresses_segment_and_truncates_in_place(self):
+        self.path.write_bytes(b"a" * 100)
+        with open(self.path, "a") as live:
+            self.assertTrue(tool_logs.rotate_log(self.path, max_bytes=50, backups=2))
+            live.write("after\n")
+            live.flush()
+        self.path.write_bytes(self.path.read_bytes() + b"b" * 100)
+        tool_logs.rotate_log(self.path, max_bytes=50, backups=2)
+
+        self.assertEqual(self.path.stat().st_size, 0)
+        with gzip.open(self.path.with_name("downloader.out.log.2.gz")) as segment:
+            self.assertEqual(segment.read(), b"a" * 100)
+        with gzip.open(self.path.with_name("downloader.out.log.1.gz")) as segment:
+            self.assertEqual(segment.read(), b"after\n" + b"b" * 100)
+        self.assertFalse(tool_logs.rotate_log(self.path, max_bytes=50, backups=2))
+
+
+class ToolLogEndpointTests(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        os.environ["HQ_PROJECTS_PATH"] = os.path.join(self.tempdir.name, "projects.json")
+        os.environ["HQ_HOSTS_PATH"] = os.path.join(self.tempdir.name, "hosts.json")
+        os.environ["CONTROLLER_DB_PATH"] = os.path.join(self.tempdir.name, "tools.db")
+        sys.modules["psutil"] = types.SimpleNamespace(
+            pid_exists=lambda _pid: False,
+            pids=lambda: [],
+            Process=lambda _pid: None,
+            NoSuchProcess=Exception,
+            AccessDenied=Exception,
+        )
+
+        import controller.db as controller_db
+        import controller.controller_main as controller_main
+
+        self.db = importlib.reload(controller_db)
+        self.main = importlib.reload(controller_main)
+        self.db.init_db()
+        self.db.add_tool("downloader", "tools/downloader/main.py", 8123)
+        self.log = Path(self.tempdir.name) / "downloader.err.log"
+        self.log.write_bytes(b"boot\n")
+        patcher = patch.object(self.main, "log_path", lambda name, stream: Path(self.tempdir.name) / f"{name}.{stream}.log")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.main.LOG_POLL_SECONDS = 0.02
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+        os.environ.pop("HQ_PROJECTS_PATH", None)
+        os.environ.pop("HQ_HOSTS_PATH", None)
+        os.environ.pop("CONTROLLER_DB_PATH", None)
+        sys.modules.pop("psutil", None)
+
+    def test_long_poll_returns_when_new_bytes_arrive(self):
+        writer = threading.Timer(0.1, lambda: self.log.write_bytes(b"boot\nready\n"))
+        writer.start()
+        self.addCleanup(writer.cancel)
+
+        result = asyncio.run(self.main.tool_logs("downloader", make_request(), stream="err", offset=5, wait=5))
+
+        self.assertEqual(result["data"], "ready\n")
+        self.assertEqual(result["next_offset"], 11)
+
+    def test_unknown_tool_and_stream_are_rejected(self):
+        missing = asyncio.run(self.main.tool_logs("nope", make_request()))
+        bad_stream = asyncio.run(self.main.tool_logs("downloader", make_request(), stream="debug"))
+
+        self.assertEqual(missing.status_code, 404)
+        self.assertEqual(bad_stream.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,246 @@
+import asyncio
+import importlib
+import os
+import sys
+import tempfile
+import types
+import unittest
+
+import httpx
+from starlette.requests import Request
+
+
+def make_request(method="GET", path="/", headers=None, body=b"", query=b""):
+    raw_headers = [
+        (key.lower().encode("latin-1"), value.encode("latin-1"))
+        for key, value in (headers or {}).items()
+    ]
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query,
+        "headers": raw_headers,
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return Request(scope, receive)
+
+
+class UpstreamTransport(httpx.AsyncBaseTransport):
+    """Hands responses back unread so the proxy sees a live stream, like a real socket."""
+
+    def __init__(self, handler):
+        self.handler = handler
+
+    async def handle_async_request(self, request):
+        await request.aread()
+        return self.handler(request)
+
+
+async def chunked(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+async def collect_body(response):
+    if hasattr(response, "body_iterator"):
+        parts = []
+        async for chunk in response.body_iterator:
+            parts.append(chunk if isinstance(chunk, bytes) else chunk.encode("utf-8"))
+        if response.background:
+            await response.background()
+        return b"".join(parts)
+    return response.body
+
+
+class ToolProxyTests(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        os.environ["HQ_PROJECTS_PATH"] = os.path.join(self.tempdir.name, "projects.json")
+        os.environ["HQ_HOSTS_PATH"] = os.path.join(self.tempdir.name, "hosts.json")
+        os.environ["CONTROLLER_DB_PATH"] = os.path.join(self.tempdir.name, "tools.db")
+        sys.modules["psutil"] = types.SimpleNamespace(
+            pid_exists=lambda _pid: False,
+            pids=lambda: [],
+            Process=lambda _pid: None,
+            NoSuchProcess=Exception,
+            AccessDenied=Exception,
+        )
+
+        import controller.db as controller_db
+        import controller.controller_main as controller_main
+
+        self.db = importlib.reload(controller_db)
+        self.main = importlib.reload(controller_main)
+        self.db.init_db()
+        self.db.add_tool("downloader", "tools/downloader/main.py", 8123)
+        self.upstream_requests = []
+        self.upstream_handler = None
+
+        def handler(request):
+            self.upstream_requests.append(request)
+            return self.upstream_handler(request)
+
+        self.main.TOOL_PROXY = self.main.ToolProxyClient(transport=UpstreamTransport(handler))
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+        os.environ.pop("HQ_PROJECTS_PATH", None)
+        os.environ.pop("HQ_HOSTS_PATH", None)
+        os.environ.pop("CONTROLLER_DB_PATH", None)
+        sys.modules.pop("psutil", None)
+
+    def proxy(self, path, request):
+        async def run():
+            response = await self.main.proxy_tool_http("downloader", path, request)
+            body = await collect_body(response)
+            await self.main.TOOL_PROXY.aclose()
+            return response, body
+
+        return asyncio.run(run())
+
+    def test_binary_responses_stream_with_range_headers(self):
+        self.upstream_handler = lambda request: httpx.Response(
+            206,
+            headers={
+                "content-type": "video/mp4",
+                "content-range": "bytes 0-5/100",
+                "accept-ranges": "bytes",
+            },
+            content=chunked(b"abc", b"def"),
+        )
+
+        response, body = self.proxy(
+            "files/clip.mp4",
+            make_request(path="/proxy/downloader/files/clip.mp4", headers={"Range": "bytes=0-5"}),
+        )
+
+        self.assertEqual(body, b"abcdef")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.headers["content-range"], "bytes 0-5/100")
+        self.assertEqual(response.headers["accept-ranges"], "bytes")
+        self.assertEqual(str(self.upstream_requests[0].url), "http://127.0.0.1:8123/files/clip.mp4")
+        self.assertEqual(self.upstream_requests[0].headers["range"], "bytes=0-5")
+
+    def test_widget_html_is_buffered_and_rewritten(self):
+        self.upstream_handler = lambda request: httpx.Response(
+            200,
+            headers={"content-type": "text/html; charset=utf-8"},
+            content=b'<script src="/static/a.js"></script>',
+        )
+
+        response, body = self.proxy("widget", make_request(path="/proxy/downloader/widget"))
+
+        self.assertEqual(body, b'<script src="/proxy/downloader/static/a.js"></script>')
+        self.assertEqual(response.headers["content-length"], str(len(body)))
+
+    def test_widget_rewrites_are_cached_by_upstream_etag(self):
+        self.upstream_handler = lambda request: httpx.Response(
+            200,
+            headers={"content-type": "text/html", "etag": '"w1"'},
+            content=chunked(b'<a href="/list">', b"list</a>"),
+        )
+
+        _response, first = self.proxy("widget", make_request(path="/proxy/downloader/widget"))
+        _response, second = self.proxy("widget", make_request(path="/proxy/downloader/widget"))
+
+        self.assertEqual(first, b'<a href="/proxy/downloader/list">list</a>')
+        self.assertEqual(second, first)
+        self.assertEqual(self.main.WIDGET_REWRITE_CACHE.stats()["hits"], 1)
+
+    def test_widget_revalidates_upstream_and_serves_cached_body_on_304(self):
+        def upstream(request):
+            if request.headers.get("if-none-match") == '"w1"':
+                return httpx.Response(304, headers={"etag": '"w1"'})
+            return httpx.Response(
+                200,
+                headers={"content-type": "text/html", "etag": '"w1"'},
+                content=chunked(b'<img src="/logo.png">'),
+            )
+
+        self.upstream_handler = upstream
+
+        _response, first = self.proxy("widget", make_request(path="/proxy/downloader/widget"))
+        second_response, second = self.proxy("widget", make_request(path="/proxy/downloader/widget"))
+        third_response, third = self.proxy(
+            "widget",
+            make_request(path="/proxy/downloader/widget", headers={"If-None-Match": '"w1"'}),
+        )
+
+        self.assertEqual(second_response.status_code, 200)
+        self.assertEqual(second, first)
+        self.assertEqual(second_response.headers["content-type"], "text/html")
+        self.assertEqual(self.upstream_requests[1].headers["if-none-match"], '"w1"')
+        self.assertEqual(third_response.status_code, 304)
+        self.assertEqual(third, b"")
+        self.assertEqual(self.main.WIDGET_REWRITE_CACHE.stats()["revalidated"], 1)
+
+    def test_widget_cache_keeps_query_strings_apart(self):
+        def upstream(request):
+            page = request.url.params.get("page", "1")
+            if request.headers.get("if-none-match") == '"w1"':
+                return httpx.Response(304, headers={"etag": '"w1"'})
+            return httpx.Response(
+                200,
+                headers={"content-type": "text/html", "etag": '"w1"'},  # same tag for every page
+                content=chunked(f'<a href="/page/{page}">'.encode("utf-8")),
+            )
+
+        self.upstream_handler = upstream
+
+        _response, first = self.proxy("widget", make_request(path="/proxy/downloader/widget", query=b"page=1"))
+        _response, second = self.proxy("widget", make_request(path="/proxy/downloader/widget", query=b"page=2"))
+        _response, again = self.proxy("widget", make_request(path="/proxy/downloader/widget", query=b"page=1"))
+
+        self.assertEqual(first, b'<a href="/proxy/downloader/page/1">')
+        self.assertEqual(second, b'<a href="/proxy/downloader/page/2">')
+        self.assertEqual(again, first)
+        self.assertNotIn("if-none-match", self.upstream_requests[1].headers)
+        self.assertEqual(self.upstream_requests[2].headers["if-none-match"], '"w1"')
+
+    def test_encoded_streams_pass_through_undecoded(self):
+        self.upstream_handler = lambda request: httpx.Response(
+            200,
+            headers={"content-type": "application/zip", "content-length": "3", "content-encoding": "gzip"},
+            content=chunked(b"\x1f\x8b\x08"),
+        )
+
+        response, body = self.proxy("files/a.zip", make_request(path="/proxy/downloader/files/a.zip"))
+
+        self.assertEqual(body, b"\x1f\x8b\x08")
+        self.assertEqual(response.headers["content-length"], "3")
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+
+    def test_unreachable_tool_returns_bad_gateway(self):
+        def refuse(request):
+            raise httpx.ConnectError("refused", request=request)
+
+        self.upstream_handler = refuse
+
+        response, _body = self.proxy("widget", make_request(path="/proxy/downloader/widget"))
+
+        self.assertEqual(response.status_code, 502)
+
+    def test_command_proxy_reuses_tool_client(self):
+        self.upstream_handler = lambda request: httpx.Response(200, json={"ok": True, "path": request.url.path})
+
+        async def run():
+            first = await self.main.proxy_tool_command("downloader", "list", make_request())
+            client = self.main.TOOL_PROXY.client_for("downloader", 8123)
+            second = await self.main.proxy_tool_command("downloader", "status", make_request())
+            same_client = self.main.TOOL_PROXY.client_for("downloader", 8123) is client
+            await self.main.TOOL_PROXY.aclose()
+            return first, second, same_client
+
+        first, second, same_client = asyncio.run(run())
+
+        self.assertEqual(first, {"ok": True, "path": "/list"})
+        self.assertEqual(second["path"], "/status")
+        self.assertTrue(same_client)
+
+
+if __name__ == "__main__":
+    unittest.main()
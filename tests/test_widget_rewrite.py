@@ -0,0 +1,63 @@
+import unittest
+
+from controller.widget_rewrite import RewriteCache, WidgetRewriter, rewrite_widget_body
+
+
+class WidgetRewriteTests(unittest.TestCase):
+    def test_rewrites_existing_attribute_and_fetch_forms(self):
+        body = (
+            b'<img src="/a.png"><img src=\'/b.png\'><a href="/c">c</a><a href=\'/d\'>d</a>'
+            b'<form action="/e"></form><form action=\'/f\'></form>'
+            b'<script>fetch("/g"); fetch(\'/h\');</script>'
+        )
+
+        rewritten = rewrite_widget_body(body, "jobber")
+
+        for path in (b"a.png", b"b.png", b"c", b"d", b"e", b"f", b"g", b"h"):
+            self.assertIn(b"/proxy/jobber/" + path, rewritten)
+        self.assertNotIn(b'"/a.png"', rewritten)
+
+    def test_rewrites_css_urls_and_imports(self):
+        body = (
+            b"<style>.a{background:url(/bg.png)} .b{background:url('/c.png')}</style>"
+            b'<script type="module">import x from "/x.js"; import "/y.js"; import("/z.js");</script>'
+        )
+
+        rewritten = rewrite_widget_body(body, "calendar")
+
+        self.assertIn(b"url(/proxy/calendar/bg.png)", rewritten)
+        self.assertIn(b"url('/proxy/calendar/c.png')", rewritten)
+        self.assertIn(b'from "/proxy/calendar/x.js"', rewritten)
+        self.assertIn(b'import "/proxy/calendar/y.js"', rewritten)
+        self.assertIn(b'import("/proxy/calendar/z.js")', rewritten)
+
+    def test_leaves_protocol_relative_and_proxied_urls_alone(self):
+        body = b'<script src="//cdn.example.com/a.js"></script><img src="/proxy/other/i.png">'
+
+        self.assertEqual(rewrite_widget_body(body, "jobber"), body)
+
+    def test_streaming_matches_one_shot_for_any_chunk_split(self):
+        body = b'<a href="/one">1</a> fetch(\'/two\') url(/three) import x from "/four.js"' * 3
+        expected = rewrite_widget_body(body, "tool")
+
+        for size in (1, 2, 3, 7, 16, 65):
+            rewriter = WidgetRewriter("tool")
+            out = b"".join(rewriter.feed(body[i:i + size]) for i in range(0, len(body), size))
+            out += rewriter.flush()
+            self.assertEqual(out, expected, f"chunk size {size}")
+
+    def test_cache_keeps_latest_validator_per_path(self):
+        cache = RewriteCache(max_entries_per_tool=2)
+        cache.put("jobber", "widget", '"v1"', b"one")
+        cache.put("jobber", "widget", '"v2"', b"two")
+        cache.put("calendar", "widget", '"v1"', b"cal")
+
+        self.assertIsNone(cache.get("jobber", "widget", '"v1"'))
+        self.assertEqual(cache.get("jobber", "widget", '"v2"'), b"two")
+        self.assertEqual(cache.get("calendar", "widget", '"v1"'), b"cal")
+        self.assertEqual(cache.stats()["hits"], 2)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -656,8 +656,20 @@ def widget_generator():
     """
     return html
 
+def widget_version():
+    """Cheap widget version key: the widget is a pure function of the jobs DB contents."""
+    parts = []
+    for path in (DB_FILE, Path(f"{DB_FILE}-wal")):
+        try:
+            stat = path.stat()
+        except OSError:
+            parts.append("-")
+            continue
+        parts.append(f"{stat.st_mtime_ns}:{stat.st_size}")
+    return "|".join(parts)
+
 # Register Widget
-tool.add_widget_route(widget_generator)
+tool.add_widget_route(widget_generator, etag_func=widget_version)
 
 if __name__ == "__main__":
     tool.run()
@@ -1,13 +1,16 @@
 import json
+import hashlib
 import uvicorn
 import sys
 import os
+import time
 from pathlib import Path
 from typing import Callable, Optional
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
+from starlette.concurrency import run_in_threadpool
 
 from dotenv import load_dotenv, find_dotenv
 
@@ -36,6 +39,8 @@ class BaseTool:
         self.port = self.config["port"]
         self.title = self.config.get("title", self.name.replace("_", " ").title())
         self.version = self.config.get("version", "0.1.0")
+        # Mixed into widget version keys so a restart (possibly with new code) invalidates them.
+        self._boot_id = f"{os.getpid()}:{time.time_ns()}"
 
         # 2. Lifecycle Hooks Storage
         self._on_startup: Optional[Callable] = None
@@ -95,17 +100,49 @@ class BaseTool:
 
     # --- Routing Helpers ---
     def _register_core_routes(self):
+        manifest_body = json.dumps(self.config).encode("utf-8")
+        manifest_etag = strong_etag(manifest_body)
+
         @self.app.get("/manifest")
-        def manifest():
-            return self.config
+        def manifest(request: Request):
+            if etag_matches(request.headers.get("if-none-match"), manifest_etag):
+                return Response(status_code=304, headers={"ETag": manifest_etag})
+            return Response(
+                content=manifest_body,
+                media_type="application/json",
+                headers={"ETag": manifest_etag, "Cache-Control": "no-cache"},
+            )
 
         @self.app.get("/health")
         def health():
             return {"status": "ok", "tool": self.name}
 
-    def add_widget_route(self, html_generator_func):
-        """Helper to register the widget UI."""
-        self.app.get("/widget", response_class=HTMLResponse)(html_generator_func)
+    def add_widget_route(self, html_generator_func, etag_func: Optional[Callable] = None):
+        """
+        Helper to register the widget UI.
+
+        Responses carry a strong ETag and answer a matching If-None-Match with 304.
+        :param etag_func: optional cheap version key (e.g. a data file's mtime). When given,
+            an unchanged widget is answered with 304 without calling html_generator_func.
+        """
+
+        @self.app.get("/widget", response_class=HTMLResponse)
+        async def widget(request: Request):
+            if_none_match = request.headers.get("if-none-match")
+            etag = None
+            if etag_func:
+                version = await _call(etag_func)
+                etag = strong_etag(f"{self._boot_id}:{version}".encode("utf-8"))
+                if etag_matches(if_none_match, etag):
+                    return Response(status_code=304, headers={"ETag": etag})
+
+            html = await _call(html_generator_func)
+            body = html.encode("utf-8") if isinstance(html, str) else bytes(html)
+            if etag is None:
+                etag = strong_etag(body)
+                if etag_matches(if_none_match, etag):
+                    return Response(status_code=304, headers={"ETag": etag})
+            return HTMLResponse(content=body, headers={"ETag": etag, "Cache-Control": "no-cache"})
 
     def run(self):
         """Standard launcher."""
@@ -117,3 +154,22 @@ class BaseTool:
 import inspect
 def is_async(func):
     return inspect.iscoroutinefunction(func)
+
+
+async def _call(func):
+    """Await async callables; run sync ones in the threadpool like FastAPI does for routes."""
+    if is_async(func):
+        return await func()
+    return await run_in_threadpool(func)
+
+
+def strong_etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """Weak comparison, as If-None-Match requires."""
+    tags = [tag.strip() for tag in str(header or "").split(",") if tag.strip()]
+    if "*" in tags:
+        return True
+    return any(tag.removeprefix("W/") == etag for tag in tags)